@@ -0,0 +1,13 @@
+"""Utils for the relations of the drivetrain model.
+
+The functions accept scalars or NumPy arrays, i.e., a relation may be
+evaluated for many samples at once.
+
+"""
+
+import numpy as np
+
+
+def arctan(x):
+    """Returns the arc tangent of x (in radians)."""
+    return np.arctan(x)
@@ -1,4 +1,15 @@
-"""Utils for the relations of the radar tracking model."""
+"""Utils for the relations of the radar tracking model.
+
+The geometric functions accept scalars or NumPy arrays as coordinates, i.e., a
+point [x, y] may hold the coordinates of many points (e.g., all positions of a
+recording) which are then checked with a single array operation.
+
+"""
+
+import math
+import numpy as np
+from functools import lru_cache
+
 
 def sign(p1, p2, p3):
     """Returns the position (in terms of left and right) of p1 given the line
@@ -13,13 +24,16 @@ def sign(p1, p2, p3):
 def is_point_in_triangle(pt, v1, v2, v3):
     """Returns True if the 2D point pt is within the triangle defined by v1-3.
 
+    pt may be an array [xs, ys] of many points; then an array of booleans is
+    returned.
+
     https://www.gamedev.net/forums/topic/295943-is-this-a-better-point-in-triangle-test-2d/
 
     """
     b1 = sign(pt, v1, v2) < 0.0
     b2 = sign(pt, v2, v3) < 0.0
     b3 = sign(pt, v3, v1) < 0.0
-    return ((b1 == b2) and (b2 == b3))
+    return (b1 == b2) & (b2 == b3)
 
 def translate(point, translation):
     """Translates a 2D point."""
@@ -37,18 +51,36 @@ def rotate(origin, point, angle):
     https://stackoverflow.com/questions/34372480/rotate-point-about-another-point-in-degrees-python?utm_medium=organic&utm_source=google_rich_qa&utm_campaign=google_rich_qa
 
     """
-    import math
     ox, oy = origin
     px, py = point
     qx = ox + math.cos(angle) * (px - ox) - math.sin(angle) * (py - oy)
     qy = oy + math.sin(angle) * (px - ox) + math.cos(angle) * (py - oy)
     return [qx, qy]
 
+@lru_cache(maxsize=64)
+def field_of_view(location, heading, radius, angle):
+    """Returns the triangle (v1, v2, v3) approximating the field of view of a
+    sensor.
+
+    The triangle only depends on the (constant) sensor parameters, so it is
+    cached. location must be hashable, i.e., a tuple. The vertices are tuples
+    too, i.e., the cached triangle cannot be modified by the caller.
+
+    """
+    v1 = tuple(location)
+    vt = translate(v1, [radius, 0])
+    v2 = tuple(rotate(location, vt, heading - angle/2))
+    v3 = tuple(rotate(location, vt, heading + angle/2))
+    return v1, v2, v3
+
 def in_field_of_view(point, location, heading, radius, angle):
+    """Returns True if the point [x, y] is in the field of view of a sensor.
+
+    point -- [x, y], whereas x and y are scalars or arrays (one element per
+      point to check, returns an array of booleans then).
+    location, heading, radius, angle -- Sensor parameters.
+
+    """
     # approximate field of view with a triangle
-    import math
-    v1 = location
-    vt = translate(v1, [radius, 0])
-    v2 = rotate(location, vt, heading - angle/2)
-    v3 = rotate(location, vt, heading + angle/2)
-    return is_point_in_triangle(point, v1, v2, v3)
+    v1, v2, v3 = field_of_view(tuple(location), heading, radius, angle)
+    return is_point_in_triangle(np.asarray(point, dtype=float), v1, v2, v3)
@@ -7,7 +7,7 @@ echo >> ex1.yaml
 
 n=100
 
-PYTHONPATH=../shsa python3 -O ../shsa/benchmark/ex1.py -n $n -b 2 -d 2 >> ex1.yaml
-PYTHONPATH=../shsa python3 -O ../shsa/benchmark/ex1.py -n $n -b 2 -d 4 >> ex1.yaml
-PYTHONPATH=../shsa python3 -O ../shsa/benchmark/ex1.py -n $n -b 2 -d 6 >> ex1.yaml
-PYTHONPATH=../shsa python3 -O ../shsa/benchmark/ex1.py -n $n -b 2 -d 8 >> ex1.yaml
+PYTHONPATH=../shsa python3 -O -m benchmark.ex1 -n $n -b 2 -d 2 >> ex1.yaml
+PYTHONPATH=../shsa python3 -O -m benchmark.ex1 -n $n -b 2 -d 4 >> ex1.yaml
+PYTHONPATH=../shsa python3 -O -m benchmark.ex1 -n $n -b 2 -d 6 >> ex1.yaml
+PYTHONPATH=../shsa python3 -O -m benchmark.ex1 -n $n -b 2 -d 8 >> ex1.yaml
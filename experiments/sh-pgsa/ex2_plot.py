@@ -24,9 +24,9 @@ print
 print "=== loading ===================================================="
 print
 
-# convert csvs to numpy array
-data = np.genfromtxt(args.csvfile, comments='%',
-                     delimiter=',', names=True)
+# convert csvs to numpy array (one row per model and algorithm)
+data = np.genfromtxt(args.csvfile, delimiter=',', names=True, dtype=None,
+                     encoding='utf-8')
 
 print "data: " + str(data.dtype.names)
 
@@ -35,40 +35,30 @@ print
 print "=== prepare ===================================================="
 print
 
-# divide exec time by number of calls
-et = {}
-et['SH-PGSA (best)'] = data['shsa_et'] / data['shsa_n']
-et['ORR'] = data['orr_et'] / data['orr_n']
-et['DFS'] = data['dfs_et'] / data['dfs_n']
+# algorithms to plot
+names = {}
+names['shpgsa_once'] = 'SH-PGSA (best)'
+names['orr'] = 'ORR'
+names['dfs_mem'] = 'DFS'
 
 # get depth
-# CAVEAT: assumes the depth is sorted in the csvfile!
 depth = np.unique(data['depth'])
 
-# get number of experiments per depth
-firstdepth = data['depth'][0]
-m = len(filter(lambda i: i == firstdepth, data['depth']))
-
 print "depth: " + str(depth)
-print "different models: " + str(m)
-
-# split per depth
-et_split = {}
-for name, data in et.items():
-    et_split[name] = np.split(data, len(data)/m)
 
 # measures to plot
 et_measures = {}
-# create arrays (element for each depth) for measures per algorithm
-for name in et_split.keys():
+# create arrays (element for each depth) for measures per algorithm, i.e.,
+# over the median execution time (in s) of a substitute-call per model
+for alg, name in names.items():
     et_measures[name] = {}
     et_measures[name]['avg'] = []
     et_measures[name]['std'] = []
     et_measures[name]['min'] = []
     et_measures[name]['max'] = []
-# calculate measures per depth
-for name, data in et_split.items():
-    for a in data:
+    for x in depth:
+        a = data['median'][(data['algorithm'] == alg) & (data['depth'] == x)]
+        a = a * 1e-9
         et_measures[name]['avg'].append(np.mean(a))
         et_measures[name]['std'].append(np.std(a))
         et_measures[name]['min'].append(min(a))
@@ -81,22 +71,26 @@ print
 
 print "* plots"
 
-fig = plt.figure(figsize=(8,3))
+fig = plt.figure(figsize=(8, 3))
 
 
 # styles
 styles = [['-', '--', '-.'], ['r', 'g', 'b'], ['+', '+', '+'], ['x', 'x', 'x']]
 names = et_measures.keys()
 
+
 def linestyle(name):
     return styles[0][names.index(name)]
 
+
 def color(name):
     return styles[1][names.index(name)]
 
+
 def marker(name):
     return styles[2][names.index(name)]
 
+
 def marker_max(name):
     return styles[3][names.index(name)]
 
@@ -121,11 +115,11 @@ for name, measure in et_measures.items():
 # plt.boxplot(startup, positions=startup_n)
 # plt.boxplot(shutdown, positions=shutdown_n)
 
-#plt.title("Overhead of starting a node in ROS")
+# plt.title("Overhead of starting a node in ROS")
 plt.xlabel("depth")
-plt.xlim(0,max(depth))
+plt.xlim(0, max(depth))
 plt.ylabel("time (s)")
-plt.ylim(0,args.ymax)
+plt.ylim(0, args.ymax)
 plt.legend(loc='upper left')
 
 plt.show()
@@ -7,5 +7,5 @@ echo >> ex_cs.yaml
 
 n=100
 
-PYTHONPATH=../shsa python3 -O ../shsa/benchmark/ex_cs.py -n $n dmin ../../ros/shsa-pkg/config/rover.yaml >> ex_cs.yaml
-PYTHONPATH=../shsa python3 -O ../shsa/benchmark/ex_cs.py -n $n steering_angle ../config/drivetrain.yaml >> ex_cs.yaml
+PYTHONPATH=../shsa python3 -O -m benchmark.ex_cs -n $n dmin ../../ros/shsa-pkg/config/rover.yaml >> ex_cs.yaml
+PYTHONPATH=../shsa python3 -O -m benchmark.ex_cs -n $n steering_angle ../config/drivetrain.yaml >> ex_cs.yaml
@@ -1,18 +1,138 @@
 #!/usr/bin/python3
 """
 Profile.
+
+Prints the stats of one or several profiles (aggregated), e.g., recorded
+with option `--profile` of the benchmarks and `uc_*.py` scripts:
+
+  $ ./profile_stats.py ex3-1.prof ex3-2.prof -l 20
+
+Shows callers and callees of the hot spots in the engines (functions with
+the highest internal time in a file matching a pattern):
+
+  $ ./profile_stats.py ex3.prof --hotspots 5 --module shsa/engine
+
+Exports collapsed stacks (one line per stack with its internal time in us)
+for flamegraph tools, e.g., flamegraph.pl or speedscope:
+
+  $ ./profile_stats.py ex3.prof --collapsed ex3.folded
+  $ flamegraph.pl ex3.folded > ex3.svg
+
+Note that cProfile records the calls between two functions only (not the
+full stacks). The stacks are reconstructed from the call graph, i.e., the
+time of a function is split over its callers by their share of the
+function's cumulative time.
+
 """
 
 import argparse
+import os
 import pstats
+import re
+
+
+def label(func):
+    """Returns a readable name of a function (file, line, name) without the
+    separators of collapsed stacks."""
+    filename, line, name = func
+    if filename == '~':
+        return name.replace(';', ',').replace(' ', '_')
+    return "{}:{}:{}".format(os.path.basename(filename), line,
+                             name).replace(';', ',').replace(' ', '_')
+
+
+def hotspots(stats, module, num):
+    """Returns the functions with the highest internal time in files
+    matching the module pattern."""
+    pattern = re.compile(module)
+    funcs = [f for f in stats.stats.keys() if pattern.search(f[0])]
+    funcs.sort(key=lambda f: stats.stats[f][2], reverse=True)
+    return funcs[:num]
+
+
+def collapsed(stats, minshare=1e-6, maxdepth=64):
+    """Returns the collapsed stacks and their internal time in seconds.
+
+    stats -- pstats.Stats.
+    minshare -- Stacks with a lower share of a function's time are pruned.
+    maxdepth -- Maximum length of a stack.
+
+    """
+    # callees per function incl. the cumulative time per call
+    callees = {}
+    for func, (_, _, _, ct, callers) in stats.stats.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, edge_ct))
+    roots = [f for f, v in stats.stats.items() if len(v[4]) == 0]
+    stacks = {}
+
+    def walk(func, stack, share):
+        stack = stack + [label(func)]
+        tt = stats.stats[func][2] * share
+        if tt > 0:
+            key = ";".join(stack)
+            stacks[key] = stacks.get(key, 0) + tt
+        if len(stack) >= maxdepth:
+            return
+        for callee, edge_ct in callees.get(func, []):
+            if label(callee) in stack:
+                continue  # recursion
+            ct = stats.stats[callee][3]
+            if ct <= 0:
+                continue
+            s = share * min(edge_ct / ct, 1.0)
+            if s >= minshare:
+                walk(callee, stack, s)
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return stacks
+
+
+def main():
+    # parse args
+    desc = "Profile stats."
+    parser = argparse.ArgumentParser(description=desc)
+    parser.add_argument(dest='profiles', nargs='+',
+                        help="""Path to profile results (several profiles
+                        are aggregated).""")
+    parser.add_argument('-s', '--sort', type=str, default='cumulative',
+                        help="""Sort key of the stats, e.g., cumulative,
+                        tottime or ncalls.""")
+    parser.add_argument('-l', '--limit', type=int,
+                        help="""Number of functions to print.""")
+    parser.add_argument('--hotspots', type=int, metavar='N',
+                        help="""Prints callers and callees of the N
+                        functions with the highest internal time in the
+                        module (instead of the stats).""")
+    parser.add_argument('--module', type=str, default='engine',
+                        help="""Pattern of the file names of the hot spots
+                        (default: engine).""")
+    parser.add_argument('--collapsed', type=str, metavar='FILE',
+                        help="""Exports collapsed stacks (internal time in
+                        us) to the given file.""")
+    args = parser.parse_args()
 
+    p = pstats.Stats(*args.profiles)
+    if args.collapsed is not None:
+        with open(args.collapsed, 'w') as f:
+            for stack, tt in sorted(collapsed(p).items()):
+                us = int(round(tt * 1e6))
+                if us > 0:
+                    f.write("{} {}\n".format(stack, us))
+    elif args.hotspots is not None:
+        funcs = hotspots(p, args.module, args.hotspots)
+        for func in funcs:
+            # restrict to the hot spot (name is a regular expression)
+            restriction = r"{}:{}\({}\)".format(
+                re.escape(os.path.basename(func[0])), func[1],
+                re.escape(func[2]))
+            p.print_callers(restriction)
+            p.print_callees(restriction)
+    else:
+        restrictions = [args.limit] if args.limit is not None else []
+        p.sort_stats(args.sort).print_stats(*restrictions)
 
-# parse args
-desc = "Profile stats."
-parser = argparse.ArgumentParser(description=desc)
-parser.add_argument(dest='profile',
-                    help="""Path to profile results.""")
-args = parser.parse_args()
 
-p = pstats.Stats(args.profile)
-p.sort_stats('cumulative').print_stats()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Entry point of the benchmark tools.
+
+  $ python3 -m benchmark compare baseline.json candidate.json
+  $ python3 -m benchmark sweep ex3 -g branch=1,2 -o ex3.csv -- orr
+
+"""
+
+import sys
+
+from benchmark import compare, sweep
+
+
+COMMANDS = {
+    'compare': compare.main,
+    'sweep': sweep.main,
+}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if len(argv) == 0 or argv[0] not in COMMANDS:
+        print("usage: python3 -m benchmark {{{}}} ...".format(
+            ",".join(sorted(COMMANDS.keys()))), file=sys.stderr)
+        return 2
+    return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,64 @@
-"""Experiments for IPSN paper."""
+"""Benchmark of the search engines (experiments for IPSN paper).
+
+Each engine call is measured with `time.perf_counter_ns`. Warmup calls are
+executed before the measured calls and are not measured. The execution times
+are summarized per algorithm (minimum, median, 95th percentile, mean and
+standard deviation, all in nanoseconds) and can be written to a JSON or CSV
+file (option `-o`).
+
+The memory footprint is measured in an additional (not timed) call per
+algorithm: the peak of the memory allocated during the call (tracemalloc),
+the resident set size of the process after the call and the number of
+`Substitution`s and `Worker`s created.
+
+The measured calls can be profiled with cProfile (option `--profile`), see
+`scripts/profile_stats.py`.
+
+SH-PGSA can be run in beam mode (option `--beam`); the records include the
+quality of the result then, i.e., its utility relative to the best utility.
+
+The experiments are modules of the benchmark package, e.g., run from the
+shsa directory:
+
+  $ python3 -m benchmark.ex3 -n 10 -w 2 -b 2 -d 6 -o ex3.csv shpgsa_once orr
+
+"""
 
-from profilehooks import profile, timecall
 import argparse
+import cProfile
+import csv
+import functools
+import gc
+import json
+import os
+import resource
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+import numpy as np
 
 from model.shsamodel import SHSAModel
+from model.substitution import Substitution
 from model.substitutionlist import SubstitutionList
 from engine.orr import ORR
 from engine.dfs import DepthFirstSearch
 from engine.shpgsa import SHPGSA
+from engine.counting import CountingSearch
+from engine.aostar import AOStar
 
 
-@timecall(immediate=False)
 def orr(model, root):
     engine = ORR(model)
     engine.substitute_init()
     _, tree = engine.substitute(root)
     S = SubstitutionList()
-    S.add_substitution([n for n in tree if model.is_relation(n)])
-    S.update(root, model=model)
+    if tree is not None:
+        S.add_substitution([n for n in tree if model.is_relation(n)])
+        S.update(root, model=model)
     return S
 
 
-@timecall(immediate=False)
 def dfs(model, root):
     engine = DepthFirstSearch(model)
     S = engine.substitute(root, substitute_provided=False,
@@ -41,7 +78,6 @@ def dfs(model, root):
     return S
 
 
-@timecall(immediate=False)
 def dfs_mem(model, root):
     engine = DepthFirstSearch(model)
     S = engine.substitute(root, substitute_provided=False,
@@ -57,32 +93,235 @@ def dfs_mem(model, root):
     return S
 
 
-@timecall(immediate=False)
-def shpgsa(model, root):
-    engine = SHPGSA(model)
-    while(engine.substitute(root)):
+def shpgsa(model, root, beam=None, beam_depth=False):
+    engine = SHPGSA(model, beam=beam, beam_depth=beam_depth)
+    while engine.substitute(root):
         pass
     S = engine.last_results()
     return S
 
 
-@timecall(immediate=False)
-def shpgsa_once(model, root):
-    engine = SHPGSA(model)
+def shpgsa_once(model, root, beam=None, beam_depth=False):
+    engine = SHPGSA(model, beam=beam, beam_depth=beam_depth)
     engine.substitute(root)
     S = engine.last_results()
     return S
 
 
+def aostar(model, root):
+    engine = AOStar(model)
+    s = engine.substitute(root)
+    S = SubstitutionList()
+    if s is not None:
+        S.append(s)
+    return S
+
+
+ALGORITHMS = OrderedDict([
+    ('dfs', dfs),
+    ('dfs_mem', dfs_mem),
+    ('shpgsa', shpgsa),
+    ('orr', orr),
+    ('shpgsa_once', shpgsa_once),
+    ('aostar', aostar),
+])
+"""Search algorithms under test (name to function searching a substitution
+given a model and the root)."""
+
+ALIASES = {
+    'rss': 'shpgsa',
+    'rss_once': 'shpgsa_once',
+}
+"""Former names of algorithms."""
+
+BEAM = ['shpgsa', 'shpgsa_once']
+"""Algorithms searching with a bounded frontier (option `--beam`)."""
+
+CASE = ['algorithm', 'stage', 'model', 'seed', 'root', 'beam', 'beam_depth',
+        'branch', 'depth', 'availability', 'costs', 'variables', 'inputs',
+        'bidirectional', 'configfile', 'scenario', 'domains', 'samples',
+        'fault_rate', 'fault_offset', 'noise', 'log']
+"""Fields of a record identifying a case, i.e., the parameters of the
+experiments (see `Benchmark.parameters`), the measured algorithm or stage and
+the model of a sweep. Other fields, e.g., measurements or the size of a
+generated model, do not distinguish cases (e.g., when comparing runs)."""
+
+
+def names():
+    """Returns the names of the algorithms (incl. aliases)."""
+    return list(ALGORITHMS.keys()) + list(ALIASES.keys())
+
+
+def measure(fct, args=(), ncalls=1, warmup=0, profiler=None):
+    """Calls a function several times and measures the execution time of each
+    call.
+
+    fct -- Function to measure.
+    args -- Arguments passed to the function.
+    ncalls -- Number of measured calls.
+    warmup -- Number of calls before the measurement.
+    profiler -- A `cProfile.Profile` enabled during the measured calls
+        (optional).
+
+    Returns the execution times in ns and the result of the last call.
+
+    """
+    for _ in range(warmup):
+        fct(*args)
+    times = []
+    result = None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        for _ in range(ncalls):
+            start = time.perf_counter_ns()
+            result = fct(*args)
+            times.append(time.perf_counter_ns() - start)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    return times, result
+
+
+@contextmanager
+def count_instances(cls=Substitution):
+    """Counts the instances of a class (incl. subclasses) created within the
+    context.
+
+    Yields a counter of instances per class name.
+
+    """
+    counts = Counter()
+    init = cls.__init__
+
+    def counting_init(self, *args, **kwargs):
+        counts[type(self).__name__] += 1
+        init(self, *args, **kwargs)
+
+    cls.__init__ = counting_init
+    try:
+        yield counts
+    finally:
+        cls.__init__ = init
+
+
+def _timed(fct, times):
+    """Returns a wrapper of a function measuring each call."""
+    def timed(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return fct(*args, **kwargs)
+        finally:
+            times.append(time.perf_counter_ns() - start)
+    return timed
+
+
+@contextmanager
+def time_calls(targets):
+    """Measures the execution time of each call of methods within the
+    context.
+
+    targets -- Dictionary of stage name to class and method name, e.g.,
+        {'agree': (FaultAgreement, 'agree')}.
+
+    Yields the execution times in ns per stage.
+
+    """
+    times = OrderedDict((stage, []) for stage in targets.keys())
+    originals = []
+    try:
+        for stage, (cls, name) in targets.items():
+            originals.append((cls, name, getattr(cls, name)))
+            setattr(cls, name, _timed(getattr(cls, name), times[stage]))
+        yield times
+    finally:
+        for cls, name, fct in reversed(originals):
+            setattr(cls, name, fct)
+
+
+def rss():
+    """Returns the current resident set size of the process in bytes (None
+    if not available)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError):
+        return None
+
+
+def measure_memory(fct, args=()):
+    """Calls a function and measures its memory footprint.
+
+    Returns the peak of the traced memory allocations during the call, the
+    current and maximum resident set size of the process after the call (all
+    in bytes) and the number of substitutions and workers created.
+
+    """
+    gc.collect()
+    with count_instances() as counts:
+        tracemalloc.start()
+        try:
+            fct(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    memory = OrderedDict()
+    memory['peak'] = peak
+    memory['rss'] = rss()
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    memory['maxrss'] = maxrss * 1024  # kilobytes on linux
+    memory['substitutions'] = counts['Substitution']
+    memory['workers'] = counts['Worker']
+    return memory
+
+
+def statistics(times):
+    """Returns the summary of execution times (in ns)."""
+    t = np.asarray(times, dtype=float)
+    stats = OrderedDict()
+    stats['n'] = len(t)
+    stats['min'] = float(t.min())
+    stats['median'] = float(np.median(t))
+    stats['p95'] = float(np.percentile(t, 95))
+    stats['mean'] = float(t.mean())
+    stats['stddev'] = float(t.std(ddof=1)) if len(t) > 1 else 0.0
+    return stats
+
+
+def histogram(times):
+    """Returns the histogram of execution times (in ns) with logarithmic
+    bins, i.e., the number of times per upper bound 2^k ns (empty bins
+    between the first and last non-empty bin are included)."""
+    t = np.asarray(times, dtype=float)
+    hist = OrderedDict()
+    if len(t) == 0:
+        return hist
+    exponents = np.ceil(np.log2(np.maximum(t, 1))).astype(int)
+    counts = np.bincount(exponents - exponents.min())
+    for k, count in enumerate(counts):
+        hist[2**int(k + exponents.min())] = int(count)
+    return hist
+
+
 class Benchmark(object):
 
-    def __init__(self, model=None, root=None):
+    def __init__(self, model=None, root=None, argv=None):
+        """Initializes the benchmark.
+
+        argv -- List of command line arguments (defaults to the arguments of
+            the script).
+
+        """
         self._model = model
         self._root = root
         self._parser = argparse.ArgumentParser(description="""Experiment 1.""")
         self._parse_args()  # register arguments
-        self._args = self._parser.parse_args()
+        self._args = self._parser.parse_args(argv)
         self._results = {}
+        self._measurements = OrderedDict()
+        self._memory = {}
+        self._count = None
+        self._best = None
         self._failed = False
 
     def __get_model(self):
@@ -90,12 +329,38 @@ class Benchmark(object):
 
     def __set_model(self, model):
         self._model = model
+        self._count = None
+        self._best = None
 
     model = property(__get_model, __set_model)
 
     def _parse_args(self):
         self._parser.add_argument('-n', '--ncalls', type=int, default=10,
-                                  help="Number of substitute-calls.")
+                                  help="""Number of measured substitute-calls
+                                  per algorithm.""")
+        self._parser.add_argument('-w', '--warmup', type=int, default=1,
+                                  help="""Number of substitute-calls per
+                                  algorithm before the measurement.""")
+        self._parser.add_argument('-o', '--output', type=str,
+                                  help="""Appends the measurements to the
+                                  given file (.json or .csv).""")
+        self._parser.add_argument('--no-memory', dest='memory',
+                                  action='store_false', help="""Skip the
+                                  measurement of the memory footprint.""")
+        self._parser.add_argument('-s', '--seed', type=int,
+                                  help="""Seed of the model generator
+                                  (default: random model).""")
+        self._parser.add_argument('--profile', type=str, metavar='FILE',
+                                  help="""Writes the profile (cProfile) of
+                                  the measured calls of all algorithms to the
+                                  given file.""")
+        self._parser.add_argument('--beam', type=int, metavar='B',
+                                  help="""Beam width of SH-PGSA, i.e., keeps
+                                  the best B potential workers only (default:
+                                  complete search).""")
+        self._parser.add_argument('--beam-depth', action='store_true',
+                                  help="""Applies the beam width per depth
+                                  instead of overall.""")
 
     def setup(self):
         raise NotImplementedError
@@ -103,35 +368,240 @@ class Benchmark(object):
     def check(self, algorithms=[]):
         raise NotImplementedError
 
+    def parameters(self):
+        """Returns the parameters of the experiment."""
+        params = OrderedDict()
+        params['ncalls'] = self._args.ncalls
+        params['warmup'] = self._args.warmup
+        params['seed'] = self._args.seed
+        params['root'] = self._root
+        params['numnodes'] = len(self._model.nodes())
+        params['numedges'] = len(self._model.edges())
+        params['count'] = self.count()
+        params['beam'] = self._args.beam
+        params['beam_depth'] = self._args.beam_depth
+        return params
+
+    def count(self):
+        """Returns the number of valid substitutions of the root (counted
+        without enumerating them)."""
+        if self._count is None:
+            self._count = CountingSearch(self._model).count(
+                self._root, substitute_provided=False)
+        return self._count
+
+    def best(self):
+        """Returns the utility of the best substitution of the root (None if
+        there is none)."""
+        if self._best is None:
+            s = AOStar(self._model).substitute(self._root)
+            self._best = s.utility if s is not None else False
+        return self._best if self._best is not False else None
+
+    def algorithm(self, name):
+        """Returns the function of an algorithm incl. the options of the
+        experiment (e.g., the beam width)."""
+        fct = ALGORITHMS[name]
+        if self._args.beam is not None and name in BEAM:
+            fct = functools.partial(fct, beam=self._args.beam,
+                                    beam_depth=self._args.beam_depth)
+        return fct
+
     def run(self, algorithms=['dfs', 'dfs_mem', 'shpgsa', 'orr',
                               'shpgsa_once']):
         """Execute all engines under test n times."""
+        algorithms = [ALIASES.get(a, a) for a in algorithms]
+        for a in algorithms:
+            if a not in ALGORITHMS:
+                raise RuntimeError("Unknown algorithm {}.".format(a))
+        profiler = None
+        if self._args.profile is not None:
+            profiler = cProfile.Profile()
         try:
-            if 'dfs' in algorithms:
-                for i in range(self._args.ncalls - 1):
-                    dfs(self._model, self._root)
-                self._results['dfs'] = dfs(self._model, self._root)
-            if 'dfs_mem' in algorithms:
-                for i in range(self._args.ncalls - 1):
-                    dfs_mem(self._model, self._root)
-                self._results['dfs_mem'] = dfs_mem(self._model, self._root)
-            if 'shpgsa' in algorithms:
-                for i in range(self._args.ncalls - 1):
-                    shpgsa(self._model, self._root)
-                self._results['shpgsa'] = shpgsa(self._model, self._root)
-            if 'orr' in algorithms:
-                for i in range(self._args.ncalls - 1):
-                    orr(self._model, self._root)
-                self._results['orr'] = orr(self._model, self._root)
-            if 'shpgsa_once' in algorithms:
-                for i in range(self._args.ncalls - 1):
-                    shpgsa_once(self._model, self._root)
-                self._results['shpgsa_once'] = shpgsa_once(self._model,
-                                                           self._root)
+            for a in algorithms:
+                times, self._results[a] = measure(
+                    self.algorithm(a), (self._model, self._root),
+                    self._args.ncalls, self._args.warmup, profiler)
+                self._measurements[a] = times
+                if self._args.memory:
+                    self._memory[a] = measure_memory(
+                        self.algorithm(a), (self._model, self._root))
         except Exception as e:
             self._failed = True
             raise
+        finally:
+            if profiler is not None:
+                profiler.dump_stats(self._args.profile)
         # group the algorithms for comparison
         g1 = set(['dfs', 'dfs_mem', 'shpgsa']) & set(algorithms)
         g2 = set(['orr', 'shpgsa_once']) & set(algorithms)
         return [list(g1), list(g2)]
+
+    def records(self):
+        """Returns the measurements, one record per algorithm, including the
+        parameters of the experiment, the memory footprint and the utility of
+        the best substitution.
+
+        With a beam width, the quality of the result is its utility relative
+        to the utility of the best substitution (searched with AO*).
+
+        """
+        records = []
+        for a, times in self._measurements.items():
+            record = self.parameters()
+            record['algorithm'] = a
+            record.update(statistics(times))
+            record.update(self._memory.get(a, {}))
+            best = self._results[a].best()
+            record['utility'] = best.utility if best is not None else None
+            record['quality'] = None
+            if self._args.beam is not None and self.best():
+                record['quality'] = (record['utility'] or 0) / self.best()
+            record['times'] = times
+            records.append(record)
+        return records
+
+    def report(self):
+        """Returns the summary of the measurements (yaml)."""
+        ret = ""
+        for a, times in self._measurements.items():
+            ret += "  {}:\n".format(a)
+            for key, value in statistics(times).items():
+                ret += "    {}: {}\n".format(key, value)
+            for key, value in self._memory.get(a, {}).items():
+                ret += "    {}: {}\n".format(key, value)
+        return ret
+
+    def write(self, filename=None):
+        """Appends the measurements to a file.
+
+        filename -- Path to a .json (list of records, incl. the measured
+            times) or .csv (a row per record, without the measured times)
+            file. Defaults to the output argument.
+
+        """
+        filename = filename if filename is not None else self._args.output
+        if filename is None:
+            return
+        write_records(filename, self.records())
+
+
+class GeneratorBenchmark(Benchmark):
+    """Benchmark on a generated model (see `generators`) comparing the
+    substitutions found by the algorithms."""
+
+    def _generator_parameters(self):
+        """Returns the parameters of the model generator to print (list of
+        name and value)."""
+        raise NotImplementedError
+
+    def check(self, algorithms=[]):
+        if not self._failed:
+            # check results
+            # single results won't be compared
+            single = True
+            for alg, sublist in self._results.items():
+                # check only listed algorithms
+                if alg not in algorithms:
+                    continue
+                if len(sublist) != 1:
+                    single = False
+                print("\n  {}:".format(alg))
+                print("    len: {}".format(len(sublist)))
+                if self._failed:
+                    print("    S: {}".format(list(sublist)))
+            # compare results
+            print()
+            if single:
+                return
+            for a1, s1 in self._results.items():
+                for a2, s2 in self._results.items():
+                    # check only listed algorithms
+                    if not (a1 in algorithms and a2 in algorithms):
+                        continue
+                    diff1 = s1.relations() - s2.relations()
+                    diff2 = s2.relations() - s1.relations()
+                    if len(diff1) > 0:
+                        print("  {} - {}: {}".format(a1, a2, diff1))
+                    if len(diff2) > 0:
+                        print("  {} - {}: {}".format(a2, a1, diff2))
+
+    def __str__(self):
+        ret = ""
+        if self._failed:
+            ret += "status: failed\n\n"
+            ret += "model:\n"
+            ret += "  nodes: {}\n".format(self._model.nodes())
+            ret += "  edges: {}\n\n".format(self._model.edges())
+        else:
+            ret += "status: ok\n\n"
+        ret += "parameters:\n"
+        ret += "  ncalls: {}\n".format(self._args.ncalls)
+        for name, value in self._generator_parameters():
+            ret += "  {}: {}\n".format(name, value)
+        ret += "  root: {}\n".format(self._root)
+        ret += "  numnodes: {}\n".format(len(self._model.nodes()))
+        ret += "  numedges: {}\n".format(len(self._model.edges()))
+        return ret
+
+    def export_model(self):
+        if self._args.plot is not None:
+            self._model.write_dot(self._args.plot, oformat="pdf")
+
+
+def read_records(filename):
+    """Returns the records of a .json or .csv file (values of a .csv file
+    are strings)."""
+    with open(filename, newline='') as f:
+        if filename.endswith('.json'):
+            return json.load(f)
+        elif filename.endswith('.csv'):
+            return list(csv.DictReader(f))
+    raise RuntimeError("Unknown file format of {}.".format(filename))
+
+
+def write_records(filename, records):
+    """Appends records (dictionaries) to a .json or .csv file.
+
+    The columns of a .csv file are the fields of all its records, i.e., the
+    file is rewritten when the records have fields not in its header (empty
+    values for fields a record does not have).
+
+    """
+    exists = os.path.isfile(filename) and os.path.getsize(filename) > 0
+    if filename.endswith('.json'):
+        data = []
+        if exists:
+            with open(filename) as f:
+                data = json.load(f)
+        data.extend(records)
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=1)
+    elif filename.endswith('.csv'):
+        if len(records) == 0:
+            return
+        # measured times and histograms are not written
+        fields = []
+        for r in records:
+            fields.extend(k for k, v in r.items()
+                          if not isinstance(v, (list, dict))
+                          and k not in fields)
+        mode = 'a'
+        if exists:
+            with open(filename, newline='') as f:
+                header = next(csv.reader(f))
+            if all(k in header for k in fields):
+                fields = header
+            else:
+                # new fields, rewrite the file with the fields of both
+                records = read_records(filename) + list(records)
+                fields = header + [k for k in fields if k not in header]
+                mode, exists = 'w', False
+        with open(filename, mode, newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields,
+                                    extrasaction='ignore')
+            if not exists:
+                writer.writeheader()
+            writer.writerows(records)
+    else:
+        raise RuntimeError("Unknown file format of {}.".format(filename))
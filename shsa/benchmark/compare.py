@@ -0,0 +1,243 @@
+"""Compares the measurements of two benchmark runs.
+
+Loads the records of a baseline and a candidate (JSON or CSV files written by
+the benchmark, see `Benchmark.write`) and computes the speedup of the
+candidate per case, i.e., per algorithm and experiment parameters (the fields
+in `benchmark.CASE`, records of a case are pooled):
+
+  speedup = execution time of baseline / execution time of candidate
+
+The confidence interval of the speedup is estimated by bootstrapping when the
+measured times are available (JSON, or several records per case) and by a
+normal approximation from the summary otherwise (a single CSV record per
+case; median or mean only, for the confidence levels in `QUANTILES`). A case
+regresses when the candidate is slower by more than the threshold with the
+given confidence, i.e., the upper bound of the speedup's confidence interval
+is below 1 / (1 + threshold). Exits with 1 if any case regresses or is
+missing in the candidate (unless missing cases are allowed).
+
+The parameters of a case are normalized before comparison, so JSON and CSV
+records can be compared (a CSV file holds strings only, e.g., '' for None).
+
+  $ python3 -m benchmark compare baseline.json candidate.json -t 0.05
+
+"""
+
+import argparse
+import sys
+from collections import OrderedDict
+import numpy as np
+
+from benchmark.benchmark import CASE, read_records
+
+
+STATISTICS = {
+    'median': np.median,
+    'mean': np.mean,
+    'min': np.min,
+}
+"""Statistics of the execution times that can be compared."""
+
+STANDARD_ERRORS = {
+    'median': np.sqrt(np.pi / 2),
+    'mean': 1.0,
+}
+"""Standard error of a statistic in units of stddev / sqrt(n) (normal
+approximation)."""
+
+QUANTILES = {0.8: 1.282, 0.9: 1.645, 0.95: 1.96, 0.98: 2.326, 0.99: 2.576,
+             0.999: 3.291}
+"""Quantile of the standard normal distribution per (two-sided) confidence
+level."""
+
+
+def _normalize(value):
+    """Returns the value of a parameter independent of the file format, i.e.,
+    parses the strings of CSV records (None for empty strings)."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        if value in ['True', 'False']:
+            return value == 'True'
+        for parse in [int, float]:
+            try:
+                return parse(value)
+            except ValueError:
+                pass
+        return value
+    if isinstance(value, (list, dict)):
+        return str(value)
+    return value
+
+
+def cases(records, ignore=[]):
+    """Groups records by case (the fields of `CASE` except the ignored
+    ones)."""
+    groups = OrderedDict()
+    for r in records:
+        key = tuple((k, _normalize(r[k])) for k in CASE
+                    if k in r and k not in ignore)
+        groups.setdefault(key, []).append(r)
+    return groups
+
+
+def _samples(records, statistic):
+    """Returns the samples of a case, i.e., all measured times or the
+    statistic per record (None if there is only a single summary)."""
+    if all('times' in r for r in records):
+        return np.concatenate([np.asarray(r['times'], dtype=float)
+                               for r in records])
+    if len(records) > 1:
+        return np.array([float(r[statistic]) for r in records])
+    return None
+
+
+def speedup(baseline, candidate, statistic='median', confidence=0.95,
+            resamples=1000, seed=0):
+    """Returns the speedup of the candidate and its confidence interval.
+
+    baseline, candidate -- Records of a case.
+    statistic -- Statistic of the execution times to compare.
+    confidence -- Confidence level of the interval.
+    resamples -- Number of bootstrap resamples.
+    seed -- Seed of the bootstrap.
+
+    """
+    fct = STATISTICS[statistic]
+    b = _samples(baseline, statistic)
+    c = _samples(candidate, statistic)
+    alpha = (1 - confidence) / 2
+    if b is not None and c is not None:
+        if fct(c) <= 0:
+            raise RuntimeError("The {} of the candidate is not positive."
+                               .format(statistic))
+        s = fct(b) / fct(c)
+        rng = np.random.RandomState(seed)
+        rb = [fct(rng.choice(b, len(b))) for _ in range(resamples)]
+        rc = [fct(rng.choice(c, len(c))) for _ in range(resamples)]
+        ratios = np.array(rb) / np.array(rc)
+        low, high = np.percentile(ratios, [100 * alpha, 100 * (1 - alpha)])
+        return s, low, high
+    # normal approximation of the ratio of the statistics (delta method)
+    if statistic not in STANDARD_ERRORS:
+        raise RuntimeError("The {} cannot be compared without the measured "
+                           "times.".format(statistic))
+    if confidence not in QUANTILES:
+        raise RuntimeError("Unsupported confidence level {} (supported: "
+                           "{}).".format(confidence, sorted(QUANTILES)))
+    xb, sb, nb = [float(baseline[0][k]) for k in [statistic, 'stddev', 'n']]
+    xc, sc, nc = [float(candidate[0][k]) for k in [statistic, 'stddev', 'n']]
+    if xb <= 0 or xc <= 0:
+        raise RuntimeError("The {} of the baseline or candidate is not "
+                           "positive.".format(statistic))
+    s = xb / xc
+    se = s * STANDARD_ERRORS[statistic] * np.sqrt(
+        sb**2 / nb / xb**2 + sc**2 / nc / xc**2)
+    z = QUANTILES[confidence]
+    return s, s - z * se, s + z * se
+
+
+def compare(baseline, candidate, threshold=0.05, statistic='median',
+            confidence=0.95, ignore=[]):
+    """Compares two lists of records.
+
+    Returns a list of rows (ordered dictionaries) per case of the baseline;
+    the status of a row is 'regression', 'faster', 'ok' or 'missing' (case
+    not in the candidate).
+
+    """
+    candidates = cases(candidate, ignore)
+    rows = []
+    for key, b in cases(baseline, ignore).items():
+        row = OrderedDict(key)
+        row['baseline'] = np.median([float(r[statistic]) for r in b])
+        if key not in candidates:
+            row['status'] = 'missing'
+            rows.append(row)
+            continue
+        c = candidates[key]
+        row['candidate'] = np.median([float(r[statistic]) for r in c])
+        s, low, high = speedup(b, c, statistic, confidence)
+        row['speedup'], row['low'], row['high'] = s, low, high
+        if high < 1 / (1 + threshold):
+            row['status'] = 'regression'
+        elif low > 1 + threshold:
+            row['status'] = 'faster'
+        else:
+            row['status'] = 'ok'
+        rows.append(row)
+    return rows
+
+
+def table(rows):
+    """Returns the comparison as text table (times in ms)."""
+    if len(rows) == 0:
+        return ""
+    # show varying parameters only
+    params = [k for k in rows[0].keys()
+              if k not in ['baseline', 'candidate', 'speedup', 'low', 'high',
+                           'status']]
+    params = [k for k in params
+              if k == 'algorithm' or len(set(r[k] for r in rows)) > 1]
+    header = params + ['baseline', 'candidate', 'speedup', 'ci', 'status']
+    lines = []
+    for r in rows:
+        line = [r[k] for k in params]
+        line.append("{:.3f}".format(r['baseline'] * 1e-6))
+        if r['status'] == 'missing':
+            line.extend(['-', '-', '-'])
+        else:
+            line.append("{:.3f}".format(r['candidate'] * 1e-6))
+            line.append("{:.2f}".format(r['speedup']))
+            line.append("[{:.2f}, {:.2f}]".format(r['low'], r['high']))
+        line.append(r['status'])
+        lines.append(line)
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *lines)]
+    fmt = "  ".join("{:>%d}" % w for w in widths)
+    return "\n".join([fmt.format(*header)]
+                     + [fmt.format(*line) for line in lines])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="""Compares the
+    measurements of a candidate against a baseline. Exits with 1 if a case
+    regresses or is missing.""")
+    parser.add_argument('baseline', type=str,
+                        help="""Results of the baseline (.json or .csv).""")
+    parser.add_argument('candidate', type=str,
+                        help="""Results of the candidate (.json or .csv).""")
+    parser.add_argument('-t', '--threshold', type=float, default=0.05,
+                        help="""Tolerated slowdown (e.g., 0.05 for 5%%).""")
+    parser.add_argument('-s', '--statistic', type=str, default='median',
+                        choices=sorted(STATISTICS.keys()),
+                        help="""Statistic of the execution times to
+                        compare.""")
+    parser.add_argument('-c', '--confidence', type=float, default=0.95,
+                        help="""Confidence level of the speedup interval
+                        (one of {} if only summaries are
+                        compared).""".format(
+                            ", ".join(str(c) for c in sorted(QUANTILES))))
+    parser.add_argument('-i', '--ignore', type=str, nargs='*', default=[],
+                        help="""Fields that do not distinguish cases, e.g.,
+                        model (records of these cases are pooled).""")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="""Do not fail if cases of the baseline are
+                        missing in the candidate.""")
+    args = parser.parse_args(argv)
+    rows = compare(read_records(args.baseline), read_records(args.candidate),
+                   args.threshold, args.statistic, args.confidence,
+                   args.ignore)
+    print(table(rows))
+    regressions = [r for r in rows if r['status'] == 'regression']
+    missing = [r for r in rows if r['status'] == 'missing']
+    print("\n{} cases, {} regressions, {} missing".format(
+        len(rows), len(regressions), len(missing)))
+    if len(regressions) > 0:
+        return 1
+    if len(missing) > 0 and not args.allow_missing:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,10 @@
-import networkx as nx
+from benchmark.benchmark import Benchmark
+from benchmark.generators import balanced_tree
 
-import benchmark
-from model.shsamodel import SHSAModel, SHSANodeType
 
-
-class Ex1(benchmark.Benchmark):
-    def __init__(self):
-        super(Ex1, self).__init__()
+class Ex1(Benchmark):
+    def __init__(self, argv=None):
+        super(Ex1, self).__init__(argv=argv)
 
     def _parse_args(self):
         super(Ex1, self)._parse_args()
@@ -18,58 +16,10 @@ class Ex1(benchmark.Benchmark):
                                   help="""Plots the model to the given
                                   filename (without extension).""")
 
-    def __properties_type(self):
-        props_type = {}
-        # (linear) walk through nodes to set type
-        first_node = 0
-        ntypes = [SHSANodeType.V, SHSANodeType.R]
-        for d in range(self._args.depth + 1):
-            # number of nodes at level d
-            num_nodes = self._args.branch**d
-            # set equal type on level d
-            ntype = ntypes[d % 2]
-            for n in range(first_node, first_node + num_nodes):
-                props_type[n] = ntype
-            # set id of first node of next level
-            first_node = first_node + num_nodes
-        return props_type
-
-    def __properties_provided(self):
-        props_prov = {}
-        # (linear) walk through nodes to set provided
-        first_node = 0
-        for d in range(0, self._args.depth + 1):
-            # number of nodes at level d
-            num_nodes = self._args.branch**d
-            # skip relations
-            if (d % 2) == 1:
-                first_node = first_node + num_nodes
-                continue
-            # set provided value of leaves to True
-            for n in range(first_node, first_node + num_nodes):
-                if d == self._args.depth:
-                    props_prov[n] = True
-                else:
-                    props_prov[n] = False
-            # set id of first node of next level
-            first_node = first_node + num_nodes
-        return props_prov
-
     def setup(self):
-        # args check
-        if self._args.depth % 2 == 1:
-            raise RuntimeError("""Depth must be an even number (leaves of the
-            graph must be variables).""")
-        # generate graph structure
-        G = nx.generators.classic.balanced_tree(self._args.branch,
-                                                self._args.depth)
-        G = G.to_directed()
-        # properties
-        props = {}
-        props['type'] = self.__properties_type()
-        props['provided'] = self.__properties_provided()
         # set internal variables model and root for experiment
-        self._model = SHSAModel(G, properties=props)
+        self._model = balanced_tree(self._args.branch, self._args.depth,
+                                    seed=self._args.seed)
         self._root = 0
 
     def check(self, algorithms=[]):
@@ -103,6 +53,12 @@ class Ex1(benchmark.Benchmark):
                     if len(diff2) > 0:
                         print("  {} - {}: {}".format(a2, a1, diff2))
 
+    def parameters(self):
+        params = super(Ex1, self).parameters()
+        params['branch'] = self._args.branch
+        params['depth'] = self._args.depth
+        return params
+
     def __str__(self):
         ret = "\n"
         if self._failed:
@@ -141,4 +97,5 @@ if __name__ == "__main__":
             ex.check(algs)
         ex.export_model()
         print("\nmeasurements:")
-        # here come the profilehooks results
+        print(ex.report())
+        ex.write()
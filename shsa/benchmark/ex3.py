@@ -1,16 +1,10 @@
-import networkx as nx
-import random
-import numpy as np
+from benchmark.benchmark import GeneratorBenchmark, names
+from benchmark.generators import balanced_tree
 
-from benchmark import Benchmark
-from model.shsamodel import SHSAModel, SHSANodeType
 
-
-class Ex3(Benchmark):
-    def __init__(self):
-        super(Ex3, self).__init__()
-        self.__visited = None
-        random.seed()  # initialize random number generator
+class Ex3(GeneratorBenchmark):
+    def __init__(self, argv=None):
+        super(Ex3, self).__init__(argv=argv)
 
     def _parse_args(self):
         super(Ex3, self)._parse_args()
@@ -25,141 +19,31 @@ class Ex3(Benchmark):
                                   help="""Assigns a random cost [1,10] to a
                                   relation.""")
         self._parser.add_argument('algorithms', type=str, nargs='+',
-                                  choices=['rss', 'rss_once', 'orr', 'dfs',
-                                           'dfs_mem'], help="""Algorithms to
-                                           execute.""")
+                                  choices=names(), help="""Algorithms to
+                                  execute.""")
         self._parser.add_argument('-p', '--plot', type=str,
                                   help="""Plots the model to the given
                                   filename (without extension).""")
 
-    def __properties_type(self):
-        props_type = {}
-        # (linear) walk through nodes to set type
-        first_node = 0
-        ntypes = [SHSANodeType.V, SHSANodeType.R]
-        for d in range(self._args.depth + 1):
-            # number of nodes at level d
-            num_nodes = self._args.branch**d
-            # set equal type on level d
-            ntype = ntypes[d % 2]
-            for n in range(first_node, first_node + num_nodes):
-                props_type[n] = ntype
-            # set id of first node of next level
-            first_node = first_node + num_nodes
-        return props_type
-
-    def __properties_provided(self):
-        props_prov = {}
-        # variable to substitute always not provided
-        props_prov[0] = False
-        # (linear) walk through nodes to set provided
-        availability = np.linspace(self._args.availability, 1.0,
-                                   self._args.depth)
-        first_node = 1
-        for d in range(1, self._args.depth + 1):
-            # number of nodes at level d
-            num_nodes = self._args.branch**d
-            # skip relations
-            if (d % 2) == 1:
-                first_node = first_node + num_nodes
-                continue
-            # set provided value randomly
-            for n in range(first_node, first_node + num_nodes):
-                props_prov[n] = random.uniform(0, 1) <= availability[d-1]
-            # set id of first node of next level
-            first_node = first_node + num_nodes
-        return props_prov
-
-    # have no effect, because also completely random - branches equal
-    def __properties_cost(self):
-        props_cost = {}
-        # (linear) walk through nodes to set provided
-        first_node = 0
-        for d in range(0, self._args.depth + 1):
-            # number of nodes at level d
-            num_nodes = self._args.branch**d
-            # skip variables
-            if (d % 2) == 0:
-                first_node = first_node + num_nodes
-                continue
-            # set cost randomly
-            for n in range(first_node, first_node + num_nodes):
-                props_cost[n] = random.uniform(1, 10)
-            # set id of first node of next level
-            first_node = first_node + num_nodes
-        return props_cost
-
     def setup(self):
-        # args check
-        if self._args.depth % 2 == 1:
-            raise RuntimeError("""Depth must be an even number (leaves of the
-            graph must be variables).""")
-        # generate graph structure
-        G = nx.generators.classic.balanced_tree(self._args.branch,
-                                                self._args.depth)
-        G = G.to_directed()
-        # properties
-        props = {}
-        props['type'] = self.__properties_type()
-        props['provided'] = self.__properties_provided()
-        if self._args.costs:
-            props['cost'] = self.__properties_cost()
         # set internal variables model and root for experiment
-        self._model = SHSAModel(G, properties=props)
+        self._model = balanced_tree(self._args.branch, self._args.depth,
+                                    availability=self._args.availability,
+                                    costs=self._args.costs,
+                                    seed=self._args.seed)
         self._root = 0
 
-    def check(self, algorithms=[]):
-        if not self._failed:
-            # check results
-            # single results won't be compared
-            single = True
-            for alg, sublist in self._results.items():
-                # check only listed algorithms
-                if alg not in algorithms:
-                    continue
-                if len(sublist) != 1:
-                    single = False
-                print("\n  {}:".format(alg))
-                print("    len: {}".format(len(sublist)))
-                if self._failed:
-                    print("    S: {}".format(list(sublist)))
-            # compare results
-            print()
-            if single:
-                return
-            for a1, s1 in self._results.items():
-                for a2, s2 in self._results.items():
-                    # check only listed algorithms
-                    if not (a1 in algorithms and a2 in algorithms):
-                        continue
-                    diff1 = s1.relations() - s2.relations()
-                    diff2 = s2.relations() - s1.relations()
-                    if len(diff1) > 0:
-                        print("  {} - {}: {}".format(a1, a2, diff1))
-                    if len(diff2) > 0:
-                        print("  {} - {}: {}".format(a2, a1, diff2))
-
-    def __str__(self):
-        ret = ""
-        if self._failed:
-            ret += "status: failed\n\n"
-            ret += "model:\n"
-            ret += "  nodes: {}\n".format(self._model.nodes())
-            ret += "  edges: {}\n\n".format(self._model.edges())
-        else:
-            ret += "status: ok\n\n"
-        ret += "parameters:\n"
-        ret += "  ncalls: {}\n".format(self._args.ncalls)
-        ret += "  branch: {}\n".format(self._args.branch)
-        ret += "  depth: {}\n".format(self._args.depth)
-        ret += "  root: {}\n".format(self._root)
-        ret += "  numnodes: {}\n".format(len(self._model.nodes()))
-        ret += "  numedges: {}\n".format(len(self._model.edges()))
-        return ret
+    def _generator_parameters(self):
+        return [('branch', self._args.branch),
+                ('depth', self._args.depth)]
 
-    def export_model(self):
-        if self._args.plot is not None:
-            self._model.write_dot(self._args.plot, oformat="pdf")
+    def parameters(self):
+        params = super(Ex3, self).parameters()
+        params['branch'] = self._args.branch
+        params['depth'] = self._args.depth
+        params['availability'] = self._args.availability
+        params['costs'] = self._args.costs
+        return params
 
 
 if __name__ == "__main__":
@@ -177,4 +61,5 @@ if __name__ == "__main__":
             ex.check(algs)
         ex.export_model()
         print("\nmeasurements:")
-        # here come the profilehooks results
+        print(ex.report())
+        ex.write()
@@ -0,0 +1,75 @@
+"""Experiment on random models with shared variables and cycles (see
+`generators.random_dag`)."""
+
+from benchmark.benchmark import GeneratorBenchmark, names
+from benchmark.generators import random_dag
+
+
+class Ex5(GeneratorBenchmark):
+    def __init__(self, argv=None):
+        super(Ex5, self).__init__(argv=argv)
+
+    def _parse_args(self):
+        super(Ex5, self)._parse_args()
+        self._parser.add_argument('-v', '--variables', type=int,
+                                  default=20, help="Number of variables.")
+        self._parser.add_argument('-b', '--branch', type=int, default=2,
+                                  help="""Maximum number of relations per
+                                  variable.""")
+        self._parser.add_argument('-i', '--inputs', type=int, default=3,
+                                  help="""Maximum number of inputs of a
+                                  relation.""")
+        self._parser.add_argument('-r', '--bidirectional', type=float,
+                                  default=0.2, help="""Probability that a
+                                  relation is bidirectional in [0,1].""")
+        self._parser.add_argument('-a', '--availability', type=float,
+                                  default=0.5, help="""Probability that a
+                                  variable is provided in [0,1].""")
+        self._parser.add_argument('algorithms', type=str, nargs='+',
+                                  choices=names(), help="""Algorithms to
+                                  execute.""")
+        self._parser.add_argument('-p', '--plot', type=str,
+                                  help="""Plots the model to the given
+                                  filename (without extension).""")
+
+    def setup(self):
+        # set internal variables model and root for experiment
+        self._model = random_dag(self._args.variables, self._args.branch,
+                                 self._args.inputs, self._args.bidirectional,
+                                 self._args.availability, seed=self._args.seed)
+        self._root = 0
+
+    def _generator_parameters(self):
+        return [('variables', self._args.variables),
+                ('branch', self._args.branch),
+                ('inputs', self._args.inputs),
+                ('bidirectional', self._args.bidirectional),
+                ('availability', self._args.availability)]
+
+    def parameters(self):
+        params = super(Ex5, self).parameters()
+        params['variables'] = self._args.variables
+        params['branch'] = self._args.branch
+        params['inputs'] = self._args.inputs
+        params['bidirectional'] = self._args.bidirectional
+        params['availability'] = self._args.availability
+        return params
+
+
+if __name__ == "__main__":
+    ex = Ex5()
+    ex.setup()
+    try:
+        groups = ex.run(ex._args.algorithms)
+    except Exception as e:
+        raise
+    finally:
+        print(ex)
+        # separately check different types of algorithms executed by run
+        print("results:")
+        for algs in groups:
+            ex.check(algs)
+        ex.export_model()
+        print("\nmeasurements:")
+        print(ex.report())
+        ex.write()
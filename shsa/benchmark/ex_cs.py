@@ -1,12 +1,12 @@
 import networkx as nx
 
-import benchmark
+from benchmark.benchmark import Benchmark
 from model.shsamodel import SHSAModel, SHSANodeType
 
 
-class CaseStudy(benchmark.Benchmark):
-    def __init__(self):
-        super(CaseStudy, self).__init__()
+class CaseStudy(Benchmark):
+    def __init__(self, argv=None):
+        super(CaseStudy, self).__init__(argv=argv)
 
     def _parse_args(self):
         super(CaseStudy, self)._parse_args()
@@ -55,6 +55,11 @@ class CaseStudy(benchmark.Benchmark):
                     if len(diff2) > 0:
                         print("  {} - {}: {}".format(a2, a1, diff2))
 
+    def parameters(self):
+        params = super(CaseStudy, self).parameters()
+        params['configfile'] = self._args.configfile
+        return params
+
     def __str__(self):
         ret = "\n"
         if self._failed:
@@ -92,4 +97,5 @@ if __name__ == "__main__":
         for algs in groups:
             ex.check(algs)
         print("\nmeasurements:")
-        # here come the profilehooks results
+        print(ex.report())
+        ex.write()
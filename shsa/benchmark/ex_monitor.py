@@ -0,0 +1,402 @@
+"""Throughput benchmark of the SHSA monitor.
+
+Generates a stream of itoms for a scenario (model and monitored domains),
+injects faults and feeds the samples to a `SHSAMonitor` per domain, i.e., the
+production path from `SHSAMonitor.monitor` to `EvaluationPlan.execute`,
+`FaultAgreement.agree` and `Logger.log`.
+
+Scenarios:
+- radar: Positions of a vehicle in the field of view of a radar sensor
+  (config/radar-tracking.yaml), monitored in the domains x and y. The
+  position is redundantly given by the track of a neighboring sensor and by
+  the last observation of the track (forward estimate).
+- drivetrain: Speed, lateral acceleration and wheel speeds of a car
+  (config/drivetrain.yaml), monitored in the domain of the curve radius.
+
+A fault adds an offset (random sign) to a randomly selected itom of a sample.
+The stream is generated before the measurement, i.e., the generation is not
+measured.
+
+The samples are monitored twice (each time with new monitors and after
+warmup samples that include the search of the substitutions):
+1. Unpatched, measuring each monitor call (stage 'monitor', samples/s),
+   optionally profiled (`--profile`).
+2. With each call of the stages measured (stages 'execute', 'agree' and
+   'log'), note that the measurement adds overhead to the monitor calls.
+
+The execution times are summarized per stage incl. a histogram with
+logarithmic bins. Run from the shsa directory:
+
+  $ python3 -m benchmark.ex_monitor radar -n 1000 -f 0.1 -o monitor.json
+
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+
+from benchmark.benchmark import statistics, histogram, time_calls, \
+    write_records
+from model.shsamodel import SHSAModel
+from monitor.shsamonitor import SHSAMonitor
+from monitor.fault import FaultAgreement, ItomFaultStatusType
+from monitor.plan import EvaluationPlan
+from utils.logger import Logger
+from utils.profiler import profile
+
+
+class ItomStream(object):
+    """Generates samples of itoms of a scenario."""
+
+    configfile = None
+    """Default model of the scenario."""
+    domains = []
+    """Variables where the itoms are compared."""
+    faulty = []
+    """Itoms that may be faulty."""
+    noise = 0.0
+    """Default standard deviation of the noise added to the itoms."""
+
+    def __init__(self, fault_rate=0.0, fault_offset=1.0, noise=None,
+                 seed=None):
+        """Initializes the stream.
+
+        fault_rate -- Probability that a sample contains a faulty itom.
+        fault_offset -- Offset added to a faulty itom.
+        noise -- Standard deviation of the (gaussian) noise added to the
+            itoms (defaults to the noise of the scenario).
+        seed -- Seed of the random number generator.
+
+        """
+        self.__rng = random.Random(seed)
+        self.__fault_rate = fault_rate
+        self.__fault_offset = fault_offset
+        self.__noise = noise if noise is not None else self.noise
+
+    @property
+    def rng(self):
+        return self.__rng
+
+    def sample(self, k):
+        """Returns the itoms of the k-th sample (without noise)."""
+        raise NotImplementedError
+
+    def samples(self, n):
+        """Returns n samples, i.e., a list of itoms (name to value) and the
+        faulty itom (None if the sample is correct)."""
+        samples = []
+        for k in range(n):
+            itoms = self.sample(k)
+            if self.__noise > 0:
+                for i in self.faulty:
+                    itoms[i] += self.__rng.gauss(0, self.__noise)
+            fault = None
+            if self.__rng.uniform(0, 1) < self.__fault_rate:
+                fault = self.__rng.choice(self.faulty)
+                itoms[fault] += self.__rng.choice([-1, 1]) \
+                    * self.__fault_offset
+            samples.append((itoms, fault))
+        return samples
+
+
+class RadarStream(ItomStream):
+    """Positions of a vehicle within the field of view of the monitored
+    radar sensor (see constants in config/radar-tracking.yaml)."""
+
+    configfile = "../config/radar-tracking.yaml"
+    domains = ['x', 'y']
+    faulty = ['x', 'y', 'x_nbr', 'y_nbr', 'x_old', 'y_old']
+    noise = 0.01
+
+    location = (259.81, -150)
+    """Location of the sensor."""
+    heading = -0.523598783
+    """Heading of the vehicles."""
+    speed = 10.0
+    """Speed of the vehicles."""
+    period = 0.1
+    """Period of the samples."""
+
+    def sample(self, k):
+        # random position in the field of view (in front of the sensor)
+        distance = self.rng.uniform(5, 35)
+        angle = self.rng.uniform(-0.4, 0.4)
+        x = self.location[0] + distance * math.cos(angle)
+        y = self.location[1] + distance * math.sin(angle)
+        vx = self.speed * math.cos(self.heading)
+        vy = self.speed * math.sin(self.heading)
+        t = k * self.period
+        itoms = OrderedDict()
+        itoms['t'] = t
+        itoms['x'] = x
+        itoms['y'] = y
+        itoms['x_nbr'] = x
+        itoms['y_nbr'] = y
+        itoms['t_old'] = t - self.period
+        itoms['x_old'] = x - vx * self.period
+        itoms['y_old'] = y - vy * self.period
+        itoms['vx_old'] = vx
+        itoms['vy_old'] = vy
+        return itoms
+
+
+class DrivetrainStream(ItomStream):
+    """Speed, lateral acceleration and wheel speeds of a car driving
+    curves (see config/drivetrain.yaml)."""
+
+    configfile = "../config/drivetrain.yaml"
+    domains = ['curve_radius']
+    faulty = ['/car/speed', '/car/lateral_acceleration', '/car/w_l',
+              '/car/w_r']
+    noise = 1e-6
+
+    track_width = 1.5
+    dynamic_radius = 0.3
+
+    def sample(self, k):
+        speed = self.rng.uniform(5, 30)
+        radius = self.rng.uniform(20, 200)
+        # angular speed of the wheels (outer wheel is faster)
+        w = speed / self.dynamic_radius
+        offset = self.track_width / (2 * radius)
+        itoms = OrderedDict()
+        itoms['/car/speed'] = speed
+        itoms['/car/lateral_acceleration'] = speed**2 / radius
+        itoms['/car/track_width'] = self.track_width
+        itoms['/car/w_l'] = w * (1 + offset)
+        itoms['/car/w_r'] = w * (1 - offset)
+        return itoms
+
+
+SCENARIOS = OrderedDict([
+    ('radar', RadarStream),
+    ('drivetrain', DrivetrainStream),
+])
+"""Scenarios (name to stream)."""
+
+STAGES = OrderedDict([
+    ('execute', (EvaluationPlan, 'execute')),
+    ('agree', (FaultAgreement, 'agree')),
+    ('log', (Logger, 'log')),
+])
+"""Measured stages of a monitor call."""
+
+
+class MonitorBenchmark(object):
+
+    def __init__(self, argv=None):
+        """Initializes the benchmark.
+
+        argv -- List of command line arguments (defaults to the arguments of
+            the script).
+
+        """
+        self._parser = argparse.ArgumentParser(description="""Measures the
+        throughput of the SHSA monitor.""")
+        self._parse_args()
+        self._args = self._parser.parse_args(argv)
+        self._stream = None
+        self._model = None
+        self._samples = []
+        self._measurements = OrderedDict()
+        self._detection = OrderedDict()
+
+    def _parse_args(self):
+        self._parser.add_argument('scenario', type=str,
+                                  choices=list(SCENARIOS.keys()),
+                                  help="""Scenario, i.e., model, domains and
+                                  itoms.""")
+        self._parser.add_argument('-m', '--model', type=str,
+                                  help="""Model (config file) of the scenario
+                                  (default: the scenario's model).""")
+        self._parser.add_argument('-n', '--samples', type=int, default=1000,
+                                  help="""Number of measured samples.""")
+        self._parser.add_argument('-w', '--warmup', type=int, default=1,
+                                  help="""Number of samples before the
+                                  measurement.""")
+        self._parser.add_argument('-f', '--fault-rate', type=float,
+                                  default=0.0, help="""Probability that a
+                                  sample contains a faulty itom in
+                                  [0,1].""")
+        self._parser.add_argument('--fault-offset', type=float, default=1.0,
+                                  help="""Offset added to a faulty itom.""")
+        self._parser.add_argument('--noise', type=float,
+                                  help="""Standard deviation of the noise
+                                  added to the itoms (default: scenario's
+                                  noise).""")
+        self._parser.add_argument('--no-log', dest='log',
+                                  action='store_false', help="""Skip the
+                                  logging of the monitors (to temporary
+                                  files).""")
+        self._parser.add_argument('-o', '--output', type=str,
+                                  help="""Appends the measurements to the
+                                  given file (.json or .csv).""")
+        self._parser.add_argument('-s', '--seed', type=int,
+                                  help="""Seed of the stream generator
+                                  (default: random stream).""")
+        self._parser.add_argument('--profile', type=str, metavar='FILE',
+                                  help="""Writes the profile (cProfile) of
+                                  the measured monitor calls to the given
+                                  file.""")
+
+    def setup(self):
+        cls = SCENARIOS[self._args.scenario]
+        self._stream = cls(self._args.fault_rate, self._args.fault_offset,
+                           self._args.noise, self._args.seed)
+        configfile = self._args.model or cls.configfile
+        self._model = SHSAModel(configfile=configfile)
+        self._samples = self._stream.samples(self._args.warmup
+                                             + self._args.samples)
+
+    def __monitors(self, logdir):
+        monitors = []
+        for domain in self._stream.domains:
+            logfile = None
+            if logdir is not None:
+                logfile = os.path.join(logdir, domain + ".yaml")
+            monitors.append(SHSAMonitor(self._model, domain,
+                                        logfile=logfile))
+        return monitors
+
+    def __monitor(self, monitors, itoms):
+        """Monitors a sample, returns the worst status per itom over all
+        domains."""
+        status = {}
+        for m in monitors:
+            for i, s in m.monitor(itoms).items():
+                status[i] = max(status.get(i, s), s)
+        return status
+
+    def __pass(self, measure):
+        """Monitors the samples with new monitors.
+
+        measure -- Measure each monitor call (otherwise the stages are
+            measured).
+
+        Returns the execution times per monitor call or per stage, and the
+        status of the measured samples.
+
+        """
+        logdir = tempfile.mkdtemp() if self._args.log else None
+        try:
+            monitors = self.__monitors(logdir)
+            warmup = self._samples[:self._args.warmup]
+            samples = self._samples[self._args.warmup:]
+            for itoms, _ in warmup:
+                self.__monitor(monitors, itoms)
+            status = []
+            if measure:
+                times = []
+                with profile(self._args.profile):
+                    for itoms, _ in samples:
+                        start = time.perf_counter_ns()
+                        status.append(self.__monitor(monitors, itoms))
+                        times.append(time.perf_counter_ns() - start)
+                return OrderedDict([('monitor', times)]), status
+            with time_calls(STAGES) as times:
+                for itoms, _ in samples:
+                    status.append(self.__monitor(monitors, itoms))
+            return times, status
+        finally:
+            if logdir is not None:
+                shutil.rmtree(logdir)
+
+    def run(self):
+        """Monitors the samples and measures the monitor calls and its
+        stages."""
+        self._measurements, status = self.__pass(measure=True)
+        stages, _ = self.__pass(measure=False)
+        for stage, times in stages.items():
+            if len(times) > 0:
+                self._measurements[stage] = times
+        # detection of the injected faults (note that the monitor marks all
+        # inputs of a failed substitution faulty, i.e., false alarms include
+        # the correct inputs of a substitution with a faulty input)
+        faults = identified = detected = false_alarms = 0
+        samples = self._samples[self._args.warmup:]
+        for (_, fault), s in zip(samples, status):
+            for itom, st in s.items():
+                if itom == fault:
+                    faults += 1
+                    detected += st != ItomFaultStatusType.OK
+                    identified += st == ItomFaultStatusType.FAULTY
+                elif st == ItomFaultStatusType.FAULTY:
+                    false_alarms += 1
+        self._detection['faults'] = faults
+        self._detection['detected'] = detected
+        self._detection['identified'] = identified
+        self._detection['false_alarms'] = false_alarms
+
+    def parameters(self):
+        """Returns the parameters of the experiment."""
+        params = OrderedDict()
+        params['scenario'] = self._args.scenario
+        params['domains'] = ",".join(self._stream.domains)
+        params['samples'] = self._args.samples
+        params['warmup'] = self._args.warmup
+        params['fault_rate'] = self._args.fault_rate
+        params['fault_offset'] = self._args.fault_offset
+        params['noise'] = self._args.noise
+        params['log'] = self._args.log
+        params['seed'] = self._args.seed
+        return params
+
+    def throughput(self):
+        """Returns the number of monitored samples per second."""
+        times = self._measurements.get('monitor', [])
+        if len(times) == 0:
+            return None
+        return len(times) / (sum(times) * 1e-9)
+
+    def records(self):
+        """Returns the measurements, one record per stage, including the
+        parameters of the experiment, the throughput, the detected faults and
+        the histogram of the execution times."""
+        records = []
+        for stage, times in self._measurements.items():
+            record = self.parameters()
+            record['stage'] = stage
+            record['calls'] = len(times)
+            record.update(statistics(times))
+            record['throughput'] = self.throughput()
+            record.update(self._detection)
+            record['histogram'] = histogram(times)
+            record['times'] = times
+            records.append(record)
+        return records
+
+    def report(self):
+        """Returns the summary of the measurements (yaml)."""
+        ret = "throughput: {:.1f}\n".format(self.throughput())
+        for key, value in self._detection.items():
+            ret += "{}: {}\n".format(key, value)
+        ret += "stages:\n"
+        for stage, times in self._measurements.items():
+            ret += "  {}:\n".format(stage)
+            ret += "    calls: {}\n".format(len(times))
+            for key, value in statistics(times).items():
+                ret += "    {}: {}\n".format(key, value)
+            ret += "    histogram:\n"
+            for bound, count in histogram(times).items():
+                ret += "      {}: {}\n".format(bound, count)
+        return ret
+
+    def write(self, filename=None):
+        """Appends the measurements to a file (see `Benchmark.write`)."""
+        filename = filename if filename is not None else self._args.output
+        if filename is None:
+            return
+        write_records(filename, self.records())
+
+
+if __name__ == "__main__":
+    ex = MonitorBenchmark()
+    ex.setup()
+    ex.run()
+    print(ex.report())
+    ex.write()
@@ -0,0 +1,162 @@
+"""Generators of synthetic SHSA models for benchmarks.
+
+The nodes are numbered (integers), the root, i.e., the variable to substitute,
+is node 0 and is not provided. The generators are seeded (`seed` is an integer
+or a `random.Random` instance), i.e., the same seed generates the same model.
+
+- `balanced_tree`: Each variable is the output of `branch` relations, each
+  relation has `branch` input variables. The edges are bidirectional (a
+  relation is connected to its variables in both directions).
+- `random_tree`: A tree where each node has a random number (1 to `branch`) of
+  predecessors.
+- `random_dag`: Relations get their inputs from a pool of variables, i.e.,
+  variables are shared between relations. Bidirectional relations (each
+  variable may be the output) introduce cycles as in real models.
+
+The models are built at once from lists of nodes and edges (see `SHSAModel`).
+
+"""
+
+import random
+import numpy as np
+
+from model.shsamodel import SHSAModel, SHSANodeType
+
+
+def _random(seed):
+    """Returns a random number generator given a seed."""
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+
+def _availability(availability, depth):
+    """Returns the probability that a variable is provided per depth (1 to
+    depth); increases linearly from `availability` to 1."""
+    return np.linspace(availability, 1.0, depth)
+
+
+def balanced_tree(branch, depth, availability=None, costs=False, seed=None):
+    """Returns a balanced tree.
+
+    branch -- Branching factor.
+    depth -- Depth of the tree (must be even, i.e., the leaves are
+        variables).
+    availability -- Probability that a variable at depth 1 is provided in
+        [0,1] (linearly increases to 1 for the leaves). If None, only the
+        leaves are provided.
+    costs -- Assigns a random cost [1,10] to each relation.
+    seed -- Seed of the random number generator.
+
+    """
+    if depth % 2 == 1:
+        raise RuntimeError("""Depth must be an even number (leaves of the
+        graph must be variables).""")
+    rng = _random(seed)
+    if availability is not None:
+        availability = _availability(availability, depth)
+    nodes = []
+    edges = []
+    first = 0
+    for d in range(depth + 1):
+        num = branch**d
+        for n in range(first, first + num):
+            props = {}
+            if d % 2 == 0:
+                props['type'] = SHSANodeType.V
+                if availability is None:
+                    props['provided'] = d == depth
+                elif d == 0:
+                    props['provided'] = False
+                else:
+                    props['provided'] = \
+                        rng.uniform(0, 1) <= availability[d-1]
+            else:
+                props['type'] = SHSANodeType.R
+            nodes.append((n, props))
+            if d < depth:
+                for c in range(n*branch + 1, n*branch + branch + 1):
+                    edges.extend([(n, c), (c, n)])
+        first += num
+    if costs:
+        for n, props in nodes:
+            if props['type'] == SHSANodeType.R:
+                props['cost'] = rng.uniform(1, 10)
+    return SHSAModel(nodes=nodes, edges=edges)
+
+
+def random_tree(branch, depth, availability=0.5, seed=None):
+    """Returns a tree with a random number of predecessors per node.
+
+    branch -- Maximum number of predecessors of a node (at least 1).
+    depth -- Depth of the tree (must be even; the nodes at even depth are
+        variables, the others relations, i.e., the leaves are variables).
+    availability -- Probability that a variable at depth 1 is provided in
+        [0,1] (linearly increases to 1 for the leaves).
+    seed -- Seed of the random number generator.
+
+    """
+    if depth % 2 == 1:
+        raise RuntimeError("""Depth must be an even number (leaves of the
+        graph must be variables).""")
+    rng = _random(seed)
+    availability = _availability(availability, depth)
+    nodes = [(0, {'type': SHSANodeType.V, 'provided': False})]
+    edges = []
+    level = [0]
+    for d in range(1, depth + 1):
+        ntype = SHSANodeType.V if d % 2 == 0 else SHSANodeType.R
+        nextlevel = []
+        for n in level:
+            for _ in range(rng.randint(1, branch)):
+                c = len(nodes)
+                props = {'type': ntype}
+                if ntype == SHSANodeType.V:
+                    props['provided'] = \
+                        rng.uniform(0, 1) <= availability[d-1]
+                nodes.append((c, props))
+                edges.append((c, n))
+                nextlevel.append(c)
+        level = nextlevel
+    return SHSAModel(nodes=nodes, edges=edges)
+
+
+def random_dag(variables, branch=2, inputs=3, bidirectional=0.2,
+               availability=0.5, seed=None):
+    """Returns a model where variables are shared between relations.
+
+    The variables are numbered 0 to variables-1. The inputs of a relation are
+    variables with a higher number than the output, i.e., the model is a
+    directed acyclic graph except for bidirectional relations.
+
+    variables -- Number of variables.
+    branch -- Maximum number of relations per output variable (the root has
+        at least one).
+    inputs -- Maximum number of inputs of a relation.
+    bidirectional -- Probability that a relation can be executed towards each
+        of its variables (creates cycles).
+    availability -- Probability that a variable (except the root) is
+        provided.
+    seed -- Seed of the random number generator.
+
+    """
+    rng = _random(seed)
+    nodes = [(0, {'type': SHSANodeType.V, 'provided': False})]
+    for v in range(1, variables):
+        provided = rng.uniform(0, 1) <= availability
+        nodes.append((v, {'type': SHSANodeType.V, 'provided': provided}))
+    edges = []
+    r = variables
+    for v in range(variables - 1):
+        for _ in range(rng.randint(1 if v == 0 else 0, branch)):
+            candidates = range(v + 1, variables)
+            rin = rng.sample(candidates,
+                             rng.randint(1, min(inputs, len(candidates))))
+            nodes.append((r, {'type': SHSANodeType.R}))
+            edges.extend([(i, r) for i in rin])
+            edges.append((r, v))
+            if rng.uniform(0, 1) < bidirectional:
+                edges.extend([(r, i) for i in rin])
+                edges.append((v, r))
+            r += 1
+    return SHSAModel(nodes=nodes, edges=edges)
@@ -0,0 +1,177 @@
+"""Parameter sweep of a benchmark experiment.
+
+Runs an experiment for every combination of the given parameter values (grid)
+and several models per combination. The models are generated in-process by
+the experiment and the runs are distributed to a pool of worker processes.
+The records of all runs are collected into a single file (see
+`Benchmark.write`).
+
+For instance, experiment 3 (100 models per branching factor, 8 worker
+processes each pinned to a core; the arguments after `--` are passed to the
+experiment):
+
+  $ python3 -m benchmark.sweep ex3 -g branch=1,2,3,4 -g depth=6 -m 100 -j 8 \\
+      --pin -o ex3.csv -- -n 10 -a 0.2 rss_once orr
+
+"""
+
+import argparse
+import importlib
+import itertools
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark.benchmark import write_records
+
+
+EXPERIMENTS = {
+    'ex1': ('benchmark.ex1', 'Ex1'),
+    'ex2': ('benchmark.ex2', 'Ex2'),
+    'ex3': ('benchmark.ex3', 'Ex3'),
+    'ex4': ('benchmark.ex4', 'Ex4'),
+    'ex5': ('benchmark.ex5', 'Ex5'),
+    'ex_cs': ('benchmark.ex_cs', 'CaseStudy'),
+    'ex_monitor': ('benchmark.ex_monitor', 'MonitorBenchmark'),
+}
+"""Experiments (name to module and class)."""
+
+
+def experiment(name):
+    """Returns the class of an experiment."""
+    module, cls = EXPERIMENTS[name]
+    return getattr(importlib.import_module(module), cls)
+
+
+def parse_grid(specs):
+    """Returns the parameter combinations given a list of 'name=v1,v2,..'
+    strings."""
+    names = []
+    values = []
+    for spec in specs:
+        if '=' not in spec:
+            raise RuntimeError("Invalid grid parameter {} (expected "
+                               "name=v1,v2,..).".format(spec))
+        name, vs = spec.split('=', 1)
+        names.append(name)
+        values.append(vs.split(','))
+    return [OrderedDict(zip(names, combination))
+            for combination in itertools.product(*values)]
+
+
+def arguments(params):
+    """Returns the command line arguments of a parameter combination."""
+    argv = []
+    for name, value in params.items():
+        argv.append(("-" if len(name) == 1 else "--") + name)
+        argv.append(value)
+    return argv
+
+
+def run(task):
+    """Runs an experiment with a new model and returns its records.
+
+    task -- Tuple of experiment name, arguments, parameter combination and
+        model number.
+
+    """
+    name, argv, params, model = task
+    ex = experiment(name)(arguments(params) + argv)
+    ex.setup()
+    algorithms = getattr(ex._args, 'algorithms', None)
+    if algorithms is None:
+        ex.run()
+    else:
+        ex.run(algorithms)
+    records = ex.records()
+    for r in records:
+        r['model'] = model
+    return records
+
+
+def _pin(counter):
+    """Pins the calling worker process to a single CPU."""
+    with counter.get_lock():
+        i = counter.value
+        counter.value += 1
+    cpus = sorted(os.sched_getaffinity(0))
+    os.sched_setaffinity(0, [cpus[i % len(cpus)]])
+
+
+def sweep(name, grid, models=1, argv=[], jobs=None, pin=False, seed=None):
+    """Runs an experiment for all parameter combinations.
+
+    name -- Name of the experiment.
+    grid -- List of parameter combinations (see `parse_grid`).
+    models -- Number of models per parameter combination.
+    argv -- Additional arguments of the experiment.
+    jobs -- Number of worker processes (defaults to the number of CPUs).
+    pin -- Pin each worker process to a single CPU.
+    seed -- Seed of the first model, model m is generated with seed + m
+        (i.e., the same models are used for all parameter combinations).
+
+    Returns the records of all runs (in the order of the grid).
+
+    """
+    tasks = []
+    for params in grid:
+        for m in range(models):
+            exargv = list(argv)
+            if seed is not None:
+                exargv.extend(['--seed', str(seed + m)])
+            tasks.append((name, exargv, params, m))
+    initializer, initargs = None, ()
+    if pin:
+        if not hasattr(os, 'sched_setaffinity'):
+            raise RuntimeError("Pinning is not supported on this platform.")
+        initializer, initargs = _pin, (multiprocessing.Value('i', 0),)
+    records = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer,
+                             initargs=initargs) as executor:
+        for i, r in enumerate(executor.map(run, tasks)):
+            records.extend(r)
+            print("{}/{} {}".format(i + 1, len(tasks), dict(tasks[i][2])),
+                  file=sys.stderr)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="""Runs a benchmark
+    experiment for all combinations of the given parameter values. Arguments
+    after -- are passed to the experiment.""")
+    parser.add_argument('experiment', type=str,
+                        choices=sorted(EXPERIMENTS.keys()),
+                        help="""Experiment to execute.""")
+    parser.add_argument('-g', '--grid', type=str, action='append',
+                        default=[], help="""Parameter of the experiment and
+                        its values, e.g., branch=1,2,3 (may be given several
+                        times).""")
+    parser.add_argument('-m', '--models', type=int, default=1,
+                        help="""Number of models per parameter
+                        combination.""")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="""Number of worker processes.""")
+    parser.add_argument('--pin', action='store_true',
+                        help="""Pin each worker process to a single CPU.""")
+    parser.add_argument('-s', '--seed', type=int,
+                        help="""Seed of the first model (default: random
+                        models).""")
+    parser.add_argument('-o', '--output', type=str, required=True,
+                        help="""Appends the records of all runs to the given
+                        file (.json or .csv).""")
+    # arguments after '--' are passed to the experiment
+    argv = list(sys.argv[1:] if argv is None else argv)
+    exargv = []
+    if '--' in argv:
+        exargv = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+    args = parser.parse_args(argv)
+    records = sweep(args.experiment, parse_grid(args.grid), args.models,
+                    exargv, args.jobs, args.pin, args.seed)
+    write_records(args.output, records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""Self-Healing by Structural Adaptation (SHSA) using AO* to find the best
+substitute.
+
+The SHSA model is searched as AND/OR graph: a variable is an OR node (one of
+its relations substitutes it), a relation is an AND node (all its inputs are
+needed). A provided variable is solved (a leaf of the substitution), an
+unprovided variable must be substituted (requirements).
+
+The value of a node is the utility of its best (partial) substitution, i.e.,
+the product of the relations' utilities (see `UtilityNorm`). The value of an
+unexpanded variable is estimated by an upper bound, the best utility of its
+relations (precomputed per variable; the utilities are normalized, hence the
+utility of a whole substitution below the variable can only be lower). With
+this admissible bound the first solved substitution of the root is the best
+one of the unfolded graph, usually after expanding a fraction of the model
+only.
+
+The graph is unfolded to a tree (a relation is not used twice along a path,
+which also avoids cycles), i.e., common subgraphs are expanded separately.
+In a model with bidirectional relations, the branches of the solution may
+touch the same variable, i.e., the substitution executes a relation in
+another direction than chosen (see `Substitution.tree`) or does not fulfil
+the requirements. Such a solution is not accepted; the joint search (below)
+over the single root returns the best valid substitution instead.
+
+Several roots (e.g., variables failing at the same time) are substituted
+jointly, maximizing the joint utility where a relation shared by the
+substitutions is paid once (see `UtilityNorm.utility_of_substitutions`). The
+search is best-first over joint partial solutions, i.e., the relations
+chosen so far (one per variable, each in one direction) and the variables
+still to substitute. The upper bound of a partial solution is its utility
+times the bounds of the pending variables, hence the first complete (and
+acyclic) solution which substitutions execute the relations in the chosen
+directions is the best one.
+
+"""
+
+import heapq
+import networkx as nx
+
+from engine.shsa import SHSA
+from model.substitution import Substitution
+from model.substitutionlist import SubstitutionList
+from model.utility import UtilityNorm
+
+
+class _Node(object):
+    """Node of the explicit search graph."""
+
+    __slots__ = ['node', 'parent', 'children', 'value', 'solved',
+                 'expanded', 'marked', 'utility']
+
+    def __init__(self, node, parent, value, solved=False, utility=1.0):
+        self.node = node
+        """Node of the model."""
+        self.parent = parent
+        """Parent in the search graph (the node where the search comes
+        from)."""
+        self.children = []
+        self.value = value
+        """Utility of the best (partial) substitution, an upper bound if not
+        solved."""
+        self.solved = solved
+        self.expanded = solved
+        self.marked = None
+        """Best child of a variable."""
+        self.utility = utility
+        """Utility of a relation given its output variable."""
+
+    def path(self):
+        """Returns the nodes of the model from the root to this node."""
+        nodes = set()
+        n = self
+        while n is not None:
+            nodes.add(n.node)
+            n = n.parent
+        return nodes
+
+
+class AOStar(SHSA):
+    """Self-Healing by Structural Adaptation (SHSA) engine using AO*."""
+
+    def __init__(self, model=None, graph=None, properties=None,
+                 configfile=None, stats=False, utility_fct=None):
+        """Initializes the search engine.
+
+        stats -- If `True`, counts the nodes expanded and the utility
+          evaluations per search (see `SHSA.stats`).
+        utility_fct -- Utility function of the relations (defaults to
+          `UtilityNorm`).
+
+        """
+        super(AOStar, self).__init__(model, graph, properties, configfile,
+                                     stats)
+        self.__utility_fct = utility_fct or UtilityNorm()
+        """Utility function of the relations."""
+        self.__bounds = {}
+        """Upper bound of the utility per variable."""
+        for v in self.model.variables:
+            us = [self.__utility_fct.utility_of_relation(self.model, r, v)
+                  for r in self.model.predecessors(v)]
+            self.__bounds[v] = max(us) if len(us) > 0 else 0.0
+
+    def __variable(self, v, parent):
+        """Returns a new node of a variable."""
+        if self.model.provided([v]):
+            return _Node(v, parent, 1.0, solved=True)
+        return _Node(v, parent, self.__bounds[v])
+
+    def __expand(self, n):
+        """Generates the children of a node."""
+        n.expanded = True
+        if self._stats is not None:
+            self._stats['nodes'] += 1
+        lastnode = n.parent.node if n.parent is not None else None
+        path = n.path()
+        if self.model.is_variable(n.node):
+            for r in set(self.model.predecessors(n.node)) - path:
+                u = self.__utility_fct.utility_of_relation(self.model, r,
+                                                           n.node)
+                c = _Node(r, n, u, utility=u)
+                c.value = u * self.__bounds_of_inputs(r, n.node, path)
+                n.children.append(c)
+            if self._stats is not None:
+                self._stats['utility_evaluations'] += len(n.children)
+        else:
+            for v in set(self.model.predecessors(n.node)) - set([lastnode]):
+                if v in path:
+                    # variable of a cycle cannot be substituted
+                    n.children.append(_Node(v, n, 0.0))
+                    n.children[-1].expanded = True
+                else:
+                    n.children.append(self.__variable(v, n))
+
+    def __bounds_of_inputs(self, r, v, path):
+        """Returns the upper bound of the inputs of a relation."""
+        u = 1.0
+        for vin in set(self.model.predecessors(r)) - set([v]):
+            if vin in path:
+                return 0.0
+            if not self.model.provided([vin]):
+                u *= self.__bounds[vin]
+        return u
+
+    def __revise(self, n):
+        """Updates the value, the solved status and the mark of a node from
+        its children; returns True if changed."""
+        if not n.expanded:
+            return False
+        old = (n.value, n.solved, n.marked)
+        if self.model.is_variable(n.node):
+            if len(n.children) == 0:
+                n.value, n.solved, n.marked = 0.0, False, None
+            else:
+                best = max(n.children, key=lambda c: (c.value, c.solved))
+                n.value, n.solved, n.marked = best.value, best.solved, best
+        else:
+            n.value = n.utility
+            n.solved = True
+            for c in n.children:
+                n.value *= c.value
+                n.solved = n.solved and c.solved
+        return old != (n.value, n.solved, n.marked)
+
+    def __tip(self, root):
+        """Returns an unexpanded node of the best partial substitution."""
+        stack = [root]
+        while len(stack) > 0:
+            n = stack.pop()
+            if n.solved:
+                continue
+            if not n.expanded:
+                return n
+            if self.model.is_variable(n.node):
+                stack.append(n.marked)
+            else:
+                stack.extend(n.children)
+        return None
+
+    def substitute(self, node):
+        """Returns the substitution of the given variable with the highest
+        utility (None if there is no substitution).
+
+        Note that an empty substitution is returned when the variable is
+        provided.
+
+        """
+        assert self.model.is_variable(node), "Substitute variables only!"
+        self._reset_stats()
+        root = self.__variable(node, None)
+        while not root.solved and root.value > 0:
+            tip = self.__tip(root)
+            self.__expand(tip)
+            # propagate the revised values up to the root
+            n = tip
+            while n is not None and self.__revise(n):
+                n = n.parent
+        if not root.solved:
+            return None
+        # collect the relations of the best substitution
+        chosen = []
+        stack = [root]
+        while len(stack) > 0:
+            n = stack.pop()
+            if self.model.is_variable(n.node):
+                if n.marked is not None:
+                    stack.append(n.marked)
+            else:
+                chosen.append((n.node, n.parent.node))
+                stack.extend(n.children)
+        s = Substitution([r for r, _ in chosen], model=self.model, root=node,
+                         utility_fct=self.__utility_fct)
+        if len(set(s)) == len(s) and self.__valid(s, chosen):
+            return s
+        # a variable is part of several branches of the tree, search the
+        # substitutions with one relation per variable instead
+        for chosen in self.__joint([node]):
+            s = self.__substitutions([node], chosen)[0]
+            if self.__valid(s, chosen):
+                return s
+        return None
+
+    def substitute_many(self, roots):
+        """Returns the substitutions of the given variables with the highest
+        joint utility, one per root (None if there is no such combination).
+
+        A variable is substituted by the same relation in all substitutions
+        and a relation is executed in one direction only, i.e., the
+        substitutions are compatible. A provided root gets an empty
+        substitution.
+
+        """
+        self._reset_stats()
+        for chosen in self.__joint(roots):
+            S = self.__substitutions(roots, chosen)
+            if all(self.__valid(s, chosen) for s in S):
+                return S
+        return None
+
+    def __joint(self, roots):
+        """Yields the complete and acyclic joint solutions (sets of relation
+        and output) of the given variables in the order of their joint
+        utility (best first)."""
+        pending = frozenset(v for v in roots if not self.model.provided([v]))
+        heap = [(-self.__bound(pending), 0, 1.0, frozenset(), pending)]
+        visited = set()
+        pushed = 1  # tie breaker (first pushed first)
+        while len(heap) > 0:
+            _, _, u, chosen, pending = heapq.heappop(heap)
+            if (chosen, pending) in visited:
+                continue
+            visited.add((chosen, pending))
+            if len(pending) == 0:
+                if self.__acyclic(chosen):
+                    yield chosen
+                continue
+            if self._stats is not None:
+                self._stats['nodes'] += 1
+            # substitute the next pending variable
+            v = min(pending, key=str)
+            used = set(r for r, _ in chosen)
+            substituted = set(w for _, w in chosen)
+            for r in self.model.predecessors(v):
+                if r in used:
+                    continue  # executed in another direction
+                ur = self.__utility_fct.add(
+                    u, self.__utility_fct.utility_of_relation(self.model, r,
+                                                              v))
+                if self._stats is not None:
+                    self._stats['utility_evaluations'] += 1
+                p = set(pending) - set([v])
+                for w in set(self.model.predecessors(r)) - set([v]):
+                    if not self.model.provided([w]) and w not in substituted:
+                        p.add(w)
+                p = frozenset(p)
+                f = ur * self.__bound(p)
+                if f > 0:
+                    heapq.heappush(heap, (-f, pushed, ur, chosen | {(r, v)},
+                                          p))
+                    pushed += 1
+
+    def __bound(self, variables):
+        """Returns the upper bound of the utility to substitute the given
+        variables (each by another relation)."""
+        u = 1.0
+        for v in variables:
+            u *= self.__bounds[v]
+        return u
+
+    def __acyclic(self, chosen):
+        """Returns true if the chosen relations (relation, output) do not
+        depend on each other's outputs in a cycle."""
+        g = nx.DiGraph()
+        for r, v in chosen:
+            g.add_edge(r, v)
+            for w in set(self.model.predecessors(r)) - set([v]):
+                g.add_edge(w, r)
+        return nx.is_directed_acyclic_graph(g)
+
+    def __valid(self, s, chosen):
+        """Returns true if the substitution executes each relation in the
+        chosen direction (relation, output) and its inputs are provided.
+
+        The direction of a relation is not part of a substitution, but derived
+        from its tree (see `Substitution.tree`), which differs from the chosen
+        one when a relation touches a variable of another branch.
+
+        """
+        t, vin = s.tree(collapse_variables=False)
+        outputs = dict(chosen)
+        return all(list(t.successors(r)) == [outputs[r]] for r in s) \
+            and self.model.provided(vin)
+
+    def __substitutions(self, roots, chosen):
+        """Returns the substitution per root given the chosen relations."""
+        relation = {v: r for r, v in chosen}
+        S = SubstitutionList()
+        for root in roots:
+            relations = []
+            stack = [root]
+            while len(stack) > 0:
+                v = stack.pop()
+                if v not in relation or relation[v] in relations:
+                    continue
+                r = relation[v]
+                relations.append(r)
+                stack.extend(set(self.model.predecessors(r)) - set([v]))
+            S.append(Substitution(relations, model=self.model, root=root,
+                                  utility_fct=self.__utility_fct))
+        return S
@@ -0,0 +1,160 @@
+"""Self-Healing by Structural Adaptation (SHSA) counting the substitutions
+without enumerating them.
+
+The SHSA model is an AND/OR graph: a variable is substituted by one of its
+relations (OR), a relation needs all its input variables (AND), whereas an
+input variable is either taken as it is (a leaf of the substitution tree) or
+substituted further. The number of substitutions is therefore computed by
+dynamic programming over the nodes (given the node where the search comes
+from):
+
+  count(v, r) = sum of count(r', v) for all relations r' of v except r
+  count(r, v) = product of (leaf(v') + count(v', r)) for all inputs v' of r
+                except v
+
+The counts equal the number of substitutions `DepthFirstSearch` returns for
+the same options (as Python integers, i.e., without overflow). Like
+`DepthFirstSearch` the nodes of the current path are not visited again
+(cycles of bidirectional relations) and only path-independent counts are
+saved. Note that on cyclic models the requirements are checked per relation
+(a variable on the path is a leaf), whereas `DepthFirstSearch` checks the
+trees of the substitutions, i.e., the counts may differ with requirement
+checks. With
+requirement checks a leaf must be provided (leaf(v) = 1 if v is provided, 0
+otherwise), without any variable may be a leaf (leaf(v) = 1).
+
+Weighted by utility, the count of a relation is multiplied by its utility
+(given the variable it substitutes), i.e., the result is the sum of the
+utilities of all substitutions (the utility of a substitution is the product
+of its relations' utilities, see `UtilityNorm`).
+
+"""
+
+from engine.shsa import SHSA
+from model.utility import UtilityNorm
+
+
+class CountingSearch(SHSA):
+    """Counts the substitutions of a variable."""
+
+    def __init__(self, model=None, graph=None, properties=None,
+                 configfile=None, stats=False, utility_fct=None):
+        """Initializes the search engine.
+
+        The counts of the nodes are saved and shared by all subsequent
+        searches of this engine. They are only valid as long as the model
+        (structure and provided status) does not change.
+
+        stats -- If `True`, counts the nodes expanded per search (see
+          `SHSA.stats`).
+        utility_fct -- Utility function for weighted counts (defaults to
+          `UtilityNorm`).
+
+        """
+        super(CountingSearch, self).__init__(model, graph, properties,
+                                             configfile, stats)
+        self.__utility_fct = utility_fct or UtilityNorm()
+        """Utility function of the relations (weighted counts)."""
+        self.__counts = {}
+        """Number of substitutions (key: node, last node, search
+        options)."""
+        self.__path = {}
+        """Nodes of the current search path (value: depth)."""
+        self.__cyclic = False
+        """True if a node on the path has been skipped (cycle)."""
+
+    @property
+    def utility_fct(self):
+        return self.__utility_fct
+
+    def count(self, node, substitute_provided=True, check_requirements=True,
+              weighted=False):
+        """Returns the number of substitutions of the given variable.
+
+        substitute_provided -- If `False`, provided variables are not
+          substituted (leaves only).
+        check_requirements -- If `True`, only substitutions whose input
+          variables are provided are counted.
+        weighted -- If `True`, returns the sum of the utilities of the
+          substitutions instead (float).
+
+        """
+        assert self.model.is_variable(node), "Substitute variables only!"
+        self._reset_stats()
+        return self._count(node, None, substitute_provided,
+                           check_requirements, weighted)
+
+    def substitute(self, node):
+        """Returns the number of valid substitutions of the given variable
+        (see `count`)."""
+        return self.count(node)
+
+    def _count(self, node, lastnode, substitute_provided, check_requirements,
+               weighted=False):
+        """Returns the (weighted) number of substitutions from a node given
+        the node where the search comes from (memoized)."""
+        self.__path = {}
+        n, _ = self.__count(node, lastnode, substitute_provided,
+                            check_requirements, weighted)
+        return n
+
+    def _cyclic(self):
+        """Returns true if a cycle has been skipped by a count so far, i.e.,
+        the counts of the nodes depend on the path."""
+        return self.__cyclic
+
+    def __count(self, node, lastnode, substitute_provided,
+                check_requirements, weighted):
+        """Returns the count and the depth of the highest node on the path the
+        count depends on."""
+        key = (node, lastnode, substitute_provided, check_requirements,
+               weighted)
+        if key in self.__counts:
+            return self.__counts[key], len(self.__path)
+        if self._stats is not None:
+            self._stats['nodes'] += 1
+        depth = len(self.__path)
+        self.__path[node] = depth
+        dependency = depth
+        # move on, but do not go back where we came from (nor to the path)
+        adjacents = set()
+        for a in set(self.model.predecessors(node)) - set([lastnode]):
+            if a in self.__path:
+                self.__cyclic = True
+                dependency = min(dependency, self.__path[a])
+                if self.model.is_relation(node):
+                    adjacents.add((a, False))  # leaf only
+            else:
+                adjacents.add((a, True))
+        if self.model.is_relation(node):
+            # each input is either a leaf or substituted
+            n = 1
+            if weighted:
+                n = self.__utility_fct.utility_of_relation(self.model, node,
+                                                           lastnode)
+            for v, expand in adjacents:
+                provided = self.model.provided([v])
+                leaf = 1 if provided or not check_requirements else 0
+                substituted = 0
+                if expand and (substitute_provided or not provided):
+                    substituted, d = self.__count(v, node,
+                                                  substitute_provided,
+                                                  check_requirements,
+                                                  weighted)
+                    dependency = min(dependency, d)
+                n *= leaf + substituted
+                if n == 0:
+                    break
+        else:
+            # one of the relations substitutes the variable
+            n = 0
+            for r, _ in adjacents:
+                c, d = self.__count(r, node, substitute_provided,
+                                    check_requirements, weighted)
+                dependency = min(dependency, d)
+                n += c
+        del self.__path[node]
+        # save path-independent counts only
+        if dependency >= depth:
+            self.__counts[key] = n
+        return n, dependency
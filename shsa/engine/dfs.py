@@ -1,11 +1,29 @@
 """Self-Healing by Structural Adaptation (SHSA) using classic depth-first
 search to find substitutes.
 
+Relations with several outputs are bidirectional, i.e., the model may contain
+cycles. The search keeps the nodes of the current path and does not visit
+them again (a variable on the path is a leaf). The result of a sub-search
+depends on the path only if a node above was skipped, otherwise it is saved
+and reused during the search (and by all subsequent searches if memoized).
+A sub-search can only reach the nodes of the path in its strongly connected
+component, so a path-dependent result is saved for these nodes of the path.
+
+Hence a subproblem (node, last node, options, nodes of the path in the node's
+strongly connected component) is expanded once. The number of these
+subproblems is bounded by the number of edges in acyclic models, but may grow
+exponentially with the size of a cycle (bidirectional relations), because the
+paths into a cycle differ in the nodes they skip. Combining the substitutions
+of the sub-searches is not bounded by the number of subproblems either.
+
 """
 
 import itertools
+import networkx as nx
+import time
 
 from engine.shsa import SHSA
+from model.provided import ProvidedOverlay
 from model.shsamodel import SHSAModel, SHSANodeType
 from model.substitutionlist import SubstitutionList
 from model.substitution import Substitution
@@ -15,10 +33,29 @@ class DepthFirstSearch(SHSA):
     """Self-Healing by Structural Adaptation (SHSA) engine."""
 
     def __init__(self, model=None, graph=None, properties=None,
-                 configfile=None):
-        """Initializes the search engine."""
+                 configfile=None, memoize=False, stats=False):
+        """Initializes the search engine.
+
+        memoize -- If `True`, the results of sub-searches are saved and shared
+          by all subsequent searches of this engine (e.g., for several roots),
+          otherwise they are shared within a search only.
+          The results are only valid as long as the model (structure and
+          provided status) does not change and must not be modified by the
+          caller.
+        stats -- If `True`, counts nodes expanded, memo hits, substitutions
+          created, requirement checks and tree builds per search (see
+          `SHSA.stats`).
+
+        """
         super(DepthFirstSearch, self).__init__(model, graph, properties,
-                                               configfile)
+                                               configfile, stats)
+        self.__memo = {} if memoize else None
+        """Results of sub-searches (key: node, last node, search options)."""
+        self.__path = {}
+        """Nodes of the current search path (value: depth)."""
+        self.__components = None
+        """Strongly connected component per node (index) and the size per
+        component, computed at the first search."""
 
     def substitute(self, node, lastnode=None, substitute_provided=True,
                    check_requirements=True):
@@ -36,21 +73,159 @@ class DepthFirstSearch(SHSA):
         - save solution, globally, as soon as available (anytime algorithm)
 
         """
+        if self._stats is not None:
+            self._reset_stats()
+            start = time.perf_counter_ns()
+        memo = self.__memo
+        if self.__memo is None:
+            self.__memo = {}  # shared within this search only
+        try:
+            S = self.__search(node, lastnode, substitute_provided,
+                              check_requirements)
+        finally:
+            self.__memo = memo
+        if self._stats is not None:
+            self._stats['time'] += time.perf_counter_ns() - start
+        return S
+
+    def substitute_many(self, roots, substitute_provided=True,
+                        check_requirements=True):
+        """Returns a compatible substitution per root (None if there is no
+        such combination).
+
+        The roots are substituted at once, i.e., the results of sub-searches
+        are shared between the roots (common descendants are searched once
+        even if the engine does not memoize). A substitution is compatible to
+        the others if common relations are executed in the same direction and
+        no other root is an input variable (the roots are assumed to fail
+        together, see `Substitution.compatible`). The combination is chosen
+        with the best substitutions of the first roots first.
+
+        """
+        if self._stats is not None:
+            self._reset_stats()
+            start = time.perf_counter_ns()
+        memo = self.__memo
+        if self.__memo is None:
+            self.__memo = {}  # shared by the roots of this batch only
+        try:
+            candidates = []
+            for root in roots:
+                S = SubstitutionList(
+                    [Substitution(s, model=self.model, root=root)
+                     for s in self.__search(root, None, substitute_provided,
+                                            check_requirements)])
+                if self.model.provided([root]):
+                    S.append(Substitution(model=self.model, root=root))
+                S.sort(key=lambda s: s.utility, reverse=True)
+                candidates.append(S)
+        finally:
+            self.__memo = memo
+        chosen = self.__choose_compatible(candidates, [])
+        if self._stats is not None:
+            self._stats['time'] += time.perf_counter_ns() - start
+        if chosen is None:
+            return None
+        return SubstitutionList(chosen)
+
+    def __choose_compatible(self, candidates, chosen):
+        """Returns compatible substitutions, one per candidate list
+        (backtracking)."""
+        if len(chosen) == len(candidates):
+            return chosen
+        for s in candidates[len(chosen)]:
+            if all(s.compatible(c) for c in chosen):
+                result = self.__choose_compatible(candidates, chosen + [s])
+                if result is not None:
+                    return result
+        return None
+
+    def __search(self, node, lastnode, substitute_provided,
+                 check_requirements):
+        """Searches the substitutes starting with an empty path."""
+        self.__path = {}
+        S, _ = self.__substitute(node, lastnode, substitute_provided,
+                                 check_requirements)
+        return S
+
+    def __cyclic(self, node):
+        """Returns true if the node is part of a cycle of the model."""
+        if self.__components is None:
+            model = self.model
+            if isinstance(model, ProvidedOverlay):
+                model = model.model
+            component, sizes = {}, []
+            for c in nx.strongly_connected_components(model):
+                for n in c:
+                    component[n] = len(sizes)
+                sizes.append(len(c))
+            self.__components = (component, sizes)
+        component, sizes = self.__components
+        return sizes[component[node]] > 1
+
+    def __on_path(self, node):
+        """Returns the nodes of the current path in the node's strongly
+        connected component, i.e., the only nodes of the path a search
+        starting at the node may reach."""
+        component, _ = self.__components
+        c = component[node]
+        return frozenset(n for n in self.__path if component[n] == c)
+
+    def __substitute(self, node, lastnode, substitute_provided,
+                     check_requirements):
+        """Recursive search of substitutes (see `substitute`).
+
+        Returns the substitutions and the depth of the highest node on the
+        path the result depends on.
+
+        """
+        stats = self._stats
+        # reuse results of a previous sub-search
+        key = (node, lastnode, substitute_provided, check_requirements)
+        if key in self.__memo:
+            if stats is not None:
+                stats['memo_hits'] += 1
+            return self.__memo[key], len(self.__path)
+        onpath = None  # nodes of the path the result may depend on
+        if self.__cyclic(node):
+            onpath = self.__on_path(node)
+            if key + (onpath,) in self.__memo:
+                if stats is not None:
+                    stats['memo_hits'] += 1
+                return self.__memo[key + (onpath,)], \
+                    min(self.__path[n] for n in onpath)
+        if stats is not None:
+            stats['nodes'] += 1
+        depth = len(self.__path)
+        self.__path[node] = depth
+        dependency = depth
         # init
         S = SubstitutionList()  # empty
         solutions = []  # list of substitution lists of adjacents
         # move on, but do not go back where we came from
         adjacents = set(self.model.predecessors(node)) - set([lastnode])
         # save solution of each adjacent separately
+        blocked = False  # input on the path that is not a valid leaf
         for n in adjacents:
+            if n in self.__path:
+                # cycle, i.e., the result depends on the path
+                dependency = min(dependency, self.__path[n])
+                if check_requirements and self.model.is_relation(node) \
+                   and not self.model.provided([n]):
+                    blocked = True
+                    break
+                continue
             if self.model.is_relation(n) or (self.model.is_variable(n) and
                (substitute_provided or not self.model.provided([n]))):
-                s = self.substitute(n, node, substitute_provided,
-                                    check_requirements)
+                s, d = self.__substitute(n, node, substitute_provided,
+                                         check_requirements)
+                dependency = min(dependency, d)
                 if len(s) > 0:
                     solutions.append(s)
         # depending on the type of node the solutions are combined or added
-        if self.model.is_relation(node):
+        if blocked:
+            pass  # no substitution
+        elif self.model.is_relation(node):
             # create combinations (take not / take for each adjacent)
             combs = list(itertools.product([0, 1], repeat=len(solutions)))
             for c in combs:
@@ -69,6 +244,8 @@ class DepthFirstSearch(SHSA):
                                               model=self.model, root=node))
             # add current relation node to all substitutions
             S.add_node_to(node)
+            if stats is not None:
+                stats['substitutions'] += len(S)
             # filter the substitutions that fulfil the requirements
             # check_requirements: memory vs performance (if filtering is done
             # at the end once, it is much faster)
@@ -76,11 +253,22 @@ class DepthFirstSearch(SHSA):
                 # root node (= last variable node) will/must be updated before
                 # checking requirements
                 S.update(lastnode, self.model)
+                if stats is not None:
+                    # each check builds the tree of the substitution
+                    stats['requirement_checks'] += len(S)
+                    stats['tree_builds'] += len(S)
                 new = list(filter(lambda s: s.requirements_ok(), S))
                 S = SubstitutionList(new)
         elif self.model.is_variable(node):
             # simply add returned solutions
             for s in solutions:
                 S.extend(s)
+        del self.__path[node]
+        # save the result, path-dependent ones for the nodes of the path in
+        # the node's cycles
+        if dependency >= depth:
+            self.__memo[key] = S
+        else:
+            self.__memo[key + (onpath,)] = S
         # return substitutes from this node on
-        return S
+        return S, dependency
@@ -6,6 +6,8 @@ Systems.
 
 """
 
+import time
+
 from engine.shsa import SHSA
 
 
@@ -13,9 +15,15 @@ class ORR(SHSA):
     """Ontology-based runtime reconfiguration (ORR) engine."""
 
     def __init__(self, model=None, graph=None, properties=None,
-                 configfile=None):
-        """Initializes the search engine."""
-        super(ORR, self).__init__(model, graph, properties, configfile)
+                 configfile=None, stats=False):
+        """Initializes the search engine.
+
+        stats -- If `True`, counts the nodes expanded per search (see
+          `SHSA.stats`).
+
+        """
+        super(ORR, self).__init__(model, graph, properties, configfile,
+                                  stats)
         self.__provided = {}
         for n in self.model.nodes():
             if self.model.is_variable(n):
@@ -23,12 +31,13 @@ class ORR(SHSA):
 
     def substitute_init(self):
         """Initializes the variables for a substitute search."""
-        self.__sub_visited = []
+        self.__sub_visited = set()
         # list of nodes that can be provided by substitution
         self.__sub_provided = []
         # results, i.e., substitution tree
         self.__sub_service = {}
         self.__sub_tree = {}
+        self._reset_stats()
 
     def substitute(self, r, lastrel=None):
         """Original substitute search by Oliver.
@@ -38,6 +47,17 @@ class ORR(SHSA):
         This method is called recursively and is self-contained.
 
         """
+        if self._stats is None:
+            return self.__substitute(r, lastrel)
+        start = time.perf_counter_ns()
+        result = self.__substitute(r, lastrel)
+        self._stats['time'] += time.perf_counter_ns() - start
+        return result
+
+    def __substitute(self, r, lastrel):
+        """Recursive substitute search (see `substitute`)."""
+        if self._stats is not None:
+            self._stats['nodes'] += 1
         m = self.model
         # substitute called for a variable although provided
         if m.provided([r]):
@@ -63,9 +83,9 @@ class ORR(SHSA):
                         # property not provided -> try to substitute
                         if i not in self.__sub_visited:
                             # n.visited <- true
-                            self.__sub_visited.append(i)
+                            self.__sub_visited.add(i)
                             # recursive substitute search
-                            s, t = self.substitute(i, n)
+                            s, t = self.__substitute(i, n)
                             # if result is empty
                             if not (s or t):
                                 provided = False
@@ -81,7 +101,7 @@ class ORR(SHSA):
                             break  # no substiute for n
                     else:
                         # property is provided (without substitution)
-                        self.__sub_visited.append(n)
+                        self.__sub_visited.add(n)
                         S.append(i)
                         T.append(i)
                 if provided:
@@ -92,9 +112,9 @@ class ORR(SHSA):
                     # property not provided -> try to substitute
                     if i not in self.__sub_visited:
                         # n.visited <- true
-                        self.__sub_visited.append(i)
+                        self.__sub_visited.add(i)
                         # recursive substitute search
-                        s, t = self.substitute(i, n)
+                        s, t = self.__substitute(i, n)
                         if s and t:
                             self.__sub_provided.append(n)
                             self.__sub_service[n] = s
@@ -104,4 +124,5 @@ class ORR(SHSA):
                     # property provided
                     self.__sub_visited.add(i)
                     return self.__sub_service[n], self.__sub_tree[n]
-        assert True, "line shall not be reached"
+        # no relation can provide r
+        return None, None
@@ -0,0 +1,127 @@
+"""Self-Healing by Structural Adaptation (SHSA) sampling random
+substitutions.
+
+Draws substitutions from the solution space of `DepthFirstSearch` (same
+options) without enumerating it, either uniformly or weighted by utility. The
+(weighted) number of substitutions per node (see `CountingSearch`) guides
+the random choices:
+
+- a variable is substituted by a relation with the probability of the
+  relation's share of the variable's count,
+- an input variable of a relation is substituted (otherwise it is a leaf)
+  with the probability of its count relative to its count plus the leaf.
+
+Hence a sample costs O(substitution size) once the counts are known (the
+counts are saved and shared by all subsequent samples).
+
+"""
+
+import random
+
+from engine.counting import CountingSearch
+from model.substitution import Substitution
+from model.substitutionlist import SubstitutionList
+
+
+class SamplingSearch(CountingSearch):
+    """Samples substitutions of a variable."""
+
+    def __init__(self, model=None, graph=None, properties=None,
+                 configfile=None, stats=False, utility_fct=None,
+                 weighted=False, seed=None):
+        """Initializes the search engine.
+
+        weighted -- If `True`, a substitution is sampled with a probability
+          proportional to its utility, otherwise uniformly.
+        seed -- Seed of the random number generator (an integer or a
+          `random.Random` instance).
+
+        """
+        super(SamplingSearch, self).__init__(model, graph, properties,
+                                             configfile, stats, utility_fct)
+        self.__weighted = weighted
+        """Sample weighted by utility."""
+        self.__rng = seed if isinstance(seed, random.Random) \
+            else random.Random(seed)
+        """Random number generator."""
+
+    def __choose(self, weights):
+        """Returns the index of a randomly chosen weight (integers or
+        floats)."""
+        total = sum(weights)
+        if isinstance(total, int):
+            x = self.__rng.randrange(total)
+        else:
+            x = self.__rng.uniform(0, total)
+        for i, w in enumerate(weights):
+            if x < w:
+                return i
+            x -= w
+        return len(weights) - 1  # rounding of floats
+
+    def __adjacents(self, node, lastnode):
+        """Returns the adjacents of a node except the last node (sorted, for
+        reproducible samples)."""
+        return sorted(set(self.model.predecessors(node)) - set([lastnode]),
+                      key=str)
+
+    def sample(self, node, substitute_provided=True, check_requirements=True):
+        """Returns a random substitution of the given variable (None if there
+        is no substitution).
+
+        substitute_provided -- If `False`, provided variables are not
+          substituted (leaves only).
+        check_requirements -- If `True`, only substitutions whose input
+          variables are provided are sampled.
+
+        Raises a RuntimeError if the model contains a cycle reachable from
+        the node (the counts of the nodes depend on the path then).
+
+        """
+        self._reset_stats()
+        return self.__sample(node, substitute_provided, check_requirements)
+
+    def __sample(self, node, substitute_provided, check_requirements):
+        assert self.model.is_variable(node), "Substitute variables only!"
+        options = (substitute_provided, check_requirements, self.__weighted)
+        if self._count(node, None, *options) == 0:
+            return None
+        if self._cyclic():
+            raise RuntimeError("""Cannot sample the substitutions of a cyclic
+            model.""")
+        relations = []
+        stack = [(node, None)]  # variables to substitute
+        while len(stack) > 0:
+            v, lastnode = stack.pop()
+            if self._stats is not None:
+                self._stats['nodes'] += 1
+            # choose the relation substituting the variable
+            rset = self.__adjacents(v, lastnode)
+            r = rset[self.__choose([self._count(r, v, *options)
+                                    for r in rset])]
+            relations.append(r)
+            # substitute an input or take it as leaf
+            for vin in self.__adjacents(r, v):
+                provided = self.model.provided([vin])
+                leaf = 1 if provided or not check_requirements else 0
+                substituted = 0
+                if substitute_provided or not provided:
+                    substituted = self._count(vin, r, *options)
+                if substituted > 0 and \
+                   self.__choose([substituted, leaf]) == 0:
+                    stack.append((vin, r))
+        return Substitution(relations, model=self.model, root=node,
+                            utility_fct=self.utility_fct)
+
+    def substitute(self, node, n=1, substitute_provided=True,
+                   check_requirements=True):
+        """Returns n random substitutions of the given variable (drawn with
+        replacement, empty if there is no substitution)."""
+        self._reset_stats()
+        S = SubstitutionList()
+        for _ in range(n):
+            s = self.__sample(node, substitute_provided, check_requirements)
+            if s is None:
+                break
+            S.append(s)
+        return S
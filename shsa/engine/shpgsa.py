@@ -1,8 +1,17 @@
 """Self-Healing by Structural Adaptation (SHSA) using properties to guide the
 search of a substitute.
 
+In beam mode only the best B potential workers are kept (overall or per
+depth, i.e., per number of relations of the potential worker's
+substitution), the others are pruned. Memory and time are bounded then, but
+the substitutions are not necessarily found in the order of their utility
+and some may not be found at all.
+
 """
 
+import heapq
+import time
+
 from engine.shsa import SHSA
 from engine.worker import Worker
 from model.substitution import Substitution
@@ -10,29 +19,107 @@ from model.substitutionlist import SubstitutionList
 
 
 class SHPGSA(SHSA):
-    """Self-Healing by Property-Guided Structural Adaptation (SH-PGSA) engine."""
+    """Self-Healing by Property-Guided Structural Adaptation (SH-PGSA)
+    engine."""
 
     def __init__(self, model=None, graph=None, properties=None,
-                 configfile=None):
-        """Initializes the search engine."""
-        super(SHPGSA, self).__init__(model, graph, properties, configfile)
+                 configfile=None, stats=False, beam=None, beam_depth=False):
+        """Initializes the search engine.
+
+        stats -- If `True`, counts workers created, discarded and pruned,
+          potential workers, nodes expanded, utility evaluations, requirement
+          checks and tree builds per search (see `SHSA.stats`).
+        beam -- Maximum number of potential workers (beam width B; None for
+          an unbounded and complete search).
+        beam_depth -- If `True`, the beam width applies per depth instead of
+          overall.
+
+        """
+        super(SHPGSA, self).__init__(model, graph, properties, configfile,
+                                     stats)
+        if beam is not None and beam < 1:
+            raise RuntimeError("Beam width must be at least 1.")
+        self.__beam = beam
+        """Maximum number of potential workers (overall or per depth)."""
+        self.__beam_depth = beam_depth
+        """Apply the beam width per depth."""
         self.__W = None
         """Active workers of substitute search."""
         self.__Wp = []
         """Parameters of potential workers, sorted by utility.
 
-        List of sequences (initial utility incl. utility of pending relations,
-        relations, pending relations (v, r)).
+        List of entries [params, position, end], where params is a sequence of
+        parameters of potential workers sorted by utility (see `WorkerParams`)
+        of which the items from position to end (excl.) are pending. The
+        entries are sorted by the utility of their next item, i.e., the
+        parameters are only created when needed.
 
         """
         self.__S = None
         """Saves the results of last search."""
 
+    def __push(self, entry):
+        """Inserts a sequence of potential workers (insertion sort)."""
+        params, pos, end = entry
+        if pos >= end:
+            return
+        u = params[pos][0]
+        i = 0
+        while i < len(self.__Wp):
+            if u < self.__head(i):  # compare utility
+                i = i + 1
+                continue
+            else:
+                break
+        self.__Wp.insert(i, entry)
+
+    def __head(self, i=0):
+        """Returns the utility of the next potential worker of an entry."""
+        params, pos, _ = self.__Wp[i]
+        return params[pos][0]
+
+    def __pop(self):
+        """Returns the parameters of the best potential worker."""
+        params, pos, end = self.__Wp.pop(0)
+        self.__push([params, pos + 1, end])
+        return params[pos]
+
     def __create_worker(self, node):
         if len(self.__W) == 0 and len(self.__Wp) > 0:
-            u, r, rp = self.__Wp.pop(0)
+            u, r, rp = self.__pop()
             self.__W.append(Worker(r, root=node, model=self.model, utility=u,
-                                   relations=rp))
+                                   relations=rp, stats=self._stats))
+            if self._stats is not None:
+                self._stats['workers_created'] += 1
+
+    def __prune(self):
+        """Keeps the best potential workers w.r.t. the beam width."""
+        if self.__beam is None:
+            return
+        groups = {}  # entries per depth
+        for entry in self.__Wp:
+            d = len(entry[0][entry[1]][1]) if self.__beam_depth else 0
+            groups.setdefault(d, []).append(entry)
+        pruned = 0
+        for entries in groups.values():
+            # merge the sequences to select the best potential workers
+            heap = [(-e[0][e[1]][0], i, e[1]) for i, e in enumerate(entries)]
+            heapq.heapify(heap)
+            taken = [0] * len(entries)
+            for _ in range(self.__beam):
+                if len(heap) == 0:
+                    break
+                _, i, pos = heapq.heappop(heap)
+                taken[i] += 1
+                params, _, end = entries[i]
+                if pos + 1 < end:
+                    heapq.heappush(heap, (-params[pos + 1][0], i, pos + 1))
+            for e, n in zip(entries, taken):
+                pruned += e[2] - e[1] - n
+                e[2] = e[1] + n
+        self.__Wp = [e for e in self.__Wp if e[1] < e[2]]
+        if self._stats is not None:
+            self._stats['workers_pruned'] += pruned
 
     def substitute(self, node):
         """Search a substitute for the given node.
@@ -44,16 +131,32 @@ class SHPGSA(SHSA):
 
         Non-recursive and anytime algorithm implementation.
 
+        The counters (see `SHSA.stats`) are accumulated over the calls of a
+        search.
+
         """
+        if self._stats is None:
+            return self.__substitute(node)
+        start = time.perf_counter_ns()
+        w = self.__substitute(node)
+        self._stats['time'] += time.perf_counter_ns() - start
+        return w
+
+    def __substitute(self, node):
+        """Continues the search (see `substitute`)."""
+        stats = self._stats
         # initialize (at first call of new search)
         if self.__W is None:
             assert self.model.is_variable(node), "Substitute variables only!"
+            self._reset_stats()
             # init result
             self.__S = SubstitutionList()  # list of substitutions (results)
             self.__W = []  # list of workers
             # create first worker (empty substitution, start at root node)
             self.__W.append(Worker(root=node, model=self.model,
-                                   variables=[node]))
+                                   variables=[node], stats=stats))
+            if stats is not None:
+                stats['workers_created'] += 1
         # instantiate new best worker (from potential list) if no one left
         else:
             self.__create_worker(node)
@@ -74,23 +177,20 @@ class SHPGSA(SHSA):
                     w = self.__W.pop(0)
                     self.__W.insert(i, w)
                 # insertion sort (potential workers)
-                for w in wnew:
-                    i = 0
-                    while i < len(self.__Wp):
-                        if w[0] < self.__Wp[i][0]:  # compare utility
-                            i = i + 1
-                            continue
-                        else:
-                            break
-                    self.__Wp.insert(i, w)
+                if stats is not None:
+                    stats['potential_workers'] += len(wnew)
+                self.__push([wnew, 0, len(wnew)])
+                self.__prune()
                 # create new worker if a potential one has better utility
                 if len(self.__Wp) > 0 and \
-                   self.__Wp[0][0] > self.__W[0].utility:
+                   self.__head() > self.__W[0].utility:
                     # create new worker
-                    u, r, rp = self.__Wp.pop(0)
+                    u, r, rp = self.__pop()
                     w = Worker(r, root=node, model=self.model, utility=u,
-                               relations=rp)
+                               relations=rp, stats=stats)
                     self.__W.insert(0, w)
+                    if stats is not None:
+                        stats['workers_created'] += 1
             # current best worker done
             w = self.__W.pop(0)
             if w.successful():
@@ -98,6 +198,8 @@ class SHPGSA(SHSA):
                 self.__S.append(w)
                 return w
             else:
+                if stats is not None:
+                    stats['workers_discarded'] += 1
                 self.__create_worker(node)
         # finally cleanup workers and return no solution
         self.__W = None
@@ -3,6 +3,8 @@
 
 """
 
+from collections import Counter
+
 from model.shsamodel import SHSAModel
 
 
@@ -10,13 +12,26 @@ class SHSA(object):
     """Self-Healing by Structural Adaptation (SHSA) engine."""
 
     def __init__(self, model=None, graph=None, properties=None,
-                 configfile=None):
-        """Initializes the engine with a model."""
+                 configfile=None, stats=False):
+        """Initializes the engine with a model.
+
+        The model may also be a `ProvidedOverlay` of a model, to search with
+        another set of provided variables without modifying the model.
+
+        stats -- If `True`, the engine counts its operations per search
+          (e.g., nodes expanded, requirement checks) and measures the time of
+          a search (see `stats`). Disabled by default (the counters are not
+          updated at all).
+
+        """
         if model is not None:
             self.__model = model
             """Knowledge base for SHSA."""
         else:
             self.__model = SHSAModel(graph, properties, configfile)
+        self._stats = Counter() if stats else None
+        """Counters and timers (ns) of the current search, None if
+        disabled (updated by the engines directly)."""
 
     def __get_model(self):
         """Returns the underlying SHSA model."""
@@ -24,5 +39,18 @@ class SHSA(object):
 
     model = property(__get_model)
 
+    @property
+    def stats(self):
+        """Returns the counters and timers (ns) of the last search (None if
+        not enabled). Counters that were not incremented are missing."""
+        if self._stats is None:
+            return None
+        return dict(self._stats)
+
+    def _reset_stats(self):
+        """Resets the counters at the start of a search."""
+        if self._stats is not None:
+            self._stats.clear()
+
     def substitute(self, root):
         raise NotImplementedError
@@ -10,14 +10,114 @@ A worker is defined by the substitution, i.e., a list of chosen relation nodes,
 and the nodes where to proceed (or relations lastly added), i.e., the queue of
 nodes to proceed.
 
+The parameters of the workers for the other relations are generated lazily in
+best-first order (k-best enumeration of the product of the variables'
+relations), i.e., only the alternatives the search engine actually needs are
+created.
+
 """
 
-import itertools
+import heapq
 import warnings
 
 from model.substitution import Substitution
 
 
+class WorkerParams(object):
+    """Parameters of alternative workers (lazy sequence, sorted by utility).
+
+    An item is a tuple (initial utility incl. utility of pending relations,
+    relations, pending relations (v, r)). The combinations of relations are
+    enumerated best-first with a heap over the ranks of the relations per
+    variable (each combination is a vector of ranks; the successors of a
+    combination increase one of its ranks).
+
+    """
+
+    def __init__(self, utility, relations, candidates, utility_fct,
+                 skip_best=True):
+        """Initializes the sequence.
+
+        utility -- Utility of the worker's substitution.
+        relations -- Relations of the worker's substitution.
+        candidates -- List of relations per variable, i.e., a list of sorted
+          (best first) lists of tuples (utility, (v, r)).
+        utility_fct -- Utility function adding up the utilities.
+        skip_best -- Skip the best combination (chosen by the worker itself).
+
+        """
+        self.__utility = utility
+        """Utility of the worker's substitution."""
+        self.__relations = relations
+        """Relations of the worker's substitution (shared by all items)."""
+        self.__candidates = candidates
+        """Relations and their utility per variable, sorted."""
+        self.__utility_fct = utility_fct
+        """Utility function adding up the utilities."""
+        self.__items = []
+        """Items generated so far."""
+        self.__len = 1
+        """Number of items."""
+        for c in candidates:
+            self.__len *= len(c)
+        if len(candidates) == 0:
+            self.__len = 0
+        self.__heap = []
+        """Combinations to generate next (negated utility, ranks)."""
+        self.__seen = set()
+        """Combinations pushed to the heap."""
+        if self.__len > 0:
+            self.__push(tuple([0] * len(candidates)))
+        if skip_best and self.__len > 0:
+            self.__next()
+            self.__len -= 1
+
+    @property
+    def relations(self):
+        return self.__relations
+
+    def __push(self, ranks):
+        self.__seen.add(ranks)
+        u = self.__utility
+        for c, i in zip(self.__candidates, ranks):
+            u = self.__utility_fct.add(u, c[i][0])
+        # ranks break ties (first combination first)
+        heapq.heappush(self.__heap, (-u, ranks))
+
+    def __next(self):
+        """Returns the next combination (ranks) in best-first order."""
+        _, ranks = heapq.heappop(self.__heap)
+        for k in range(len(ranks)):
+            if ranks[k] + 1 < len(self.__candidates[k]):
+                successor = ranks[:k] + (ranks[k] + 1,) + ranks[k+1:]
+                if successor not in self.__seen:
+                    self.__push(successor)
+        return ranks
+
+    def __generate(self):
+        """Generates the next item."""
+        u = -self.__heap[0][0]
+        ranks = self.__next()
+        R = [c[i][1] for c, i in zip(self.__candidates, ranks)]
+        self.__items.append((u, self.__relations, R))
+
+    def __len__(self):
+        return self.__len
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self.__len
+        if idx < 0 or idx >= self.__len:
+            raise IndexError("worker params index out of range")
+        while len(self.__items) <= idx:
+            self.__generate()
+        return self.__items[idx]
+
+    def generated(self):
+        """Returns the number of items created so far."""
+        return len(self.__items)
+
+
 class Worker(Substitution):
     """Worker class."""
 
@@ -47,6 +147,11 @@ class Worker(Substitution):
         if 'relations_u' in kwargs.keys():
             self.__rels_u = kwargs['relations_u']
             del kwargs['relations_u']
+        self.__stats = None
+        """Counters of the search engine (None if disabled)."""
+        if 'stats' in kwargs.keys():
+            self.__stats = kwargs['stats']
+            del kwargs['stats']
         # initialize substitution
         super(Worker, self).__init__(*args, **kwargs)
         # sanity check of parameters
@@ -75,6 +180,8 @@ class Worker(Substitution):
         """Returns utility including pending relations."""
         # not yet added relations
         u = self.__utility
+        if self.__stats is not None:
+            self.__stats['utility_evaluations'] += len(self.__rels)
         for (v, r) in self.__rels:
             ur = self.utility_fct.utility_of_relation(self.model, r, v)
             u = self.utility_fct.add(u, ur)
@@ -171,6 +278,9 @@ class Worker(Substitution):
             rpick[v] = rbest
             rpick_u[v] = ubest
             rall[v] = rset
+        if self.__stats is not None:
+            self.__stats['nodes'] += len(self.__vars)
+            self.__stats['utility_evaluations'] += len(rall_u)
         # additional workers for relations that are not handled in this worker
         w = self.__create_worker_params(rall, rall_u, rpick)
         # update current worker
@@ -186,26 +296,19 @@ class Worker(Substitution):
         return w
 
     def __create_worker_params(self, relations, relations_u, chosen):
-        w = []
-        # create combinations of variable's relations
-        rcombs = itertools.product(*relations.values())
-        # create worker for remaining combinations
-        for rc in rcombs:
-            # skip already selected relations
-            if set(rc) == set(chosen.values()):
-                continue
-            # save parameters for new workers: utility, relations, pending
-            # relations = list of tuples (v, r) (variable root and relation,
-            # such that worker knows where the relation comes from)
-            # ASSUMPTION: dictionary stays ordered between relations.values()
-            # and relations.keys() call
-            R = list(zip(relations.keys(), list(rc)))
-            U = self.__utility
-            for r in R:
-                U = self.utility_fct.add(U, relations_u[r])
-            wnew = U, list(self), R
-            w.append(wnew)
-        return w
+        # parameters for new workers: utility, relations, pending relations =
+        # list of tuples (v, r) (variable root and relation, such that worker
+        # knows where the relation comes from); the chosen relations first
+        # (the combination of this worker is skipped)
+        candidates = []
+        for v, rset in relations.items():
+            c = [(relations_u[(v, r)], (v, r)) for r in rset]
+            c.sort(key=lambda x: (-x[0], x[1][1] != chosen[v]))
+            candidates.append(c)
+        skip = all(c[0][1][1] == chosen[v]
+                   for c, v in zip(candidates, relations.keys()))
+        return WorkerParams(self.__utility, list(self), candidates,
+                            self.utility_fct, skip_best=skip)
 
     def __mark_as_failed(self):
         self.__failed = True
@@ -216,6 +319,9 @@ class Worker(Substitution):
     def successful(self):
         if self.__failed:
             return False
+        if self.__stats is not None:
+            self.__stats['requirement_checks'] += 1
+            self.__stats['tree_builds'] += len(self) > 0
         if not self.requirements_ok():
             return False
         return True
@@ -0,0 +1,163 @@
+"""Ahead-of-time export of substitutions to a standalone Python module.
+
+`Substitution.execute` needs the model (and networkx) at runtime to execute
+the relations of a substitution. For deployment the substitutions (e.g., the
+failover table of a monitor, i.e., the substitutions per domain) are written
+to a Python module instead and compiled to bytecode. The module contains the
+utils of the model and a function per substitution with the relation
+functions and constraints inlined (in execution order). It does not depend on
+shsa or networkx, i.e., the runtime imports it without any code generation.
+
+Interface of a generated module:
+- `SUBSTITUTIONS` -- List of (root, input variables, relations, function)
+  per substitution.
+- `FAILOVER` -- Dictionary of key (e.g., a domain) to the indices of its
+  substitutions in `SUBSTITUTIONS`, sorted by utility (best first).
+- `CONSTANTS` -- Values of the constants of the model.
+- `execute(index, inputs)` -- Executes a substitution given the value per
+  input variable (constants are added when missing). Returns None if a
+  constraint is violated.
+- `failover(key, inputs)` -- Executes the best substitution of a key which
+  inputs are available and which constraints are satisfied. Returns the index
+  of the substitution and the value (None, None if there is no such
+  substitution).
+
+Example:
+
+    write_module("substitutions.py", {'x': S})
+    import substitutions
+    index, x = substitutions.failover('x', {'x_nbr': .., ..})
+
+"""
+
+import networkx as nx
+import py_compile
+import textwrap3 as textwrap
+
+from model.provided import ProvidedOverlay
+from model.substitution import Substitution
+
+
+_RUNTIME = '''
+
+def execute(index, inputs):
+    """Executes a substitution given the value per input variable."""
+    _, vin, _, fct = SUBSTITUTIONS[index]
+    try:
+        args = [inputs[v] if v in inputs else CONSTANTS[v] for v in vin]
+    except KeyError:
+        raise RuntimeError("Missing inputs to execute the substitution.")
+    return fct(*args)
+
+
+def failover(key, inputs):
+    """Executes the best applicable substitution of the given key."""
+    for index in FAILOVER[key]:
+        vin = SUBSTITUTIONS[index][1]
+        if not all(v in inputs or v in CONSTANTS for v in vin):
+            continue
+        value = execute(index, inputs)
+        if value is not None:
+            return index, value
+    return None, None
+'''
+
+
+def substitution_code(s, name):
+    """Returns the code of a function executing the given substitution.
+
+    The parameters of the function are the input variables of the
+    substitution (see `Substitution.tree`). Each relation is inlined as
+    assignment of its output variable followed by its constraint.
+
+    """
+    model = s.model
+    t, vin = s.tree(collapse_variables=False)
+    code = "def {}({}):\n".format(name, ", ".join(vin))
+    body = ""
+    # execute relations (start with sources)
+    for n in nx.dfs_postorder_nodes(nx.Graph(t), s.root):
+        if not model.is_relation(n):
+            continue
+        ov = list(t.successors(n))[0]  # output
+        body += "# {}\n".format(n)
+        body += "{} = ({})\n".format(
+            ov, model.property_value_of(n, 'fct')[ov])
+        # check constraint (abort if violated)
+        body += "if not ({}):\n".format(
+            model.property_value_of(n, 'constraint')[ov])
+        body += "    return None\n"
+    body += "return {}\n".format(s.root)
+    return code + textwrap.indent(body, "    ")
+
+
+def module_code(table, model=None):
+    """Returns the code of a module executing the given substitutions.
+
+    table -- A substitution, a list of substitutions or a dictionary of key
+      to a list of substitutions (failover table). The key of a substitution
+      (list) is its root.
+    model -- SHSA model providing the utils and constants (defaults to the
+      model of the first substitution).
+
+    """
+    if isinstance(table, Substitution):
+        table = [table]
+    if not isinstance(table, dict):
+        table = {table[0].root: table} if len(table) > 0 else {}
+    substitutions = [s for S in table.values() for s in S]
+    if model is None and len(substitutions) > 0:
+        model = substitutions[0].model
+    code = '"""Substitutions generated by shsa (do not edit)."""\n\n'
+    # utils (additional python files with functions that may be used in the
+    # relations)
+    if model is not None and model.utils is not None:
+        for filename in model.utils:
+            with open(filename) as f:
+                code += "# utils: {}\n\n".format(filename)
+                code += f.read() + "\n\n"
+    # substitutions
+    index = {}
+    for i, s in enumerate(substitutions):
+        index[id(s)] = i
+        code += "\n{}\n\n".format(
+            substitution_code(s, "substitution_{}".format(i)))
+    code += "\nSUBSTITUTIONS = [\n"
+    for i, s in enumerate(substitutions):
+        _, vin = s.tree(collapse_variables=False)
+        code += "    ({!r}, {!r}, {!r}, substitution_{}),\n".format(
+            s.root, tuple(vin), tuple(sorted(s, key=str)), i)
+    code += "]\n\n"
+    # failover order per key
+    code += "FAILOVER = {\n"
+    for key, S in table.items():
+        ordered = sorted(S, key=lambda s: s.utility, reverse=True)
+        code += "    {!r}: {!r},\n".format(
+            key, [index[id(s)] for s in ordered])
+    code += "}\n\n"
+    constants = {}
+    if model is not None:
+        if isinstance(model, ProvidedOverlay):
+            model = model.model
+        constants = nx.get_node_attributes(model, 'constant')
+    code += "CONSTANTS = {!r}\n".format(constants)
+    code += _RUNTIME
+    return code
+
+
+def write_module(filename, table, model=None, compiled=True):
+    """Writes the given substitutions to a Python module (see
+    `module_code`).
+
+    filename -- Path of the module (*.py).
+    compiled -- If `True`, the module is compiled to bytecode (saved to the
+      cache, i.e., `__pycache__`, used on import).
+
+    Returns the path of the bytecode (None if not compiled).
+
+    """
+    with open(filename, 'w') as f:
+        f.write(module_code(table, model))
+    if not compiled:
+        return None
+    return py_compile.compile(filename, doraise=True)
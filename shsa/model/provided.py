@@ -0,0 +1,113 @@
+"""Provided-status overlay of a SHSA model.
+
+The search engines only read the 'provided' status of variables. Instead of
+rewriting the 'provided' property of every variable in the (shared) model
+before a search, an overlay fixes the set of provided variables and forwards
+everything else to the underlying model. The overlay can be passed to an
+engine (e.g., `DepthFirstSearch(overlay)`) instead of the model.
+
+An overlay is immutable, so many searches with different sets of provided
+variables may run concurrently on the same model (threads or processes; the
+overlay can be pickled).
+
+"""
+
+import networkx as nx
+
+
+class ProvidedOverlay(object):
+    """Read-only view of a SHSA model with its own set of provided
+    variables."""
+
+    def __init__(self, model, provided=None):
+        """Initializes the overlay.
+
+        model -- SHSA model (or another overlay, then its underlying model is
+            used).
+        provided -- Iterable of provided variables. Constants are always
+            provided. If None, the current provided status of the model is
+            used (snapshot).
+
+        """
+        if isinstance(model, ProvidedOverlay):
+            model = model.model
+        self.__model = model
+        """Underlying SHSA model."""
+        constants = nx.get_node_attributes(model, 'constant')
+        if provided is None:
+            provided = [v for v in model.variables if model.provided([v])]
+        self.__provided = frozenset(provided) | frozenset(constants)
+        """Set of provided variables."""
+        self.__hash = hash((self.__model, self.__provided))
+
+    @property
+    def model(self):
+        """Returns the underlying SHSA model."""
+        return self.__model
+
+    @property
+    def provided_variables(self):
+        """Returns the set of provided variables."""
+        return self.__provided
+
+    def __getattr__(self, name):
+        # forward everything else to the model (private attributes are not
+        # forwarded, e.g., when unpickling)
+        if name.startswith('__') or name.startswith('_ProvidedOverlay'):
+            raise AttributeError(name)
+        return getattr(self.__model, name)
+
+    def __contains__(self, node):
+        return node in self.__model
+
+    def __iter__(self):
+        return iter(self.__model)
+
+    def __len__(self):
+        return len(self.__model)
+
+    def __eq__(self, other):
+        if isinstance(other, ProvidedOverlay):
+            return self.__model is other.model \
+                and self.__provided == other.provided_variables
+        return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self.__hash
+
+    #
+    # SHSA properties (overridden)
+    #
+
+    def has_property(self, node, prop):
+        """Returns true if the node has an attribute 'prop'."""
+        if prop == 'provided':
+            return self.__model.is_variable(node)
+        return self.__model.has_property(node, prop)
+
+    def property_value_of(self, node, prop):
+        """Returns the value of a property of a node."""
+        if prop == 'provided':
+            return node in self.__provided
+        return self.__model.property_value_of(node, prop)
+
+    def set_property_to(self, node, prop, value):
+        raise RuntimeError("The provided overlay is read-only.")
+
+    def provided(self, nodes):
+        """Returns true, if all nodes are provided."""
+        assert type(nodes) is list, "given nodes must be of type list"
+        for n in nodes:
+            if n not in self.__provided:
+                if self.__model.is_relation(n):
+                    raise RuntimeError("Relations have no property "
+                                       "'provided'.")
+                return False
+        return True
+
+    def unprovided(self, nodes):
+        """Returns unprovided nodes."""
+        return [n for n in nodes if n not in self.__provided]
@@ -19,10 +19,12 @@ Example:
 
 """
 
+import builtins
 from enum import IntEnum
 from subprocess import call  # call dot to generate .png out of .dot files
 import yaml  # read graph structure and properties from config file
 import networkx as nx
+import numpy as np
 import warnings
 
 
@@ -43,7 +45,8 @@ class SHSAModel(nx.DiGraph):
 
     """
 
-    def __init__(self, graph_dict=None, properties=None, configfile=None):
+    def __init__(self, graph_dict=None, properties=None, configfile=None,
+                 nodes=None, edges=None):
         """Initializes a model.
 
         The underlying graph must be initialized by setting graph_dict defining
@@ -52,9 +55,23 @@ class SHSAModel(nx.DiGraph):
         the properties of each node in the graph must be provided in a
         dictionary, in particular to distinguish the node types.
 
+        Alternatively, the model is built at once from `nodes`, a list of
+        (node, properties) tuples, and `edges`, a list of (u, v) tuples (used
+        to generate large models).
+
         """
+        self.__utils = None
+        self.__code = {}
+        """Compiled function and constraint per relation and output."""
+        self.__namespace = None
+        """Global namespace of relation functions (utils of the model)."""
+        self.__builtins = None
+        """Builtins of the evaluation of a relation (Python's builtins and
+        the utils)."""
         if configfile is not None:
             self.__init_from_file(configfile)
+        elif nodes is not None:
+            self.__init_with_nodes(nodes, edges if edges is not None else [])
         elif (graph_dict is not None) and (properties is not None):
             self.__init_with_graph(graph_dict, properties)
         elif properties is not None:
@@ -82,6 +99,10 @@ class SHSAModel(nx.DiGraph):
             # map each provision to the variable
             for itom in itoms:
                 self.__map[itom] = var
+        # compile relation functions (invalid ones fail at load time)
+        for r, functions in nx.get_node_attributes(self, 'fct').items():
+            for output in functions:
+                self.code_of(r, output)
 
     def __init_with_nxgraph(self, properties):
         super(SHSAModel, self).__init__()
@@ -95,7 +116,6 @@ class SHSAModel(nx.DiGraph):
         defining the structure of the graph and the nodes' properties.
 
         """
-        self.__utils = None
         with open(configfile, 'r') as f:
             try:
                 data = yaml.load(f)
@@ -112,6 +132,13 @@ class SHSAModel(nx.DiGraph):
             if 'utils' in data.keys():
                 self.__utils = data['utils']
 
+    def __init_with_nodes(self, nodes, edges):
+        """Initializes the model with nodes (incl. their properties) and
+        edges."""
+        super(SHSAModel, self).__init__()
+        self.add_nodes_from(nodes)
+        self.add_edges_from(edges)
+
     def __init_with_edges(self, edges, properties):
         """Initializes the model with edges.
 
@@ -245,6 +272,143 @@ class SHSAModel(nx.DiGraph):
     def utils(self):
         return self.__utils
 
+    @property
+    def namespace(self):
+        """Returns the global namespace to execute relations in, i.e., the
+        utils of the model (additional python files with functions that may be
+        used in the relations) loaded once."""
+        if self.__namespace is None:
+            self.__namespace = {}
+            if self.__utils is not None:
+                for filename in self.__utils:
+                    with open(filename) as f:
+                        exec(compile(f.read(), filename, 'exec'),
+                             self.__namespace)
+        return self.__namespace
+
+    #
+    # execution of relations
+    #
+
+    def code_of(self, relation, output):
+        """Returns the compiled function and constraint of a relation given
+        the output variable.
+
+        The code is compiled once (the properties 'fct' and 'constraint' must
+        not change afterwards). An empty function is None (the relation cannot
+        be executed), a function or constraint that cannot be compiled raises
+        a RuntimeError.
+
+        """
+        key = (relation, output)
+        if key not in self.__code:
+            fct = self.property_value_of(relation, 'fct')[output]
+            constraint = "True"
+            if self.has_property(relation, 'constraint'):
+                constraint = self.property_value_of(
+                    relation, 'constraint')[output]
+            if fct.strip() == "":
+                self.__code[key] = (None, None)
+                return self.__code[key]
+            try:
+                self.__code[key] = (
+                    compile(fct, "<{}:{}>".format(relation, output), 'eval'),
+                    compile(constraint,
+                            "<{}:{} constraint>".format(relation, output),
+                            'eval'))
+            except SyntaxError as e:
+                raise RuntimeError("""Function or constraint of relation
+                '{}' for output '{}' cannot be compiled: {}""".format(
+                    relation, output, e))
+        return self.__code[key]
+
+    def execute_relation(self, relation, output, inputs):
+        """Executes a relation given the value per input variable.
+
+        Returns the value of the output variable or None if the constraint is
+        not satisfied.
+
+        """
+        fct, constraint = self.code_of(relation, output)
+        if fct is None:
+            raise RuntimeError("""Relation '{}' cannot be executed for output
+            '{}' (no valid function).""".format(relation, output))
+        args = self.__globals(inputs)
+        args[output] = eval(fct, args)
+        if not eval(constraint, args):
+            return None
+        return args[output]
+
+    def __globals(self, inputs):
+        """Returns the namespace to evaluate a relation in, i.e., the inputs
+        and the utils.
+
+        The inputs are globals (not locals) of the evaluation, such that
+        nested scopes of the function and the constraint, e.g., comprehensions
+        or lambdas, see them. The utils are part of the builtins, i.e., only
+        the inputs are copied per evaluation.
+
+        """
+        if self.__builtins is None:
+            self.__builtins = dict(vars(builtins))
+            self.__builtins.update((k, v) for k, v in self.namespace.items()
+                                   if k != '__builtins__')
+        args = dict(inputs)
+        args['__builtins__'] = self.__builtins
+        return args
+
+    def execute_relation_batch(self, relation, output, inputs, n):
+        """Executes a relation for n samples given the values per input
+        variable.
+
+        inputs -- Dictionary of variable to values (array of n samples or a
+          scalar, e.g., a constant).
+
+        The function and the constraint are evaluated once on the arrays
+        (column-wise). A relation that cannot be evaluated on arrays (e.g.,
+        uses `math` functions or branches) is executed per sample. Returns
+        the values of the output variable (array of floats) which are NaN if
+        an input is NaN or the constraint is not satisfied.
+
+        """
+        fct, constraint = self.code_of(relation, output)
+        if fct is None:
+            raise RuntimeError("""Relation '{}' cannot be executed for output
+            '{}' (no valid function).""".format(relation, output))
+        invalid = np.zeros(n, dtype=bool)
+        for a in inputs.values():
+            a = np.asarray(a)
+            if a.dtype.kind == 'f':
+                invalid |= np.isnan(a)
+        args = self.__globals(inputs)
+        try:
+            with np.errstate(invalid='ignore'):
+                value = np.broadcast_to(np.asarray(
+                    eval(fct, args), dtype=float), (n,))
+                args[output] = value
+                ok = np.broadcast_to(np.asarray(
+                    eval(constraint, args), dtype=bool), (n,))
+        except (TypeError, ValueError):
+            # not vectorizable, execute per sample
+            value = np.full(n, np.nan)
+            for t in np.flatnonzero(~invalid):
+                v = self.execute_relation(relation, output, {
+                    i: a[t] if np.ndim(a) > 0 else a
+                    for i, a in inputs.items()})
+                if v is not None:
+                    value[t] = v
+            return value
+        return np.where(ok & ~invalid, value, np.nan)
+
+    def __getstate__(self):
+        # compiled code and the namespace (modules) cannot be pickled, they
+        # are recreated on demand
+        state = dict(self.__dict__)
+        state['_SHSAModel__code'] = {}
+        state['_SHSAModel__namespace'] = None
+        state['_SHSAModel__builtins'] = None
+        return state
+
     #
     # getters for SHSA properties
     #
@@ -343,8 +507,8 @@ class SHSAModel(nx.DiGraph):
                     for out, fct in self.property_value_of(v, 'fct').items():
                         fctstr.append(out + " = " + fct)
                     if len(fctstr) > 0:
-                        nodestyle += ",label=\"{}: {}\"".format(v,
-                                         "\n".join(fctstr))
+                        nodestyle += ",label=\"{}: {}\"".format(
+                            v, "\n".join(fctstr))
                 elif self.provided([v]):
                     nodestyle += "style=filled,fillcolor=\"lightgrey\","
                 f.write(" \"{0}\" [{1}];\n".format(v, nodestyle))
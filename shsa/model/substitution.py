@@ -9,8 +9,7 @@ install_aliases()
 from collections import UserList
 import networkx as nx
 from subprocess import call  # call dot to generate .png out of .dot files
-import textwrap3 as textwrap
-1
+
 from model.shsamodel import SHSANodeType
 from model.utility import *
 
@@ -89,6 +88,26 @@ class Substitution(UserList):
         """Returns set of relations involved in the substitution."""
         return frozenset(self)
 
+    def outputs(self):
+        """Returns the output variable of each relation (dict), i.e., the
+        direction the relations are executed."""
+        g, _ = self.tree(collapse_variables=False)
+        return {r: next(iter(g.successors(r)))
+                for r in self if r in g and g.out_degree(r) > 0}
+
+    def compatible(self, other):
+        """Returns true if both substitutions can be applied at the same time,
+        i.e., common relations are executed in the same direction and none
+        takes the other's root as input variable."""
+        if self.root in other.input_variables or \
+           other.root in self.input_variables:
+            return False
+        common = self.relations() & other.relations()
+        if len(common) == 0:
+            return True
+        o1, o2 = self.outputs(), other.outputs()
+        return all(o1.get(r) == o2.get(r) for r in common)
+
     def requirements_ok(self):
         """Returns false if the substitution does not fulfil the requirements.
 
@@ -170,69 +189,30 @@ class Substitution(UserList):
             g.remove_nodes_from(nremove)
         return g, inputs
 
-    def __gen_code(self):
-        """Generates code and inputs for the given substitution.
-
-        Returns the input topics and the python code to execute. The transfer
-        node executes the code in the form of "y=f(x)". Whereas x is a vector
-        of values received as inputs, and y is the value of the output.
-
-        """
-        # dfs of substitution tree
-        t, vin = self.tree(collapse_variables=False)
-        n_ordered = nx.dfs_postorder_nodes(nx.Graph(t), self.__root)
-        # execute functions (start with sources)
-        code = "\n"
-        for n in n_ordered:
-            if self.__model.is_relation(n):
-                # I/O variables of relation
-                iv = ",".join(t.predecessors(n))  # input
-                ov = list(t.successors(n))[0]  # output
-                # define relation as function
-                code += "def " + n + "(" + iv + "):\n"
-                code += "    return (" \
-                        + self.__model.property_value_of(n, 'fct')[ov] \
-                        + ")\n\n"
-                # execute relation
-                code += ov + " = " + n + "(" + iv + ")\n\n"
-                # check constraint (abort if violated)
-                code += "if not (" \
-                        + self.__model.property_value_of(n, 'constraint')[ov] \
-                        + "):\n"
-                code += "    return None\n\n"
-        return vin, code
-
     def execute(self, inputs):
         """Executes the substitution given the value per input variable.
 
         inputs -- Dictionary of variable->value.
 
+        The relations are executed in the order of the substitution tree
+        (start with sources) using the compiled functions of the model (see
+        `SHSAModel.execute_relation`). Returns None if a constraint is not
+        satisfied.
+
         """
-        # prepend utils to code (additional python files with functions
-        # that may be used in the relations)
-        u_code = ""
-        if self.__model.utils is not None:
-            u_code += "# utils\n\n"
-            for filename in self.__model.utils:
-                with open(filename) as f:
-                    u_code += f.read() + "\n"
-        # code generate substitution tree (ROS shsa_node.py)
-        vin, s_code = self.__gen_code()
+        t, vin = self.tree(collapse_variables=False)
         if not set(vin).issubset(set(inputs.keys())):
             raise RuntimeError("Missing inputs to execute the substitution.")
-        # execute the code - enclose everything with a function such that all
-        # util and substitution functions are local in the defined function
-        # `execute` (otherwise we would have to call `global fct`)
-        params = ",".join(vin)
-        code = "def execute(" + params + "):\n\n"
-        code += textwrap.indent(u_code, "    ")
-        code += "\n    # substitution\n"
-        code += textwrap.indent(s_code, "    ")
-        code += "\n    return " + self.__root  # assign output
-        code += "\n\n\nresult = execute(" + params + ")"
-        local_vars = inputs
-        exec(code, None, local_vars)
-        return local_vars['result']
+        values = dict(inputs)
+        for n in nx.dfs_postorder_nodes(nx.Graph(t), self.__root):
+            if not self.__model.is_relation(n):
+                continue
+            ov = list(t.successors(n))[0]  # output
+            args = {v: values[v] for v in t.predecessors(n)}
+            values[ov] = self.__model.execute_relation(n, ov, args)
+            if values[ov] is None:
+                return None  # constraint violated
+        return values[self.__root]
 
     def write_dot(self, basefilename, oformat=None):
         """Saves the model as dot-file and generates an image if oformat given.
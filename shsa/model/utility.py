@@ -15,6 +15,9 @@ class Utility(object):
     def utility_of_substitution(self, s):
         pass
 
+    def utility_of_substitutions(self, substitutions):
+        pass
+
     def best(self):
         pass
 
@@ -94,6 +97,25 @@ class UtilityNorm(Utility):
             u = self.add(u, ui)
         return u
 
+    def utility_of_substitutions(self, substitutions):
+        """Returns the joint utility of several substitutions applied at the
+        same time.
+
+        A relation shared by the substitutions (executed in the same
+        direction) is paid once, i.e., the product of the utilities of the
+        distinct relations.
+
+        """
+        u = self.best()
+        paid = set()
+        for s in substitutions:
+            for r, v in s.outputs().items():
+                if (r, v) in paid:
+                    continue
+                paid.add((r, v))
+                u = self.add(u, self.utility_of_relation(s.model, r, v))
+        return u
+
     def best(self):
         """Returns best utility, i.e., initial of an empty substitution."""
         return 1.0
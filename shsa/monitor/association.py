@@ -0,0 +1,178 @@
+"""Track association.
+
+Pairs the tracks of two sensors that correspond to the same object (e.g., a
+vehicle observed by two neighboring radar sensors). A track of the first
+sensor is paired with the nearest track of the second sensor, iff the distance
+is below a maximum offset (around vehicle size / lane width).
+
+The positions of the candidate tracks are indexed by a uniform grid with a
+cell size equal to the maximum offset, so only the tracks in the 3x3
+neighboring cells of a track have to be compared. Association costs stay
+near-linear in the number of tracks.
+
+"""
+
+import math
+import numpy as np
+
+
+class GridIndex(object):
+    """Uniform grid over 2D positions."""
+
+    def __init__(self, x, y, cellsize):
+        """Builds the index.
+
+        x, y -- Arrays of the coordinates of the positions to index.
+        cellsize -- Edge length of a (square) grid cell.
+
+        """
+        if cellsize <= 0:
+            raise RuntimeError("Cell size must be positive.")
+        self.__x = np.asarray(x, dtype=float)
+        self.__y = np.asarray(y, dtype=float)
+        self.__cellsize = cellsize
+        self.__cells = {}
+        """Indices of the positions per cell."""
+        cx = np.floor(self.__x / cellsize).astype(int)
+        cy = np.floor(self.__y / cellsize).astype(int)
+        for i, cell in enumerate(zip(cx.tolist(), cy.tolist())):
+            self.__cells.setdefault(cell, []).append(i)
+
+    def __len__(self):
+        return len(self.__x)
+
+    def candidates(self, x, y):
+        """Returns index arrays (query, position) of all positions in the
+        cells neighboring the queried positions.
+
+        x, y -- Arrays of the coordinates of the queried positions.
+
+        """
+        cx = np.floor(np.asarray(x, dtype=float) / self.__cellsize)
+        cy = np.floor(np.asarray(y, dtype=float) / self.__cellsize)
+        qidx = []
+        pidx = []
+        for q, (i, j) in enumerate(zip(cx.astype(int).tolist(),
+                                       cy.astype(int).tolist())):
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    cell = self.__cells.get((i + di, j + dj))
+                    if cell is not None:
+                        pidx.extend(cell)
+                        qidx.extend([q] * len(cell))
+        return np.array(qidx, dtype=int), np.array(pidx, dtype=int)
+
+    def nearest(self, x, y, max_sqdist):
+        """Returns the index of the nearest position per queried position
+        (-1 if there is none within the maximum squared distance) and the
+        squared distance to it.
+
+        x, y -- Arrays of the coordinates of the queried positions.
+        max_sqdist -- Maximum squared distance (exclusive).
+
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        nearest = np.full(len(x), -1, dtype=int)
+        sqdist = np.full(len(x), np.inf)
+        qidx, pidx = self.candidates(x, y)
+        if len(qidx) == 0:
+            return nearest, sqdist
+        # vectorized distance of all candidate pairs
+        d = (x[qidx] - self.__x[pidx])**2 + (y[qidx] - self.__y[pidx])**2
+        valid = d < max_sqdist
+        qidx, pidx, d = qidx[valid], pidx[valid], d[valid]
+        # select the nearest position per query (first of each query after
+        # sorting by query, distance and position)
+        order = np.lexsort((pidx, d, qidx))
+        qidx, pidx, d = qidx[order], pidx[order], d[order]
+        first = np.ones(len(qidx), dtype=bool)
+        first[1:] = qidx[1:] != qidx[:-1]
+        nearest[qidx[first]] = pidx[first]
+        sqdist[qidx[first]] = d[first]
+        return nearest, sqdist
+
+
+class TrackAssociation(object):
+    """Maintains pairs of track IDs of two sensors.
+
+    Track IDs are assumed to be unique throughout a run (IDs are not re-used
+    when a track vanishes). Once a track of the first sensor is paired, the
+    pair is kept.
+
+    """
+
+    def __init__(self, max_sqdist=6, position=('x', 'y')):
+        """Initialize the association.
+
+        max_sqdist -- Maximum squared distance of paired tracks.
+        position -- Field names of the position in a track.
+
+        """
+        self.__max_sqdist = max_sqdist
+        """Maximum squared distance (exclusive) of paired tracks."""
+        self.__position = position
+        """Field names of the position in a track."""
+        self.__pairs = {}
+        """Paired track IDs (key: ID of the first sensor's track, value: ID
+        of the second sensor's track). Ordered by creation."""
+        self.__order = {}
+        """Creation index of a pair (key: ID of the first sensor's track)."""
+
+    @property
+    def pairs(self):
+        """Returns the paired track IDs as list of [id1, id2]."""
+        return [[tid1, tid2] for tid1, tid2 in self.__pairs.items()]
+
+    def __contains__(self, tid1):
+        return tid1 in self.__pairs
+
+    def __positions(self, tracks):
+        xf, yf = self.__position
+        x = np.array([t[xf] for t in tracks], dtype=float)
+        y = np.array([t[yf] for t in tracks], dtype=float)
+        return x, y
+
+    def update(self, tracks1, tracks2):
+        """Pairs unmatched tracks of the first sensor with the nearest track
+        of the second sensor.
+
+        tracks1 -- Current tracks of the first sensor (dict ID->track).
+        tracks2 -- Tracks of the second sensor (dict ID->track).
+
+        Returns the new pairs as list of [id1, id2].
+
+        """
+        unmatched = [tid for tid in tracks1 if tid not in self.__pairs]
+        if len(unmatched) == 0 or len(tracks2) == 0:
+            return []
+        ids2 = list(tracks2.keys())
+        x2, y2 = self.__positions(tracks2.values())
+        index = GridIndex(x2, y2, math.sqrt(self.__max_sqdist))
+        x1, y1 = self.__positions([tracks1[tid] for tid in unmatched])
+        nearest, _ = index.nearest(x1, y1, self.__max_sqdist)
+        new = []
+        for tid1, i in zip(unmatched, nearest.tolist()):
+            if i < 0:
+                continue
+            tid1, tid2 = int(tid1), int(ids2[i])
+            self.__order[tid1] = len(self.__pairs)
+            self.__pairs[tid1] = tid2
+            new.append([tid1, tid2])
+        return new
+
+    def pair(self, tracks1, tracks2):
+        """Returns pairs of tracks, i.e., tracks that can be compared.
+
+        tracks1 -- Tracks of the first sensor (dict ID->track).
+        tracks2 -- Tracks of the second sensor (dict ID->track).
+
+        Only pairs where both tracks are available are returned (tracks may
+        vanish from view). The pairs are ordered by creation.
+
+        """
+        present = [tid1 for tid1 in tracks1 if tid1 in self.__pairs
+                   and self.__pairs[tid1] in tracks2]
+        present.sort(key=lambda tid1: self.__order[tid1])
+        return [[tracks1[tid1], tracks2[self.__pairs[tid1]]]
+                for tid1 in present]
@@ -4,6 +4,7 @@
 
 from __future__ import absolute_import
 from enum import IntEnum
+import numpy as np
 
 from monitor.comparator import SimpleComparator
 
@@ -67,3 +68,39 @@ class FaultAgreement(object):
                 # judge the inputs of s
                 status[i] = ItomFaultStatusType.UNDEFINED
         return status
+
+    def agree_batch(self, values, error=1.0):
+        """Annotate the values of several samples with a fault status (see
+        `agree`).
+
+        values -- Array of the values that should match, a row per value and
+          a column per sample. NaN is treated like None in `agree`.
+        error -- Maximal allowed deviation of the values.
+
+        Returns an array of fault status (integers, same shape as values).
+
+        """
+        values = np.asarray(values, dtype=float)
+        k, n = values.shape
+        valid = ~np.isnan(values)
+        # number of mismatches per value (see `SimpleComparator`)
+        mismatches = np.zeros((k, n), dtype=int)
+        for i in range(k):
+            for j in range(i+1, k):
+                m = valid[i] & valid[j] & \
+                    ~np.isclose(values[i], values[j], atol=error)
+                mismatches[i] += m
+                mismatches[j] += m
+        # 1-fault-tolerant
+        faulty = mismatches > 1  # at least two other values mismatch
+        nfaulty = faulty.sum(axis=0)
+        status = np.where(faulty, int(ItomFaultStatusType.FAULTY),
+                          int(ItomFaultStatusType.OK))
+        # handle no numbers due to unsatisfied constraints
+        status[~valid] = ItomFaultStatusType.UNDEFINED
+        # more than one value incorrect (inconsistent) or too few redundancies
+        # to judge fault
+        undefined = (nfaulty > 1) | ((nfaulty == 0) &
+                                     (mismatches.sum(axis=0) > 0))
+        status[:, undefined] = ItomFaultStatusType.UNDEFINED
+        return status
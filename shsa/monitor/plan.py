@@ -0,0 +1,161 @@
+"""Evaluation plan of several substitutions.
+
+The substitutions of a monitor (of one or several domains) often share
+relation applications, e.g., the forward estimation of an old track is part
+of several substitution trees. The plan merges the substitution trees into one
+directed acyclic graph of relation applications, each identified by its key
+(relation, output, keys of inputs); an input variable is identified by its
+name. Each relation application is evaluated once per sample, even if it is
+part of several substitutions.
+
+A violated constraint propagates to every dependent relation application,
+i.e., its output and the outputs depending on it are None (NaN when
+evaluated for a batch of samples).
+
+The plan is built once per set of substitutions (this requires the
+substitution trees), the evaluation per sample does not touch the
+substitutions anymore. The plan also maps the itoms of a sample to the input
+variables of the substitutions (see `inputs`).
+
+"""
+
+import networkx as nx
+import numpy as np
+
+
+class EvaluationPlan(object):
+    """Shared evaluation of substitutions."""
+
+    def __init__(self, model, substitutions):
+        """Builds the plan.
+
+        model -- SHSA model executing the relations (see
+            `SHSAModel.execute_relation`).
+        substitutions -- List of substitutions to evaluate.
+
+        """
+        self.__model = model
+        """SHSA model."""
+        self.__substitutions = list(substitutions)
+        """Substitutions to evaluate."""
+        self.__steps = []
+        """Relation applications in execution order (key, relation, output,
+        input variables)."""
+        self.__outputs = []
+        """Key of the output per substitution."""
+        self.__input_variables = []
+        """Input variables per substitution."""
+        self.__constants = {}
+        """Value per constant input variable."""
+        keys = set()
+        for s in self.__substitutions:
+            steps, key, vin = self.__plan(s)
+            for step in steps:
+                if step[0] not in keys:
+                    keys.add(step[0])
+                    self.__steps.append(step)
+            self.__outputs.append(key)
+            self.__input_variables.append(vin)
+            for v in vin:
+                if model.has_property(v, 'constant'):
+                    self.__constants[v] = model.itoms(v)
+
+    @property
+    def model(self):
+        """Returns the underlying SHSA model."""
+        return self.__model
+
+    @property
+    def substitutions(self):
+        """Returns the substitutions of the plan."""
+        return self.__substitutions
+
+    @property
+    def input_variables(self):
+        """Returns the input variables per substitution."""
+        return self.__input_variables
+
+    def __len__(self):
+        """Returns the number of relation applications (evaluated per
+        sample)."""
+        return len(self.__steps)
+
+    def __plan(self, s):
+        """Returns the relation applications of a substitution in execution
+        order, the key of the substitution's output and the input
+        variables."""
+        t, vin = s.tree(collapse_variables=False)
+        keys = {v: v for v in vin}
+        steps = []
+        for n in nx.dfs_postorder_nodes(nx.Graph(t), s.root):
+            if not self.__model.is_relation(n):
+                continue
+            inputs = sorted(t.predecessors(n))
+            output = list(t.successors(n))[0]
+            key = (n, output, tuple(keys[i] for i in inputs))
+            keys[output] = key
+            steps.append((key, n, output, inputs))
+        return steps, keys[s.root], vin
+
+    def inputs(self, itoms):
+        """Returns the value per input variable and the used itoms per
+        substitution given the value per itom.
+
+        The value of a variable is the one of its first itom, constants are
+        taken from the model.
+
+        """
+        inputs = dict(self.__constants)
+        used = []  # used itoms per substitution
+        for vin in self.__input_variables:
+            used.append([])
+            for v in vin:
+                if v in self.__constants:
+                    continue
+                # TODO: handle itoms for the same variable (how-to?) - here:
+                # take first occurence
+                for i in itoms:
+                    if v == self.__model.variable(i):
+                        used[-1].append(i)
+                        inputs[v] = itoms[i]
+                        break
+                if v not in inputs.keys():
+                    raise RuntimeError("""No corresponding itom found for
+                    variable {}.""".format(v))
+        return inputs, used
+
+    def execute(self, inputs):
+        """Executes the substitutions given the value per input variable.
+
+        Returns the output value per substitution (None if a constraint is
+        not satisfied).
+
+        """
+        values = dict(inputs)  # value per key
+        for k, r, output, rin in self.__steps:
+            args = {i: values[kin] for i, kin in zip(rin, k[2])}
+            if any(a is None for a in args.values()):
+                values[k] = None  # constraint of an input violated
+                continue
+            values[k] = self.__model.execute_relation(r, output, args)
+        return [values[key] for key in self.__outputs]
+
+    def execute_batch(self, inputs, n):
+        """Executes the substitutions for n samples given the values per input
+        variable (array of n samples or a scalar, e.g., a constant).
+
+        The relation applications are evaluated column-wise (see
+        `SHSAModel.execute_relation_batch`). Returns an array of the output
+        values (row per substitution, column per sample; NaN if a constraint
+        is not satisfied).
+
+        """
+        values = dict(inputs)  # values per key
+        for k, r, output, rin in self.__steps:
+            args = {i: values[kin] for i, kin in zip(rin, k[2])}
+            values[k] = self.__model.execute_relation_batch(r, output, args,
+                                                            n)
+        out = np.empty((len(self.__outputs), n))
+        for i, key in enumerate(self.__outputs):
+            out[i] = values[key]
+        return out
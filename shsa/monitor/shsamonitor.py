@@ -11,16 +11,19 @@ domain. Relations probably have to be concatenated -> to substitutions.
 """
 
 from __future__ import absolute_import
-import networkx as nx
-from collections import OrderedDict
+import numpy as np
+import time
+from collections import Counter, OrderedDict
 import yaml
 
 from monitor.monitor import Monitor
 from monitor.fault import ItomFaultStatusType
 from model.shsamodel import SHSAModel
+from model.provided import ProvidedOverlay
 from engine.dfs import DepthFirstSearch
 from model.substitution import Substitution
 from monitor.fault import FaultAgreement
+from monitor.plan import EvaluationPlan
 from utils.logger import Logger
 
 
@@ -30,7 +33,8 @@ class SHSAMonitor(Monitor):
 
     """
 
-    def __init__(self, model, domain, itoms=None, logfile=None):
+    def __init__(self, model, domain, itoms=None, logfile=None, stats=False,
+                 stats_logfile=None, stats_period=100):
         """Initialize the monitor.
 
         model -- SHSA knowledge base collecting the relations between
@@ -39,15 +43,33 @@ class SHSAMonitor(Monitor):
             itoms will be compared to each other.
         itoms -- List of itoms (name only) which are inputs to monitor.
         logfile -- Path to a file where the monitor writes its logs to (yaml).
+        stats -- If `True`, the monitor counts its operations (e.g., monitor
+            and execute calls) and aggregates the counters of its searches
+            (see `stats`).
+        stats_logfile -- Path to a file where the monitor dumps its counters
+            to every `stats_period` monitor calls (yaml, requires stats).
         """
+        self.__stats = Counter() if stats else None
+        """Counters and timers (ns) of the monitor, None if disabled."""
+        self.__stats_logger = None
+        """YAML Logger of the counters."""
+        if stats and stats_logfile is not None:
+            self.__stats_logger = Logger(stats_logfile, 'w')
+        self.__stats_period = stats_period
+        """Number of monitor calls between two dumps of the counters."""
         self.__model = model
         """SHSA knowledge base."""
         self.__domain = domain
         """Variable domain where the itoms shall be compared."""
         self.__itoms = itoms
         """List of itom (names) that will be monitored."""
+        self.__search_model = None
+        """Overlay of the model where only the monitored itoms are
+        provided."""
         self.__substitutions = None
         """Substitutions used to bring the itoms into the common domain."""
+        self.__plan = None
+        """Evaluation plan of the substitutions."""
         if itoms is not None:
             self.__substitutions = self.__collect_substitutions(itoms)
         """Collect functions to transfer itoms to the domain (collect relations
@@ -93,6 +115,14 @@ class SHSAMonitor(Monitor):
     def logger(self):
         return self.__logger
 
+    @property
+    def stats(self):
+        """Returns the counters and timers (ns) of the monitor incl. the
+        aggregated counters of its searches (None if not enabled)."""
+        if self.__stats is None:
+            return None
+        return dict(self.__stats)
+
     def __collect_substitutions(self, itoms):
         """Map itom to variable and find relations from variables to domain.
 
@@ -109,26 +139,30 @@ class SHSAMonitor(Monitor):
         """
         # map itoms to variables
         provided_vars = [self.__model.variable(itom) for itom in itoms]
-        # reset provided status of variables in the model; only the given itoms
-        # are provided in the model (only substitutions with these itoms are
-        # searched)
-        for v in self.__model.variables:
-            try:
-                provided_status = True if v in provided_vars else False
-                self.__model.set_property_to(v, 'provided', provided_status)
-            except Exception:
-                # we are not able to reset provided status of constants, this
-                # is ok
-                pass
+        # only the given itoms are provided (only substitutions with these
+        # itoms are searched); the model itself is not modified
+        self.__search_model = ProvidedOverlay(self.__model, provided_vars)
         # get all possible substitutions
-        search_engine = DepthFirstSearch(self.__model)
+        search_engine = DepthFirstSearch(self.__search_model,
+                                         stats=self.__stats is not None)
         substitutions = search_engine.substitute(self.__domain,
                                                  substitute_provided=False)
+        if self.__stats is not None:
+            self.__stats['searches'] += 1
+            for key, value in search_engine.stats.items():
+                if key == 'time':
+                    key = 'search_time'
+                self.__stats[key] += value
         # when the root is already provided an empty substitution is also valid
-        if self.__model.provided([self.__domain]):
-            s = Substitution(root=self.__domain, model=self.__model)
+        if self.__search_model.provided([self.__domain]):
+            s = Substitution(root=self.__domain, model=self.__search_model)
             substitutions.append(s)
-        self.__substitutions = substitutions
+        # relation applications shared by the substitutions are evaluated
+        # once
+        self.__plan = EvaluationPlan(self.__model, substitutions)
+        if self.__stats is not None:
+            self.__stats['tree_builds'] += len(substitutions)
+        return substitutions
 
     def monitor(self, itoms):
         """Analyze the given data for faults.
@@ -138,35 +172,36 @@ class SHSAMonitor(Monitor):
         Returns the fault status per itom.
 
         """
+        if self.__stats is None:
+            return self.__monitor(itoms)
+        start = time.perf_counter_ns()
+        istatus = self.__monitor(itoms)
+        self.__stats['time'] += time.perf_counter_ns() - start
+        self.__stats['monitor_calls'] += 1
+        if self.__stats_logger is not None \
+           and self.__stats['monitor_calls'] % self.__stats_period == 0:
+            self.__stats_logger.log(time=self.__stats['monitor_calls'],
+                                    stats=dict(self.__stats))
+        return istatus
+
+    def __monitor(self, itoms):
+        """Monitors the itoms (see `monitor`)."""
         # recollect substitutions when itoms change
-        if self.__itoms is None \
-           or set(itoms.keys()) is not set(self.__itoms.keys()):
-            self.__collect_substitutions(itoms)
-        # get constants additionally to provisions
-        constants = nx.get_node_attributes(self.__model, 'constant')
-        # transfer the itoms into the common domain
-        input_itoms = OrderedDict()
-        out = OrderedDict()
-        for i, s in enumerate(self.__substitutions):
-            # transfer itoms to variables for the current substitution
-            input_itoms[s] = []  # used itoms per substitution
-            inputs = {}  # input (itom) values for execution of substitution
-            for v in s.input_variables:
-                if v in constants:
-                    inputs[v] = self.__model.itoms(v)
-                    continue
-                # TODO: handle itoms for the same variable (how-to?) - here:
-                # take first occurence
-                for i in itoms:
-                    if v == self.__model.variable(i):
-                        input_itoms[s].append(i)
-                        inputs[v] = itoms[i]
-                        break
-                if v not in inputs.keys():
-                    raise RuntimeError("""No corresponding itom found for
-                    variable {}.""".format(v))
-            # bring to common domain
-            out[s] = s.execute(inputs)
+        if self.__itoms is None or set(itoms.keys()) != set(self.__itoms):
+            self.__itoms = list(itoms.keys())
+            self.__substitutions = self.__collect_substitutions(itoms)
+        # transfer itoms to variables for the substitutions
+        inputs, input_itoms = self.__plan.inputs(itoms)
+        # bring to common domain
+        if self.__stats is None:
+            values = self.__plan.execute(inputs)
+        else:
+            start = time.perf_counter_ns()
+            values = self.__plan.execute(inputs)
+            self.__stats['execute_time'] += time.perf_counter_ns() - start
+            self.__stats['execute_calls'] += len(values)
+            self.__stats['relation_executions'] += len(self.__plan)
+        out = OrderedDict(zip(self.__substitutions, values))
         # agree about the fault status of the output values
         a = FaultAgreement()
         vstatus = a.agree(list(out.values()), error=0.1)
@@ -174,14 +209,79 @@ class SHSAMonitor(Monitor):
         # note that it is unclear which of the inputs caused the fault -> all
         # are marked faulty!
         istatus = {i: ItomFaultStatusType.OK for i in itoms}
-        for i, s in enumerate(self.__substitutions):
-            for itom in input_itoms[s]:
+        for i in range(len(self.__substitutions)):
+            for itom in input_itoms[i]:
                 istatus[itom] = vstatus[i]
         # log if desired
         if self.__logger is not None:
             self.__log(itoms, istatus, out, vstatus)
         return istatus
 
+    def monitor_batch(self, itom_table):
+        """Analyze the given samples for faults.
+
+        itom_table -- NumPy structured array (field per itom) or dictionary
+            of itom names to columns (array-like), with a row per sample.
+
+        The substitutions are executed column-wise for all samples at once
+        (see `EvaluationPlan.execute_batch`) and the fault status is agreed
+        per sample (see `FaultAgreement.agree_batch`), i.e., the result
+        equals a call of `monitor` per sample. Except for missing samples
+        (NaN): outputs depending on a NaN are treated like outputs of
+        unsatisfied constraints (UNDEFINED).
+
+        Returns the fault status per itom (array of `ItomFaultStatusType`
+        values, one per sample).
+
+        """
+        if self.__stats is None:
+            return self.__monitor_batch(itom_table)
+        start = time.perf_counter_ns()
+        istatus = self.__monitor_batch(itom_table)
+        self.__stats['batch_time'] += time.perf_counter_ns() - start
+        self.__stats['batch_calls'] += 1
+        return istatus
+
+    def __monitor_batch(self, itom_table):
+        """Monitors the samples (see `monitor_batch`)."""
+        names = getattr(getattr(itom_table, 'dtype', None), 'names', None)
+        if names is None:
+            names = list(itom_table.keys())
+        itoms = OrderedDict((i, np.asarray(itom_table[i])) for i in names)
+        n = len(itoms[names[0]]) if len(names) > 0 else 0
+        # recollect substitutions when itoms change
+        if self.__itoms is None or set(itoms.keys()) != set(self.__itoms):
+            self.__itoms = list(itoms.keys())
+            self.__substitutions = self.__collect_substitutions(itoms)
+        # transfer itoms to variables for the substitutions
+        inputs, input_itoms = self.__plan.inputs(itoms)
+        # bring to common domain (all samples at once)
+        if self.__stats is None:
+            values = self.__plan.execute_batch(inputs, n)
+        else:
+            start = time.perf_counter_ns()
+            values = self.__plan.execute_batch(inputs, n)
+            self.__stats['execute_time'] += time.perf_counter_ns() - start
+            self.__stats['samples'] += n
+        # agree about the fault status of the output values per sample
+        a = FaultAgreement()
+        vstatus = a.agree_batch(values, error=0.1)
+        # map value status to itom status (see `monitor`)
+        istatus = {i: np.full(n, int(ItomFaultStatusType.OK)) for i in itoms}
+        for i in range(len(self.__substitutions)):
+            for itom in input_itoms[i]:
+                istatus[itom] = vstatus[i].copy()
+        # log if desired (per sample)
+        if self.__logger is not None:
+            for t in range(n):
+                out = OrderedDict(
+                    (s, None if np.isnan(v) else v)
+                    for s, v in zip(self.__substitutions, values[:, t]))
+                self.__log({i: c[t] for i, c in itoms.items()},
+                           {i: s[t] for i, s in istatus.items()}, out,
+                           list(vstatus[:, t]))
+        return istatus
+
     def __log(self, itoms, istatus, out, ostatus):
         """Log data from the monitor to a yaml file.
 
@@ -200,8 +300,7 @@ class SHSAMonitor(Monitor):
         # specific classes)
         subs = {'relations': [list(s.relations())
                               for s in self.__substitutions],
-                'input_variables': [s.input_variables
-                                    for s in self.__substitutions]}
+                'input_variables': self.__plan.input_variables}
         istatus_builtin = {key: int(value) for key, value in istatus.items()}
         itoms_builtin = {key: float(value) for key, value in itoms.items()}
         out_builtin = [float(v) if v is not None else None
@@ -0,0 +1,197 @@
+"""SHSA monitor for several domains.
+
+Monitors the itoms in several common domains (variables in the SHSA knowledge
+base) at once, e.g., the x- and y-position of a tracked object.
+
+In contrast to a `SHSAMonitor` per domain:
+- The substitutions of all domains are searched at once, sharing the results
+  of common sub-searches.
+- The relation outputs are evaluated once per sample, even if they are part
+  of several substitutions (of the same or different domains, see
+  `EvaluationPlan`).
+- The model given by the user is not modified (the provided status of the
+  variables is set by an overlay per set of itoms).
+
+The substitutions and the evaluation plan are kept for the recently
+monitored sets of itoms (least recently used ones are dropped).
+
+"""
+
+from __future__ import absolute_import
+from collections import OrderedDict
+
+from monitor.monitor import Monitor
+from monitor.fault import ItomFaultStatusType
+from monitor.fault import FaultAgreement
+from monitor.plan import EvaluationPlan
+from engine.dfs import DepthFirstSearch
+from model.provided import ProvidedOverlay
+from model.substitution import Substitution
+from model.substitutionlist import SubstitutionList
+from utils.logger import Logger
+
+
+class SHSAMultiMonitor(Monitor):
+    """SHSA Monitor notifies the search engine which observation failed given a
+    SHSA model and several domains.
+
+    """
+
+    def __init__(self, model, domains, logfiles=None, cache_size=8):
+        """Initialize the monitor.
+
+        model -- SHSA knowledge base collecting the relations between
+            variables.
+        domains -- List of common domains (variables in the knowledge base)
+            where the itoms will be compared to each other.
+        logfiles -- Dictionary of domain to the path of a file where the
+            monitor writes the logs of this domain to (yaml, see
+            `SHSAMonitor`).
+        cache_size -- Number of sets of itoms the substitutions and the
+            evaluation plan are kept for.
+
+        """
+        self.__model = model
+        """SHSA knowledge base (given by the user, not modified)."""
+        self.__domains = list(domains)
+        """Variable domains where the itoms shall be compared."""
+        self.__cache = OrderedDict()
+        """Substitutions per domain and the evaluation plan of all
+        substitutions (value) for a set of itoms (key), least recently used
+        first."""
+        self.__cache_size = cache_size
+        """Maximum number of sets of itoms in the cache."""
+        self.__loggers = {}
+        """YAML Loggers per domain."""
+        if logfiles is not None:
+            for domain, logfile in logfiles.items():
+                self.__loggers[domain] = Logger(logfile, 'w')
+        self.__log_timestamp = -1
+        """Current time retrieved from the itoms (key: 't' or 'time') or a
+        counter value (0, 1, ..)."""
+
+    @property
+    def model(self):
+        """Returns the underlying SHSA model."""
+        return self.__model
+
+    @property
+    def domains(self):
+        """Returns the monitoring domains."""
+        return self.__domains
+
+    def substitutions(self, itoms):
+        """Returns the substitutions per domain used to monitor the given
+        itoms."""
+        return self.__cached(itoms)[0]
+
+    def plan(self, itoms):
+        """Returns the evaluation plan of the substitutions of all domains
+        (in the order of the domains) used to monitor the given itoms."""
+        return self.__cached(itoms)[1]
+
+    def __cached(self, itoms):
+        """Returns the substitutions per domain and the evaluation plan for
+        the given itoms."""
+        key = frozenset(itoms)
+        if key in self.__cache:
+            self.__cache.move_to_end(key)
+            return self.__cache[key]
+        substitutions = self.__collect_substitutions(key)
+        plan = EvaluationPlan(
+            self.__model, [s for S in substitutions.values() for s in S])
+        self.__cache[key] = (substitutions, plan)
+        if len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+        return substitutions, plan
+
+    def __collect_substitutions(self, itoms):
+        """Map itoms to variables and find substitutions from the variables
+        to each domain.
+
+        A single search engine is used for all domains, such that sub-searches
+        are shared.
+
+        """
+        # map itoms to variables; only the given itoms are provided
+        provided_vars = [self.__model.variable(itom) for itom in itoms]
+        model = ProvidedOverlay(self.__model, provided_vars)
+        # get all possible substitutions per domain
+        search_engine = DepthFirstSearch(model, memoize=True)
+        substitutions = OrderedDict()
+        for domain in self.__domains:
+            S = SubstitutionList(search_engine.substitute(
+                domain, substitute_provided=False))
+            # when the root is already provided an empty substitution is also
+            # valid
+            if model.provided([domain]):
+                S.append(Substitution(root=domain, model=model))
+            substitutions[domain] = S
+        return substitutions
+
+    #
+    # monitoring
+    #
+
+    def monitor(self, itoms):
+        """Analyze the given data for faults.
+
+        itoms -- dictionary of itom names to value
+
+        Returns the fault status per itom, i.e., the worst status of an itom
+        over all domains.
+
+        """
+        substitutions, plan = self.__cached(itoms.keys())
+        # collect inputs of all substitutions
+        inputs, input_itoms = plan.inputs(itoms)
+        # transfer the itoms into the common domains (relation outputs are
+        # shared between the substitutions of all domains)
+        values = plan.execute(inputs)
+        # agree about the fault status of the output values per domain
+        a = FaultAgreement()
+        status = {i: ItomFaultStatusType.OK for i in itoms}
+        first = 0
+        for domain, S in substitutions.items():
+            out = OrderedDict(zip(S, values[first:first + len(S)]))
+            vstatus = a.agree(list(out.values()), error=0.1)
+            # map value status to itom status
+            # note that it is unclear which of the inputs caused the fault ->
+            # all are marked faulty!
+            istatus = {i: ItomFaultStatusType.OK for i in itoms}
+            for i in range(len(S)):
+                for itom in input_itoms[first + i]:
+                    istatus[itom] = vstatus[i]
+            for itom in itoms:
+                status[itom] = max(status[itom], istatus[itom])
+            # log if desired
+            if domain in self.__loggers:
+                self.__log(self.__loggers[domain], S,
+                           plan.input_variables[first:first + len(S)],
+                           itoms, istatus, out, vstatus)
+            first += len(S)
+        return status
+
+    def __log(self, logger, substitutions, input_variables, itoms, istatus,
+              out, ostatus):
+        """Log data from the monitor of a domain to a yaml file (same format
+        as `SHSAMonitor`)."""
+        # retrieve timestamp from itoms
+        timestamp = self.__log_timestamp + 1  # default counter
+        if 'time' in itoms.keys():
+            timestamp = float(itoms['time'])
+        elif 't' in itoms.keys():
+            timestamp = float(itoms['t'])
+        # convert monitor call logs to python built-in types (avoid shsa
+        # specific classes)
+        subs = {'relations': [list(s.relations()) for s in substitutions],
+                'input_variables': input_variables}
+        istatus_builtin = {key: int(value) for key, value in istatus.items()}
+        itoms_builtin = {key: float(value) for key, value in itoms.items()}
+        out_builtin = [float(v) if v is not None else None
+                       for v in out.values()]
+        ostatus_builtin = [int(value) for value in ostatus]
+        # log
+        logger.log(time=timestamp, itoms=itoms_builtin,
+                   istatus=istatus_builtin, out=out_builtin,
+                   ostatus=ostatus_builtin, substitutions=subs)
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+
+from monitor.association import GridIndex, TrackAssociation
+
+
+class GridIndexTestCase(unittest.TestCase):
+    """Tests nearest neighbor search of the grid index."""
+
+    def test_nearest(self):
+        rng = np.random.RandomState(1)
+        px, py = rng.uniform(0, 50, 200), rng.uniform(0, 20, 200)
+        qx, qy = rng.uniform(0, 50, 100), rng.uniform(0, 20, 100)
+        max_sqdist = 6
+        index = GridIndex(px, py, np.sqrt(max_sqdist))
+        nearest, sqdist = index.nearest(qx, qy, max_sqdist)
+        # compare against brute force
+        for q in range(len(qx)):
+            d = (px - qx[q])**2 + (py - qy[q])**2
+            if d.min() < max_sqdist:
+                self.assertEqual(nearest[q], np.argmin(d),
+                                 "wrong nearest position")
+                self.assertAlmostEqual(sqdist[q], d.min())
+            else:
+                self.assertEqual(nearest[q], -1, "position not out of range")
+
+    def test_empty(self):
+        index = GridIndex([], [], 1.0)
+        nearest, _ = index.nearest([0.0], [0.0], 1.0)
+        self.assertEqual(list(nearest), [-1])
+
+
+class TrackAssociationTestCase(unittest.TestCase):
+    """Tests pairing of tracks."""
+
+    def setUp(self):
+        self.__s1 = {1: {'x': 0.0, 'y': 0.0}, 2: {'x': 10.0, 'y': 0.0}}
+        self.__s2 = {11: {'x': 1.0, 'y': 0.0}, 12: {'x': 9.5, 'y': 0.5},
+                     13: {'x': 30.0, 'y': 0.0}}
+
+    def test_update(self):
+        a = TrackAssociation(max_sqdist=6)
+        new = a.update(self.__s1, self.__s2)
+        self.assertEqual(new, [[1, 11], [2, 12]], "wrong pairs")
+        self.assertEqual(a.pairs, [[1, 11], [2, 12]], "wrong pairs")
+        # paired tracks are kept, also if another track gets nearer
+        s2 = {14: {'x': 0.0, 'y': 0.0}}
+        self.assertEqual(a.update(self.__s1, s2), [], "tracks re-paired")
+        self.assertTrue(1 in a and 2 in a and 3 not in a)
+
+    def test_pair(self):
+        a = TrackAssociation(max_sqdist=6)
+        a.update(self.__s1, self.__s2)
+        pairs = a.pair(self.__s1, self.__s2)
+        self.assertEqual(len(pairs), 2, "wrong number of pairs")
+        self.assertEqual(pairs[0], [self.__s1[1], self.__s2[11]])
+        # vanished tracks
+        pairs = a.pair({2: self.__s1[2]}, self.__s2)
+        self.assertEqual(pairs, [[self.__s1[2], self.__s2[12]]])
+        self.assertEqual(a.pair(self.__s1, {}), [])
+
+
+if __name__ == '__main__':
+        unittest.main()
@@ -0,0 +1,265 @@
+import unittest
+import os
+import csv
+import json
+import pstats
+import shutil
+import tempfile
+
+from benchmark.benchmark import measure, measure_memory, statistics, \
+    histogram, time_calls, read_records, write_records
+from benchmark.benchmark import dfs_mem, shpgsa
+from benchmark.generators import balanced_tree
+from benchmark.ex3 import Ex3
+from benchmark.sweep import parse_grid, sweep
+from benchmark import compare
+from benchmark.ex_monitor import MonitorBenchmark, RadarStream
+from monitor.fault import FaultAgreement
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    """Tests the benchmark harness."""
+
+    def test_measure(self):
+        calls = []
+        times, result = measure(calls.append, (1,), ncalls=3, warmup=2)
+        self.assertEqual(len(times), 3)
+        self.assertEqual(len(calls), 5, "warmup not executed")
+        stats = statistics([4, 1, 3, 2])
+        self.assertEqual(stats['n'], 4)
+        self.assertEqual(stats['min'], 1)
+        self.assertEqual(stats['median'], 2.5)
+        self.assertEqual(stats['stddev'], statistics([1, 2, 3, 4])['stddev'])
+        self.assertEqual(statistics([5])['stddev'], 0.0)
+
+    def test_memory(self):
+        model = balanced_tree(2, 4, availability=0.5, seed=1)
+        m = measure_memory(dfs_mem, (model, 0))
+        self.assertTrue(m['peak'] > 0)
+        self.assertTrue(m['substitutions'] >= len(dfs_mem(model, 0)))
+        self.assertEqual(m['workers'], 0)
+        m = measure_memory(shpgsa, (model, 0))
+        self.assertTrue(m['workers'] > 0)
+        # counting is restricted to the measurement
+        self.assertEqual(measure_memory(len, ([],))['substitutions'], 0)
+
+    def test_output(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        for ext in ['csv', 'json']:
+            filename = os.path.join(tmp, 'ex3.' + ext)
+            for i in range(2):
+                ex = Ex3(['-n', '2', '-d', '4', '-o', filename,
+                          'rss_once', 'orr'])
+                ex.setup()
+                ex.run(ex._args.algorithms)
+                ex.write()
+            with open(filename) as f:
+                if ext == 'csv':
+                    records = list(csv.DictReader(f))
+                else:
+                    records = json.load(f)
+                    self.assertEqual(len(records[0]['times']), 2)
+            self.assertEqual([r['algorithm'] for r in records],
+                             ['shpgsa_once', 'orr'] * 2)
+            self.assertEqual(int(records[0]['depth']), 4)
+            self.assertEqual(int(records[-1]['count']),
+                             len(dfs_mem(ex.model, 0)))
+            self.assertTrue(int(records[0]['workers']) > 0)
+        with self.assertRaises(RuntimeError):
+            write_records(os.path.join(tmp, 'ex3.txt'), records)
+
+    def test_csv_fields(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        filename = os.path.join(tmp, 'records.csv')
+        write_records(filename, [{'a': 1, 'b': 2, 'times': [1, 2]}])
+        # new field, the file is rewritten
+        write_records(filename, [{'a': 3, 'c': 4}])
+        # missing field
+        write_records(filename, [{'b': 5, 'a': 6}])
+        with open(filename) as f:
+            self.assertEqual(f.readline().strip(), "a,b,c")
+        self.assertEqual([dict(r) for r in read_records(filename)],
+                         [{'a': '1', 'b': '2', 'c': ''},
+                          {'a': '3', 'b': '', 'c': '4'},
+                          {'a': '6', 'b': '5', 'c': ''}])
+
+    def test_profile(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        filename = os.path.join(tmp, 'ex3.prof')
+        ex = Ex3(['-n', '2', '-w', '1', '-d', '4', '--profile', filename,
+                  'dfs_mem'])
+        ex.setup()
+        ex.run(ex._args.algorithms)
+        stats = pstats.Stats(filename).stats
+        calls = {name: s[1] for (_, _, name), s in stats.items()}
+        # measured calls only (no warmup, model generation or memory)
+        self.assertEqual(calls['dfs_mem'], 2)
+        self.assertFalse('balanced_tree' in calls)
+
+    def test_time_calls(self):
+        agree = FaultAgreement.agree
+        with time_calls({'agree': (FaultAgreement, 'agree')}) as times:
+            FaultAgreement().agree([1, 1, 1])
+            FaultAgreement().agree([1, 1, 5])
+        self.assertEqual(len(times['agree']), 2)
+        self.assertEqual(FaultAgreement.agree, agree, "method not restored")
+        hist = histogram([1, 3, 4, 20])
+        self.assertEqual(list(hist.items()),
+                         [(1, 1), (2, 0), (4, 2), (8, 0), (16, 0), (32, 1)])
+
+    def test_beam(self):
+        ex = Ex3(['-n', '1', '-w', '0', '-b', '3', '-d', '4', '-c', '-s', '1',
+                  '--no-memory', '--beam', '1', 'shpgsa_once', 'aostar'])
+        ex.setup()
+        ex.run(ex._args.algorithms)
+        records = ex.records()
+        self.assertEqual(records[0]['beam'], 1)
+        self.assertTrue(0 < records[0]['quality'] <= 1)
+        self.assertAlmostEqual(records[1]['quality'], 1)
+
+
+class MonitorBenchmarkTestCase(unittest.TestCase):
+    """Tests the throughput benchmark of the monitor."""
+
+    def test_stream(self):
+        samples = RadarStream(fault_rate=0.5, seed=1).samples(20)
+        self.assertEqual(samples, RadarStream(fault_rate=0.5,
+                                              seed=1).samples(20))
+        faults = [f for _, f in samples if f is not None]
+        self.assertTrue(0 < len(faults) < 20)
+        self.assertTrue(set(faults) <= set(RadarStream.faulty))
+        samples = RadarStream(noise=0, seed=1).samples(2)
+        self.assertEqual(samples[0][0]['x'], samples[0][0]['x_nbr'])
+
+    def test_run(self):
+        for scenario in ['radar', 'drivetrain']:
+            ex = MonitorBenchmark([scenario, '-n', '3', '-f', '1', '-s',
+                                   '1'])
+            ex.setup()
+            ex.run()
+            records = ex.records()
+            self.assertEqual([r['stage'] for r in records],
+                             ['monitor', 'execute', 'agree', 'log'])
+            self.assertEqual(records[0]['calls'], 3)
+            self.assertEqual(sum(records[0]['histogram'].values()), 3)
+            self.assertTrue(records[0]['throughput'] > 0)
+            self.assertEqual(records[0]['faults'], 3)
+            self.assertEqual(records[0]['detected'], 3)
+            self.assertTrue('throughput' in ex.report())
+        ex = MonitorBenchmark(['radar', '-n', '2', '--no-log'])
+        ex.setup()
+        ex.run()
+        self.assertEqual([r['stage'] for r in ex.records()],
+                         ['monitor', 'execute', 'agree'])
+        self.assertEqual(ex.records()[0]['faults'], 0)
+
+
+class SweepTestCase(unittest.TestCase):
+    """Tests the parameter sweep."""
+
+    def test_grid(self):
+        grid = parse_grid(['branch=1,2', 'd=4'])
+        self.assertEqual([list(p.items()) for p in grid],
+                         [[('branch', '1'), ('d', '4')],
+                          [('branch', '2'), ('d', '4')]])
+        with self.assertRaises(RuntimeError):
+            parse_grid(['branch'])
+
+    def test_sweep(self):
+        grid = parse_grid(['branch=1,2', 'depth=4'])
+        records = sweep('ex3', grid, models=2, argv=['-n', '1', 'orr'],
+                        jobs=2)
+        self.assertEqual([(r['branch'], r['model']) for r in records],
+                         [(1, 0), (1, 1), (2, 0), (2, 1)])
+        self.assertTrue(all(r['algorithm'] == 'orr' for r in records))
+
+
+class CompareTestCase(unittest.TestCase):
+    """Tests the comparison of benchmark runs."""
+
+    def __records(self, factor, times=True):
+        records = []
+        for alg, t in [('orr', 100.0), ('shpgsa', 1000.0)]:
+            r = {'depth': 4, 'algorithm': alg, 'beam': None,
+                 'beam_depth': False, 'times':
+                 [factor * (t + i) for i in range(20)]}
+            r.update(statistics(r['times']))
+            if not times:
+                del r['times']
+            records.append(r)
+        return records
+
+    def test_compare(self):
+        rows = compare.compare(self.__records(1), self.__records(1))
+        self.assertEqual([r['status'] for r in rows], ['ok', 'ok'])
+        self.assertAlmostEqual(rows[0]['speedup'], 1.0)
+        rows = compare.compare(self.__records(1), self.__records(2))
+        self.assertEqual([r['status'] for r in rows],
+                         ['regression', 'regression'])
+        self.assertAlmostEqual(rows[0]['speedup'], 0.5, places=2)
+        self.assertTrue(rows[0]['low'] <= 0.5 <= rows[0]['high'])
+        rows = compare.compare(self.__records(2), self.__records(1)[:1])
+        self.assertEqual([r['status'] for r in rows], ['faster', 'missing'])
+        # summary only (normal approximation)
+        rows = compare.compare(self.__records(1, False),
+                               self.__records(1.5, False))
+        self.assertEqual([r['status'] for r in rows],
+                         ['regression', 'regression'])
+        self.assertTrue('orr' in compare.table(rows))
+
+    def test_cases(self):
+        # only the parameters distinguish cases (not new measures or the size
+        # of a generated model)
+        candidate = self.__records(1)
+        for r in candidate:
+            r['numnodes'] = 10
+            r['new_measure'] = 1
+        rows = compare.compare(self.__records(1), candidate)
+        self.assertEqual([r['status'] for r in rows], ['ok', 'ok'])
+        self.assertFalse('numnodes' in rows[0])
+        candidate[0]['depth'] = 5
+        rows = compare.compare(self.__records(1), candidate)
+        self.assertEqual(rows[0]['status'], 'missing')
+
+    def test_summary(self):
+        baseline = self.__records(1, False)
+        with self.assertRaises(RuntimeError):
+            compare.compare(baseline, baseline, confidence=0.5)
+        with self.assertRaises(RuntimeError):
+            compare.compare(baseline, baseline, statistic='min')
+        candidate = self.__records(1, False)
+        candidate[0]['median'] = 0.0
+        with self.assertRaises(RuntimeError):
+            compare.compare(baseline, candidate)
+        # the interval of the median is wider than the one of the mean
+        s, low, high = compare.speedup(baseline[:1], baseline[:1], 'median')
+        _, low_mean, _ = compare.speedup(baseline[:1], baseline[:1], 'mean')
+        self.assertAlmostEqual(s, 1.0)
+        self.assertTrue(low < low_mean < 1.0 < high)
+
+    def test_main(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        baseline = os.path.join(tmp, 'baseline.json')
+        candidate = os.path.join(tmp, 'candidate.csv')
+        write_records(baseline, self.__records(1))
+        write_records(candidate, self.__records(1.01, False))
+        self.assertEqual(compare.main([baseline, candidate]), 0)
+        self.assertEqual(compare.main([baseline, candidate, '-t', '0']), 1)
+        # JSON and CSV records are the same cases
+        rows = compare.compare(read_records(baseline),
+                               read_records(candidate))
+        self.assertEqual([r['status'] for r in rows], ['ok', 'ok'])
+        # missing cases fail unless allowed
+        candidate = os.path.join(tmp, 'missing.csv')
+        write_records(candidate, self.__records(1, False)[:1])
+        self.assertEqual(compare.main([baseline, candidate]), 1)
+        self.assertEqual(compare.main([baseline, candidate,
+                                       '--allow-missing']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
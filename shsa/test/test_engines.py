@@ -6,6 +6,7 @@ from engine.orr import ORR
 from engine.dfs import DepthFirstSearch
 from engine.shpgsa import SHPGSA
 from model.substitutionlist import SubstitutionList
+from benchmark.generators import balanced_tree
 
 
 class SHSAInitTestCase(unittest.TestCase):
@@ -16,6 +17,74 @@ class SHSAInitTestCase(unittest.TestCase):
                          "incorrect number of vertices")
 
 
+class SHSAStatsTestCase(unittest.TestCase):
+    """Test cases to check the counters of the engines."""
+
+    def test_disabled(self):
+        model = balanced_tree(2, 4)
+        for engine in [ORR(model), DepthFirstSearch(model), SHPGSA(model)]:
+            self.assertIsNone(engine.stats)
+
+    def test_dfs(self):
+        model = balanced_tree(2, 4)
+        engine = DepthFirstSearch(model, stats=True)
+        S = engine.substitute(0, substitute_provided=False)
+        stats = engine.stats
+        # 2 relations, 4 variables and 8 relations below the root
+        self.assertEqual(stats['nodes'], 15)
+        self.assertEqual(stats['requirement_checks'], stats['substitutions'])
+        self.assertTrue(stats['substitutions'] >= len(S))
+        self.assertTrue(stats['time'] > 0)
+        # per search
+        engine.substitute(0, substitute_provided=False)
+        self.assertEqual(engine.stats['nodes'], 15)
+        engine = DepthFirstSearch(model, memoize=True, stats=True)
+        engine.substitute(0)
+        engine.substitute(0)
+        self.assertEqual(engine.stats['memo_hits'], 1)
+        self.assertFalse('nodes' in engine.stats)
+
+    def test_orr(self):
+        engine = ORR(balanced_tree(2, 4), stats=True)
+        engine.substitute_init()
+        engine.substitute(0)
+        # root and its unprovided inputs of the first relation
+        self.assertEqual(engine.stats['nodes'], 3)
+
+    def test_shpgsa(self):
+        engine = SHPGSA(balanced_tree(2, 4), stats=True)
+        n = 0
+        while engine.substitute(0):
+            n += 1
+        stats = engine.stats
+        self.assertEqual(n, 8)
+        self.assertEqual(stats['workers_created'] - n,
+                         stats.get('workers_discarded', 0))
+        self.assertEqual(stats['workers_created'],
+                         stats['potential_workers'] + 1)
+        self.assertTrue(stats['utility_evaluations'] >= stats['nodes'])
+        self.assertEqual(stats['requirement_checks'],
+                         stats['workers_created'])
+
+    def test_shpgsa_beam(self):
+        model = balanced_tree(3, 4, costs=True, seed=1)
+        complete = SHPGSA(model)
+        while complete.substitute(0):
+            pass
+        best = complete.last_results()[0].utility
+        for beam, beam_depth in [(1, False), (2, True)]:
+            engine = SHPGSA(model, stats=True, beam=beam,
+                            beam_depth=beam_depth)
+            while engine.substitute(0):
+                pass
+            S = engine.last_results()
+            self.assertTrue(0 < len(S) < len(complete.last_results()))
+            self.assertTrue(S[0].utility <= best)
+            self.assertTrue(engine.stats['workers_pruned'] > 0)
+        with self.assertRaises(RuntimeError):
+            SHPGSA(model, beam=0)
+
+
 class SHSATestCase(unittest.TestCase):
     """Base class for all engine testcases, simply executing substitution.
 
@@ -113,7 +182,7 @@ class SHSATestCase(unittest.TestCase):
         for i in range(len(self.testcases)):
             engine = SHPGSA(
                 configfile=self.testcases[i][self.tcindex['file']])
-            while(engine.substitute(self.testcases[i][self.tcindex['root']])):
+            while engine.substitute(self.testcases[i][self.tcindex['root']]):
                 pass
             S = engine.last_results()
             results.append(S)
@@ -121,4 +190,4 @@ class SHSATestCase(unittest.TestCase):
 
 
 if __name__ == '__main__':
-        unittest.main()
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import itertools
+
+from engine.aostar import AOStar
+from engine.dfs import DepthFirstSearch
+from model.shsamodel import SHSAModel
+from model.substitutionlist import SubstitutionList
+from model.utility import UtilityNorm
+from benchmark.benchmark import dfs_mem
+from benchmark.generators import balanced_tree, random_tree, random_dag
+
+
+class AOStarTestCase(unittest.TestCase):
+    """Tests the AO* engine against the best substitution found by DFS."""
+
+    def __consistent(self, s):
+        # each relation has a single output in the substitution tree
+        t, _ = s.tree(collapse_variables=False)
+        return s.requirements_ok() and all(t.out_degree(r) == 1 for r in s)
+
+    def __check(self, model, root):
+        engine = AOStar(model, stats=True)
+        s = engine.substitute(root)
+        best = SubstitutionList(filter(self.__consistent,
+                                       dfs_mem(model, root))).best()
+        if best is None:
+            self.assertIsNone(s)
+            return engine
+        self.assertIsNotNone(s)
+        self.assertTrue(self.__consistent(s))
+        self.assertAlmostEqual(s.utility, best.utility)
+        return engine
+
+    def test_substitute(self):
+        for configfile, root in [("test/model1.yaml", 'root'),
+                                 ("test/model2.yaml", 'a'),
+                                 ("test/model2.yaml", 'c'),
+                                 ("test/model4.yaml", 'a')]:
+            model = SHSAModel(configfile=configfile)
+            self.__check(model, root)
+
+    def test_provided(self):
+        model = SHSAModel(configfile="test/model1.yaml")
+        model.set_property_to('root', 'provided', True)
+        s = AOStar(model).substitute('root')
+        self.assertEqual(len(s), 0)
+
+    def test_generated(self):
+        for seed in range(10):
+            for model in [balanced_tree(2, 4, availability=0.3, costs=True,
+                                        seed=seed),
+                          balanced_tree(3, 4, costs=True, seed=seed),
+                          random_tree(3, 6, seed=seed),
+                          random_dag(10, inputs=2, bidirectional=0,
+                                     seed=seed)]:
+                self.__check(model, 0)
+
+    def test_expansions(self):
+        model = balanced_tree(3, 4, costs=True, seed=1)
+        engine = self.__check(model, 0)
+        dfs = DepthFirstSearch(model, stats=True)
+        dfs.substitute(0, None, False, True)
+        self.assertTrue(engine.stats['nodes'] < dfs.stats['nodes'])
+
+    def test_cycle(self):
+        model = random_dag(30, branch=3, bidirectional=1, seed=1)
+        s = AOStar(model).substitute(0)
+        self.assertIsNotNone(s)
+        self.assertTrue(self.__consistent(s))
+        # branches of the unfolded graph touch the same variable (the best
+        # solution of the tree is not a valid substitution)
+        for seed in [87, 88]:
+            self.__check(random_dag(6, branch=2, inputs=2, bidirectional=0.3,
+                                    availability=0.4, seed=seed), 0)
+
+    def test_generated_cycles(self):
+        for seed in range(100):
+            for bidirectional in [0.3, 0.6, 1.0]:
+                self.__check(random_dag(6, branch=2, inputs=2,
+                                        bidirectional=bidirectional,
+                                        availability=0.4, seed=seed), 0)
+
+
+class AOStarManyTestCase(unittest.TestCase):
+    """Tests the joint substitution of several variables."""
+
+    def __consistent(self, S):
+        relation = {}
+        for s in S:
+            for r, v in s.outputs().items():
+                if relation.setdefault(v, r) != r:
+                    return False
+        return all(s1.compatible(s2) for s1, s2 in
+                   itertools.combinations(S, 2))
+
+    def test_shared(self):
+        model = SHSAModel(configfile="test/model_j1.yaml")
+        engine = AOStar(model)
+        S = engine.substitute_many(['a', 'b'])
+        self.assertEqual(set(S[0]), set(['r1', 'r5']))
+        self.assertEqual(set(S[1]), set(['r3', 'r5']))
+        # best substitutions per root: r2 and r4 (r5 paid twice)
+        self.assertEqual(list(engine.substitute('a')), ['r2'])
+        joint = UtilityNorm().utility_of_substitutions(S)
+        self.assertTrue(joint > S[0].utility * S[1].utility)
+        self.assertTrue(joint > UtilityNorm().utility_of_substitutions(
+            DepthFirstSearch(model).substitute_many(['a', 'b'], False)))
+
+    def test_generated(self):
+        utility = UtilityNorm()
+        for seed in range(10):
+            model = balanced_tree(2, 6, availability=0.3, costs=True,
+                                  seed=seed)
+            # root and an unprovided variable below
+            roots = [0, next(v for v in sorted(model.variables)
+                             if v > 0 and not model.provided([v]))]
+            S = AOStar(model).substitute_many(roots)
+            candidates = [dfs_mem(model, r) for r in roots]
+            for s, r in zip(candidates, roots):
+                s.update(r, model)
+            best = None
+            for c in itertools.product(*candidates):
+                if self.__consistent(c):
+                    u = utility.utility_of_substitutions(c)
+                    best = u if best is None or u > best else best
+            if best is None:
+                self.assertIsNone(S)
+                continue
+            self.assertEqual([s.root for s in S], roots)
+            self.assertTrue(self.__consistent(S))
+            self.assertTrue(all(s.requirements_ok() for s in S))
+            self.assertAlmostEqual(utility.utility_of_substitutions(S), best)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import time
+
+from engine.counting import CountingSearch
+from engine.dfs import DepthFirstSearch
+from model.shsamodel import SHSAModel
+from benchmark.generators import balanced_tree, random_tree, random_dag
+
+
+class CountingSearchTestCase(unittest.TestCase):
+    """Tests the number of substitutions."""
+
+    def __dfs(self, model, root, substitute_provided, check_requirements):
+        engine = DepthFirstSearch(model)
+        return len(engine.substitute(root, None, substitute_provided,
+                                     check_requirements))
+
+    def test_count(self):
+        for configfile, root in [("test/model1.yaml", 'root'),
+                                 ("test/model2.yaml", 'a'),
+                                 ("test/model2.yaml", 'c'),
+                                 ("test/model4.yaml", 'a')]:
+            model = SHSAModel(configfile=configfile)
+            engine = CountingSearch(model)
+            for options in [(True, True), (False, True), (False, False)]:
+                self.assertEqual(engine.count(root, *options),
+                                 self.__dfs(model, root, *options),
+                                 "wrong count {} {}".format(configfile,
+                                                            options))
+
+    def test_generated(self):
+        for seed in range(5):
+            for model in [balanced_tree(2, 4, availability=0.3, seed=seed),
+                          random_tree(3, 6, seed=seed),
+                          random_dag(10, inputs=2, bidirectional=0,
+                                     seed=seed)]:
+                self.assertEqual(CountingSearch(model).count(0, False),
+                                 self.__dfs(model, 0, False, True))
+
+    def test_big(self):
+        model = balanced_tree(3, 8)
+        engine = CountingSearch(model, stats=True)
+        start = time.time()
+        n = engine.count(0, substitute_provided=False)
+        self.assertTrue(n > 10**18)
+        self.assertTrue(time.time() - start < 1)
+        # memoized
+        self.assertEqual(engine.count(0, substitute_provided=False), n)
+        self.assertFalse('nodes' in engine.stats)
+
+    def test_cycle(self):
+        for seed in range(10):
+            model = random_dag(10, branch=2, inputs=2, bidirectional=0.7,
+                               seed=seed)
+            self.assertEqual(CountingSearch(model).count(0, False, False),
+                             self.__dfs(model, 0, False, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
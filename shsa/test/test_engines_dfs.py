@@ -3,6 +3,8 @@ import itertools
 
 from test.test_engines import SHSATestCase
 from engine.dfs import DepthFirstSearch
+from model.shsamodel import SHSAModel
+from benchmark.generators import random_dag
 
 
 class SHSADFSTestCase(SHSATestCase):
@@ -109,8 +111,8 @@ class SHSADFSUtilityTestCase(SHSATestCase):
 
 
 class SHSADFSProvidedTestCase(SHSATestCase):
-    """Test cases to show that SHSA substitution returns correct result depending
-    on the provided variables.
+    """Test cases to show that SHSA substitution returns correct result
+    depending on the provided variables.
 
     """
 
@@ -180,5 +182,86 @@ class SHSADFSProvidedDontContinueTestCase(SHSATestCase):
             self.__check_results(results[i], i)
 
 
+class _PathIndependentDFS(DepthFirstSearch):
+    """Depth-first search saving path-independent results only."""
+
+    def _DepthFirstSearch__cyclic(self, node):
+        return False
+
+
+class SHSADFSCycleTestCase(unittest.TestCase):
+    """Tests the search on models with cycles (bidirectional relations)."""
+
+    def test_cycle(self):
+        model = random_dag(30, branch=3, bidirectional=1, seed=1)
+        engine = DepthFirstSearch(model, stats=True)
+        S = engine.substitute(0, None, False)
+        self.assertTrue(len(S) > 0)
+        for s in S:
+            self.assertEqual(len(s), len(s.relations()), "relation repeated")
+            self.assertTrue(s.requirements_ok())
+        # path-independent sub-searches are shared
+        self.assertTrue(engine.stats['memo_hits'] > 0)
+        self.assertEqual(S.relations(), DepthFirstSearch(
+            model, memoize=True).substitute(0, None, False).relations())
+
+    def test_path_dependent(self):
+        # one strongly connected component, i.e., the results of most
+        # sub-searches depend on the path
+        model = random_dag(8, branch=2, inputs=2, bidirectional=1.0,
+                           availability=0.2, seed=3)
+        engine = DepthFirstSearch(model, stats=True)
+        S = engine.substitute(0, None, True, False)
+        reference = _PathIndependentDFS(model, stats=True)
+        R = reference.substitute(0, None, True, False)
+        self.assertEqual(sorted(sorted(s) for s in S),
+                         sorted(sorted(s) for s in R))
+        self.assertTrue(engine.stats['nodes'] < reference.stats['nodes'])
+
+    def test_models(self):
+        for configfile in ["../config/radar-tracking.yaml",
+                           "../config/drivetrain.yaml"]:
+            model = SHSAModel(configfile=configfile)
+            engine = DepthFirstSearch(model, memoize=True, stats=True)
+            for v in model.variables:
+                engine.substitute(v)
+            # each distinct sub-search once
+            for v in model.variables:
+                engine.substitute(v)
+                self.assertFalse('nodes' in engine.stats)
+
+
+class SHSADFSManyTestCase(unittest.TestCase):
+    """Tests the substitution of several roots at once."""
+
+    def test_shared(self):
+        model = SHSAModel(configfile="test/model2.yaml")
+        for v in ['a', 'c']:
+            model.set_property_to(v, 'provided', False)
+        engine = DepthFirstSearch(model, stats=True)
+        S = engine.substitute_many(['a', 'c'], substitute_provided=False)
+        self.assertEqual([s.root for s in S], ['a', 'c'])
+        self.assertEqual(set(S[0]), set(['r1', 'r3']))
+        self.assertEqual(list(S[1]), ['r3'])
+        # the substitution of c is searched once
+        self.assertEqual(engine.stats['memo_hits'], 1)
+        self.assertEqual(S[0].outputs()['r3'], S[1].outputs()['r3'])
+
+    def test_compatible(self):
+        model = SHSAModel(configfile="../config/radar-tracking.yaml")
+        for v in ['x', 'y']:
+            model.set_property_to(v, 'provided', False)
+        engine = DepthFirstSearch(model)
+        S = engine.substitute_many(['x', 'y'], substitute_provided=False)
+        self.assertEqual(len(S), 2)
+        self.assertTrue(S[0].compatible(S[1]))
+        self.assertTrue(S[0].requirements_ok() and S[1].requirements_ok())
+        # best substitution of the first root
+        best = engine.substitute('x', None, False).best()
+        self.assertAlmostEqual(S[0].utility, best.utility)
+        # no substitution of a root
+        self.assertIsNone(engine.substitute_many(['x', 'y_global'], False))
+
+
 if __name__ == '__main__':
-        unittest.main()
+    unittest.main()
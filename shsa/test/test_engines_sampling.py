@@ -0,0 +1,77 @@
+import unittest
+from collections import Counter
+
+from engine.sampling import SamplingSearch
+from engine.counting import CountingSearch
+from engine.dfs import DepthFirstSearch
+from model.shsamodel import SHSAModel, SHSANodeType
+from model.substitution import Substitution
+from benchmark.generators import balanced_tree, random_dag
+
+
+class SamplingSearchTestCase(unittest.TestCase):
+    """Tests random substitutions."""
+
+    def setUp(self):
+        self.__model = balanced_tree(2, 4, availability=0.3, seed=3)
+        self.__all = DepthFirstSearch(self.__model).substitute(
+            0, substitute_provided=False)
+
+    def test_sample(self):
+        engine = SamplingSearch(self.__model, seed=1)
+        S = engine.substitute(0, 100, substitute_provided=False)
+        self.assertEqual(len(S), 100)
+        valid = self.__all.relations()
+        for s in S:
+            self.assertTrue(isinstance(s, Substitution))
+            self.assertEqual(s.root, 0)
+            self.assertTrue(s.requirements_ok())
+            self.assertTrue(s.relations() in valid)
+        # seeded
+        S2 = SamplingSearch(self.__model, seed=1).substitute(
+            0, 100, substitute_provided=False)
+        self.assertEqual([s.relations() for s in S],
+                         [s.relations() for s in S2])
+        # no substitution (the input of the relation is not provided)
+        model = SHSAModel(nodes=[(0, {'type': SHSANodeType.V}),
+                                 (1, {'type': SHSANodeType.R}),
+                                 (2, {'type': SHSANodeType.V})],
+                          edges=[(2, 1), (1, 0)])
+        engine = SamplingSearch(model)
+        self.assertIsNone(engine.sample(0))
+        self.assertEqual(len(engine.substitute(0, 2)), 0)
+        self.assertEqual(len(engine.sample(0, check_requirements=False)), 1)
+        # cyclic model
+        engine = SamplingSearch(random_dag(30, branch=3, bidirectional=1,
+                                           seed=1))
+        with self.assertRaises(RuntimeError):
+            engine.sample(0, substitute_provided=False)
+
+    def test_uniform(self):
+        n = len(self.__all)
+        self.assertTrue(n > 2)
+        engine = SamplingSearch(self.__model, seed=2)
+        S = engine.substitute(0, 300 * n, substitute_provided=False)
+        counts = Counter(s.relations() for s in S)
+        self.assertEqual(len(counts), n, "not all substitutions sampled")
+        for c in counts.values():
+            self.assertTrue(abs(c - 300) < 100, "not uniform")
+
+    def test_weighted(self):
+        model = balanced_tree(2, 4, availability=0.3, costs=True, seed=3)
+        S = DepthFirstSearch(model).substitute(0, substitute_provided=False)
+        engine = CountingSearch(model)
+        self.assertAlmostEqual(engine.count(0, False, weighted=True),
+                               sum(s.utility for s in S))
+        best = S.best()
+        worst = min(S, key=lambda s: s.utility)
+        engine = SamplingSearch(model, weighted=True, seed=2)
+        S = engine.substitute(0, 2000, substitute_provided=False)
+        counts = Counter(s.relations() for s in S)
+        self.assertTrue(best.utility > worst.utility)
+        self.assertTrue(counts[best.relations()]
+                        > counts[worst.relations()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import importlib.util
+import math
+import os
+import shutil
+import sys
+import tempfile
+
+from model.shsamodel import SHSAModel
+from model.substitution import Substitution
+from model.substitutionlist import SubstitutionList
+from model.export import module_code, write_module
+from engine.dfs import DepthFirstSearch
+
+
+class ExportTestCase(unittest.TestCase):
+    """Tests the export of substitutions to a Python module."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def __import(self, table, name):
+        filename = os.path.join(self.tmpdir, name + ".py")
+        cfile = write_module(filename, table)
+        self.assertTrue(os.path.exists(cfile))
+        spec = importlib.util.spec_from_file_location(name, filename)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_execute(self):
+        # same results as `Substitution.execute` (see test_substitution)
+        testcases = [
+            ("test/model_e1.yaml", ['r1', 'r2'], {'c': 0, 'd': 1, 'e': 2}),
+            ("test/model_e1.yaml", ['r3', 'r4'],
+             {'g': 0, 'h': 1, 'i': 2, 'j': 3}),
+            ("test/model_e2.yaml", ['r1'], {'b': 1}),
+            ("test/model_e3.yaml", ['r1'], {'b': -1}),
+            ("test/model_e3.yaml", ['r1'], {'b': 1}),
+            ("test/model_e3.yaml", ['r2'], {'d': 2}),
+            ("test/model_e4.yaml", ['r1'], {'b': -1}),
+            ("test/model_e4.yaml", ['r2'], {'d': 2}),
+        ]
+        for i, (configfile, relations, inputs) in enumerate(testcases):
+            m = SHSAModel(configfile=configfile)
+            s = Substitution(relations, model=m, root='a')
+            module = self.__import(s, "substitution_{}".format(i))
+            # constants are part of the module
+            values = dict(inputs)
+            for v in s.input_variables:
+                if m.has_property(v, 'constant'):
+                    values[v] = m.itoms(v)
+            self.assertEqual(module.execute(0, inputs), s.execute(values),
+                             "wrong result (TC{})".format(i))
+        with self.assertRaises(RuntimeError):
+            module.execute(0, {})
+
+    def test_utils(self):
+        # arctan is defined by the utils of the drivetrain model
+        m = SHSAModel(configfile="../config/drivetrain.yaml")
+        s = Substitution(['r3', 'r2'], model=m, root='wheel_angle')
+        inputs = {'wheel_base': 2.5, 'lateral_acceleration': 2.0,
+                  'speed': 10.0}
+        value = s.execute(inputs)
+        self.assertAlmostEqual(value, math.atan(2.5 / 50.0))
+        module = self.__import(s, "drivetrain")
+        self.assertAlmostEqual(module.execute(0, inputs), value)
+
+    def test_failover(self):
+        m = SHSAModel(configfile="../config/radar-tracking.yaml")
+        for v in ['x', 'y']:
+            m.set_property_to(v, 'provided', False)
+        engine = DepthFirstSearch(m)
+        table = {v: engine.substitute(v, None, False) for v in ['x', 'y']}
+        module = self.__import(table, "failover")
+        self.assertFalse('networkx' in module.__dict__)
+        self.assertEqual(len(module.SUBSTITUTIONS),
+                         len(table['x']) + len(table['y']))
+        for v, S in table.items():
+            utilities = [S[0].utility_fct.utility_of_substitution(
+                Substitution(module.SUBSTITUTIONS[i][2], model=m, root=v))
+                for i in module.FAILOVER[v]]
+            self.assertEqual(utilities, sorted(utilities, reverse=True))
+        # neighbor track in the field of view
+        inputs = {'x_nbr': 290.0, 'y_nbr': -145.0}
+        index, x = module.failover('x', inputs)
+        self.assertEqual(x, 290.0)
+        self.assertEqual(module.SUBSTITUTIONS[index][2], ('r7',))
+        # outside the field of view
+        self.assertEqual(module.failover('x', {'x_nbr': 0, 'y_nbr': 0}),
+                         (None, None))
+        # neither shsa nor networkx needed to import the module
+        code = module_code(table)
+        self.assertFalse('import networkx' in code)
+        self.assertFalse('from model' in code)
+
+
+if __name__ == '__main__':
+    unittest.main()
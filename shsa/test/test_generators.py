@@ -0,0 +1,62 @@
+import unittest
+import networkx as nx
+
+from benchmark.generators import balanced_tree, random_tree, random_dag
+
+
+class GeneratorsTestCase(unittest.TestCase):
+    """Tests the generators of synthetic models."""
+
+    def __equal(self, m1, m2):
+        return list(m1.nodes(data=True)) == list(m2.nodes(data=True)) \
+            and list(m1.edges()) == list(m2.edges())
+
+    def test_balanced_tree(self):
+        m = balanced_tree(2, 4)
+        self.assertEqual(len(m.nodes()), 31)
+        self.assertEqual(len(m.edges()), 60)
+        self.assertEqual(set(m.predecessors(0)), set([1, 2]))
+        self.assertTrue(m.is_variable(0) and m.is_relation(1))
+        self.assertEqual(sorted(v for v in m.variables if m.provided([v])),
+                         list(range(15, 31)))
+        self.assertIsNone(m.utils)
+        with self.assertRaises(RuntimeError):
+            balanced_tree(2, 3)
+        # seeded
+        self.assertTrue(self.__equal(
+            balanced_tree(3, 4, availability=0.2, costs=True, seed=1),
+            balanced_tree(3, 4, availability=0.2, costs=True, seed=1)))
+
+    def test_random_tree(self):
+        m = random_tree(3, 6, seed=2)
+        self.assertTrue(nx.is_tree(m.to_undirected()))
+        for n in m.nodes():
+            self.assertTrue(len(list(m.successors(n))) == (n != 0))
+        self.assertFalse(m.provided([0]))
+        self.assertTrue(self.__equal(m, random_tree(3, 6, seed=2)))
+        self.assertFalse(self.__equal(m, random_tree(3, 6, seed=3)))
+        # leaves are variables
+        with self.assertRaises(RuntimeError):
+            random_tree(3, 5, seed=25)
+
+    def test_random_dag(self):
+        m = random_dag(30, branch=3, bidirectional=0, seed=1)
+        self.assertTrue(nx.is_directed_acyclic_graph(m))
+        self.assertEqual(len(m.variables), 30)
+        for r in m.nodes():
+            if m.is_relation(r):
+                self.assertEqual(len(list(m.successors(r))), 1)
+                self.assertTrue(len(list(m.predecessors(r))) >= 1)
+        self.assertTrue(len(list(m.predecessors(0))) >= 1)
+        # shared variables
+        self.assertTrue(any(len(list(m.successors(v))) > 1
+                            for v in m.variables))
+        # cycles
+        m = random_dag(30, branch=3, bidirectional=1, seed=1)
+        self.assertFalse(nx.is_directed_acyclic_graph(m))
+        self.assertTrue(self.__equal(m, random_dag(30, branch=3,
+                                                   bidirectional=1, seed=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
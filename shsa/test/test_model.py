@@ -1,4 +1,8 @@
 import unittest
+import pickle
+import tempfile
+import numpy as np
+
 from model.shsamodel import *
 
 
@@ -106,6 +110,85 @@ class SHSAModelTestCase(unittest.TestCase):
         variable = m.variable('/d1')
         self.assertEqual(variable, 'd')
 
+    def test_execute_relation(self):
+        m = SHSAModel(configfile="test/model_e3.yaml")
+        fct, constraint = m.code_of('r1', 'a')
+        self.assertIs(m.code_of('r1', 'a')[0], fct, "not compiled once")
+        # utils are loaded in the namespace
+        self.assertTrue('add' in m.namespace)
+        self.assertEqual(m.execute_relation('r1', 'a', {'b': 1, 'c': 0.5,
+                                                        'e': 1.0}), 1.5)
+        self.assertIsNone(m.execute_relation('r1', 'a', {'b': -1, 'c': 0.5,
+                                                         'e': 1.0}))
+        # model is still picklable
+        p = pickle.loads(pickle.dumps(m))
+        self.assertEqual(p.execute_relation('r2', 'a', {'d': 2}), None)
+
+    def test_execute_comprehension(self):
+        m = SHSAModel(configfile="test/model_e5.yaml")
+        self.assertEqual(m.execute_relation('r1', 'y', {'x': [1, 2], 'k': 2}),
+                         6)
+        self.assertIsNone(m.execute_relation('r1', 'y', {'x': [1, -2],
+                                                         'k': 2}))
+        self.assertEqual(list(m.execute_relation_batch(
+            'r1', 'y', {'x': [1, 2], 'k': 2}, 3)), [6, 6, 6])
+
+    def test_field_of_view(self):
+        m = SHSAModel(configfile="../config/radar-tracking.yaml")
+        in_field_of_view = m.namespace['in_field_of_view']
+        field_of_view = m.namespace['field_of_view']
+        sensor = [[m.itoms('location_x'), m.itoms('location_y')],
+                  m.itoms('sensor_heading'), m.itoms('range'),
+                  m.itoms('angle')]
+        xs = [290.0, 0.0, 280.0, 300.0, -50.0]
+        ys = [-145.0, 0.0, -150.0, -100.0, 10.0]
+        # the array result equals the result per sample
+        result = in_field_of_view([np.array(xs), np.array(ys)], *sensor)
+        self.assertEqual(list(result), [bool(in_field_of_view([x, y], *sensor))
+                                        for x, y in zip(xs, ys)])
+        self.assertTrue(any(result) and not all(result))
+        # the cached triangle is immutable
+        location = tuple(sensor[0])
+        triangle = field_of_view(location, *sensor[1:])
+        self.assertTrue(all(isinstance(v, tuple) for v in triangle))
+        self.assertIs(field_of_view(location, *sensor[1:]), triangle)
+
+    def test_invalid_relation(self):
+        config = """
+relations:
+  r1:
+    a:
+      in: [b]
+      fct: "b +"
+  r2:
+    a:
+      in: [c]
+      fct: ""
+properties:
+  provision:
+    b: ["i_b"]
+"""
+        with tempfile.NamedTemporaryFile('w', suffix=".yaml") as f:
+            f.write(config)
+            f.flush()
+            # syntax error fails at load time
+            with self.assertRaisesRegex(RuntimeError, "'r1'"):
+                SHSAModel(configfile=f.name)
+        with tempfile.NamedTemporaryFile('w', suffix=".yaml") as f:
+            f.write(config.replace('"b +"', '"b + 1"'))
+            f.flush()
+            m = SHSAModel(configfile=f.name)
+        # empty functions are loaded but cannot be executed
+        self.assertEqual(m.code_of('r2', 'a'), (None, None))
+        with self.assertRaises(RuntimeError):
+            m.execute_relation('r2', 'a', {'c': 1})
+        self.assertEqual(m.execute_relation('r1', 'a', {'b': 1}), 2)
+        # invalid constraint
+        m.set_property_to('r1', 'constraint', {'b': "b >"})
+        m.set_property_to('r1', 'fct', {'b': "a"})
+        with self.assertRaises(RuntimeError):
+            m.code_of('r1', 'b')
+
 
 if __name__ == '__main__':
-        unittest.main()
+    unittest.main()
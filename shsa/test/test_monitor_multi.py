@@ -0,0 +1,78 @@
+import unittest
+
+from monitor.shsamonitor import SHSAMonitor
+from monitor.shsamultimonitor import SHSAMultiMonitor
+from monitor.fault import ItomFaultStatusType
+from model.shsamodel import SHSAModel
+
+
+class SHSAMultiMonitorTestCase(unittest.TestCase):
+    """Tests SHSA monitor of several domains."""
+
+    def setUp(self):
+        self.__model = SHSAModel(configfile="test/model_e1.yaml")
+
+    def tearDown(self):
+        self.__model = None
+
+    def test_setup_monitor(self):
+        m = SHSAMultiMonitor(self.__model, ['a', 'f'])
+        self.assertEqual(self.__model, m.model,
+                         "model initialization failed")
+        self.assertEqual(['a', 'f'], m.domains,
+                         "domains initialization failed")
+
+    def test_monitor(self):
+        """Test results equal those of a monitor per domain."""
+        m = SHSAMultiMonitor(self.__model, ['a', 'f'])
+        testcases = [
+            {'i_a': 0, 'i_d': 0, 'i_e': 0, 'i_f': 0},
+            {'i_a': 0, 'i_d': 0, 'i_e': 0, 'i_f': 1},
+            {'i_a': 0, 'i_f': 3},
+        ]
+        for itoms in testcases:
+            ret_status = m.monitor(itoms)
+            exp_status = {itom: ItomFaultStatusType.OK for itom in itoms}
+            for domain in m.domains:
+                model = SHSAModel(configfile="test/model_e1.yaml")
+                status = SHSAMonitor(model, domain).monitor(itoms)
+                for itom in itoms:
+                    exp_status[itom] = max(exp_status[itom], status[itom])
+            self.assertEqual(ret_status, exp_status, "wrong fault status")
+        # relations with utils and constraints
+        model = SHSAModel(configfile="test/model_e4.yaml")
+        m = SHSAMultiMonitor(model, ['a'])
+        itoms = {'i_a': 4.0, 'i_b': 3.48, 'i_d': 4.0}
+        exp_status = {itom: ItomFaultStatusType.OK for itom in itoms}
+        exp_status['i_d'] = ItomFaultStatusType.UNDEFINED
+        self.assertEqual(m.monitor(itoms), exp_status, "wrong fault status")
+
+    def test_model_unchanged(self):
+        m = SHSAMultiMonitor(self.__model, ['a', 'f'])
+        m.monitor({'i_a': 0, 'i_d': 0, 'i_e': 0, 'i_f': 0})
+        for v in self.__model.variables:
+            self.assertFalse(self.__model.has_property(v, 'provided'),
+                             "model modified")
+
+    def test_shared_search(self):
+        m = SHSAMultiMonitor(self.__model, ['a', 'f'])
+        itoms = {'i_a': 0, 'i_d': 0, 'i_e': 0, 'i_f': 0}
+        S = m.substitutions(itoms.keys())
+        self.assertEqual(list(S.keys()), ['a', 'f'])
+        # substitutions are searched once per set of itoms
+        self.assertTrue(S is m.substitutions(reversed(list(itoms.keys()))))
+        self.assertTrue(m.plan(itoms.keys()) is m.plan(itoms.keys()))
+
+    def test_cache(self):
+        m = SHSAMultiMonitor(self.__model, ['a', 'f'], cache_size=2)
+        sets = [['i_a', 'i_f'], ['i_a', 'i_d', 'i_e', 'i_f'], ['i_f']]
+        S = [m.substitutions(itoms) for itoms in sets[:2]]
+        # least recently used set is dropped
+        self.assertTrue(m.substitutions(sets[0]) is S[0])
+        m.substitutions(sets[2])
+        self.assertTrue(m.substitutions(sets[0]) is S[0])
+        self.assertFalse(m.substitutions(sets[1]) is S[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
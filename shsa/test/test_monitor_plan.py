@@ -0,0 +1,66 @@
+import unittest
+
+from monitor.plan import EvaluationPlan
+from engine.dfs import DepthFirstSearch
+from model.shsamodel import SHSAModel
+from model.provided import ProvidedOverlay
+from model.substitution import Substitution
+
+
+class EvaluationPlanTestCase(unittest.TestCase):
+    """Tests the shared evaluation of substitutions."""
+
+    def test_shared(self):
+        model = SHSAModel(configfile="test/model_e1.yaml")
+        # f is substituted by r4 in both substitutions
+        S = [Substitution(['r3', 'r4'], model=model, root='a'),
+             Substitution(['r4'], model=model, root='f'),
+             Substitution(['r1', 'r2'], model=model, root='a')]
+        plan = EvaluationPlan(model, S)
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(plan.input_variables,
+                         [s.input_variables for s in S])
+        inputs = {'g': 1, 'h': 2, 'i': 3, 'j': 4, 'c': 0, 'd': 1, 'e': 2}
+        self.assertEqual(plan.execute(inputs),
+                         [s.execute(inputs) for s in S])
+
+    def test_inputs(self):
+        model = SHSAModel(configfile="test/model_e1.yaml")
+        S = [Substitution(['r3'], model=model, root='a'),
+             Substitution(['r1', 'r2'], model=model, root='a')]
+        plan = EvaluationPlan(model, S)
+        # c is a constant
+        itoms = {'i_a': 4, 'i_f': 6, 'i_d': 1, 'i_e': 2}
+        inputs, used = plan.inputs(itoms)
+        self.assertEqual(inputs, {'f': 6, 'c': model.itoms('c'), 'd': 1,
+                                  'e': 2})
+        self.assertEqual(used[0], ['i_f'])
+        self.assertEqual(set(used[1]), set(['i_d', 'i_e']))
+        with self.assertRaises(RuntimeError):
+            plan.inputs({'i_f': 6})
+
+    def test_constraint(self):
+        model = SHSAModel(configfile="../config/radar-tracking.yaml")
+        model = ProvidedOverlay(model, ['x_nbr', 'y_nbr', 'x_old', 'y_old',
+                                        'vx_old', 'vy_old', 't_old', 't'])
+        engine = DepthFirstSearch(model, memoize=True)
+        S = []
+        for v in ['x', 'y']:
+            S.extend(engine.substitute(v, substitute_provided=False))
+        plan = EvaluationPlan(model, S)
+        constants = {v: model.itoms(v) for v in ['location_x', 'location_y',
+                                                 'sensor_heading', 'range',
+                                                 'angle']}
+        for x_nbr in [290.0, 0.0]:
+            inputs = {'x_nbr': x_nbr, 'y_nbr': -145.0, 'x_old': 280.0,
+                      'y_old': -150.0, 'vx_old': 1.0, 'vy_old': 0.0,
+                      't_old': 0.0, 't': 1.0}
+            inputs.update(constants)
+            values = plan.execute(inputs)
+            self.assertEqual(values, [s.execute(inputs) for s in S])
+        # violated constraint (neighbor out of view)
+        self.assertTrue(None in values)
+
+
+if __name__ == '__main__':
+    unittest.main()
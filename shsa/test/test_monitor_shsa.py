@@ -1,5 +1,7 @@
 import unittest
+import os
 import yaml
+import numpy as np
 
 from monitor.shsamonitor import SHSAMonitor
 from monitor.fault import ItomFaultStatusType
@@ -104,6 +106,79 @@ class SHSAMonitorTestCase(unittest.TestCase):
                 cnt = cnt + 1
         self.assertEqual(cnt, 3, "wrong number of yaml dumps")
 
+    def test_stats(self):
+        logfile = "monitor-stats.yaml"
+        m = SHSAMonitor(self.__model, domain='a')
+        m.monitor({'i_a': 0, 'i_f': 3})
+        self.assertIsNone(m.stats)
+        m = SHSAMonitor(self.__model, domain='a', stats=True,
+                        stats_logfile=logfile, stats_period=2)
+        for i in range(3):
+            m.monitor({'i_a': 0, 'i_d': 0, 'i_e': 0, 'i_f': i})
+        m.monitor({'i_a': 0, 'i_f': 3})
+        stats = m.stats
+        self.assertEqual(stats['monitor_calls'], 4)
+        self.assertEqual(stats['searches'], 2)
+        self.assertTrue(stats['nodes'] > 0)  # aggregated from the searches
+        self.assertTrue(stats['execute_calls'] >= 4)
+        self.assertTrue(stats['time'] >= stats['execute_time'] > 0)
+        # periodic dump
+        with open(logfile, 'r') as f:
+            docs = list(yaml.load_all(f))
+        os.remove(logfile)
+        self.assertEqual([d['time'] for d in docs], [2, 4])
+        self.assertEqual(docs[-1]['stats'], stats)
+
+    def test_monitor_batch(self):
+        """Test results equal those of monitor calls per sample."""
+        rng = np.random.RandomState(1)
+        n = 50
+        a = rng.uniform(-10, 10, n)
+        d = rng.uniform(-10, 10, n)
+        table = {'i_a': a, 'i_d': d, 'i_e': 2 * (a - d), 'i_f': 2 * a}
+        # faults (one or two itoms)
+        table['i_f'][:10] += 1
+        table['i_d'][5:15] -= 1
+        table['i_a'][20] = np.nan
+        m = SHSAMonitor(model=self.__model, domain=self.__domain)
+        status = m.monitor_batch(table)
+        self.assertEqual(set(status.keys()), set(table.keys()))
+        # missing sample
+        self.assertEqual(status['i_a'][20], ItomFaultStatusType.UNDEFINED)
+        for t in range(n):
+            if t == 20:
+                continue
+            itoms = {i: c[t] for i, c in table.items()}
+            exp_status = SHSAMonitor(self.__model, self.__domain).monitor(
+                itoms)
+            self.assertEqual({i: s[t] for i, s in status.items()},
+                             exp_status, "wrong fault status (sample {})"
+                             .format(t))
+        self.assertEqual(status['i_f'][0], ItomFaultStatusType.FAULTY)
+        # structured array with relations using utils and constraints
+        model = SHSAModel(configfile="../config/radar-tracking.yaml")
+        table = np.zeros(n, dtype=[(i, float) for i in [
+            'x', 'x_nbr', 'y_nbr', 'x_old', 'y_old', 'vx_old', 'vy_old',
+            't_old', 't']])
+        table['x'] = rng.uniform(270, 300, n)
+        table['y_nbr'] = rng.uniform(-155, -145, n)
+        table['x_nbr'] = table['x']
+        table['x_nbr'][:5] -= 100  # out of the field of view
+        table['t'] = 1.0
+        table['vx_old'] = rng.uniform(-1, 1, n)
+        table['x_old'] = table['x'] - table['vx_old']
+        table['y_old'] = table['y_nbr']
+        table['x_old'][10:15] += 1
+        m = SHSAMonitor(model=model, domain='x', stats=True)
+        status = m.monitor_batch(table)
+        for t in range(n):
+            itoms = {i: table[i][t] for i in table.dtype.names}
+            exp_status = SHSAMonitor(model, 'x').monitor(itoms)
+            self.assertEqual({i: s[t] for i, s in status.items()},
+                             exp_status, "wrong fault status (sample {})"
+                             .format(t))
+        self.assertEqual(m.stats['samples'], n)
+
 
 if __name__ == '__main__':
-        unittest.main()
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from model.shsamodel import SHSAModel
+from model.provided import ProvidedOverlay
+from engine.dfs import DepthFirstSearch
+from engine.shpgsa import SHPGSA
+from engine.orr import ORR
+
+
+class ProvidedOverlayTestCase(unittest.TestCase):
+    """Tests the provided-status overlay of a model."""
+
+    def setUp(self):
+        self.__model = SHSAModel(configfile="test/model_p1.yaml")
+
+    def tearDown(self):
+        self.__model = None
+
+    def __provided(self, model):
+        return [v for v in model.variables if model.provided([v])]
+
+    def test_overlay(self):
+        m = self.__model
+        o = ProvidedOverlay(m, ['a', 'f'])
+        self.assertTrue(o.provided(['a', 'f']))
+        self.assertFalse(o.provided(['a', 'c']))
+        self.assertEqual(o.unprovided(['a', 'b', 'c']), ['b', 'c'])
+        self.assertTrue(o.property_value_of('a', 'provided'))
+        self.assertFalse(o.property_value_of('c', 'provided'))
+        self.assertEqual(set(o.variables), set(m.variables))
+        self.assertEqual(set(o.predecessors('r1')), set(m.predecessors('r1')))
+        with self.assertRaises(RuntimeError):
+            o.provided(['r1'])
+        with self.assertRaises(RuntimeError):
+            o.set_property_to('a', 'provided', False)
+        # model is not modified
+        self.assertEqual(sorted(self.__provided(m)),
+                         ['c', 'd', 'e', 'g', 'i', 'j'])
+        # snapshot of the model's provided status
+        o = ProvidedOverlay(m)
+        self.assertEqual(sorted(self.__provided(o)),
+                         sorted(self.__provided(m)))
+        # overlay of an overlay uses the model
+        self.assertTrue(ProvidedOverlay(o, ['a']).model is m)
+
+    def test_compare(self):
+        o1 = ProvidedOverlay(self.__model, ['a', 'f'])
+        o2 = ProvidedOverlay(self.__model, ['f', 'a'])
+        self.assertEqual(o1, o2)
+        self.assertEqual(hash(o1), hash(o2))
+        self.assertNotEqual(o1, ProvidedOverlay(self.__model, ['a']))
+
+    def test_pickle(self):
+        o = ProvidedOverlay(self.__model, ['a', 'f'])
+        p = pickle.loads(pickle.dumps(o))
+        self.assertEqual(p.provided_variables, o.provided_variables)
+        self.assertEqual(set(p.nodes()), set(o.nodes()))
+
+    def __mutated(self, provided):
+        """Returns a model where the provided status is set in the graph."""
+        m = SHSAModel(configfile="test/model_p1.yaml")
+        for v in m.variables:
+            m.set_property_to(v, 'provided', v in provided)
+        return m
+
+    def __search(self, model, engine):
+        if engine == 'dfs':
+            S = DepthFirstSearch(model).substitute('a')
+            return sorted(sorted(s.relations()) for s in S)
+        if engine == 'shpgsa':
+            engine = SHPGSA(model)
+            while engine.substitute('a'):
+                pass
+            S = engine.last_results()
+            return None if S.best() is None else sorted(S.best().relations())
+        engine = ORR(model)
+        engine.substitute_init()
+        _, tree = engine.substitute('a')
+        return None if tree is None \
+            else sorted(n for n in tree if model.is_relation(n))
+
+    def test_engines(self):
+        """Test searches on an overlay equal those on a modified model."""
+        cases = [['c', 'd', 'e', 'g', 'i', 'j'], ['b', 'c'], ['d', 'e', 'f'],
+                 ['h', 'i', 'j', 'd', 'g']]
+        for provided in cases:
+            o = ProvidedOverlay(self.__model, provided)
+            for engine in ['dfs', 'shpgsa', 'orr']:
+                self.assertEqual(self.__search(o, engine),
+                                 self.__search(self.__mutated(provided),
+                                               engine),
+                                 "{} differs ({})".format(engine, provided))
+
+    def test_concurrent(self):
+        cases = [['c', 'd', 'e', 'g', 'i', 'j'], ['b', 'c'], ['d', 'e', 'f'],
+                 ['h', 'i', 'j', 'd', 'g']] * 4
+        expected = [self.__search(self.__mutated(p), 'dfs') for p in cases]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(
+                lambda p: self.__search(ProvidedOverlay(self.__model, p),
+                                        'dfs'), cases))
+        self.assertEqual(results, expected)
+
+
+if __name__ == '__main__':
+        unittest.main()
@@ -120,6 +120,13 @@ class SubstitutionTestCase(unittest.TestCase):
         s = Substitution(['r2'], model=m, root='a')
         result = s.execute({'d': 2, 'c': m.itoms('c')})
         self.assertEqual(result, None, "constraint c > 0 ignored")
+        # comprehensions in function and constraint
+        m = SHSAModel(configfile="test/model_e5.yaml")
+        s = Substitution(['r1'], model=m, root='y')
+        result = s.execute({'x': [1, 2], 'k': m.itoms('k')})
+        self.assertEqual(result, 6, "wrong result")
+        result = s.execute({'x': [1, -2], 'k': m.itoms('k')})
+        self.assertEqual(result, None, "constraint ignored")
 
     def test_eq(self):
         m = SHSAModel(configfile="test/model_e1.yaml")
@@ -131,6 +138,19 @@ class SubstitutionTestCase(unittest.TestCase):
         self.assertNotEqual(s1, s3)
         self.assertNotEqual(s1, s4)
 
+    def test_compatible(self):
+        m = SHSAModel(configfile="test/model2.yaml")
+        s1 = Substitution(['r1', 'r3'], model=m, root='a')
+        s2 = Substitution(['r3'], model=m, root='c')
+        s3 = Substitution(['r1'], model=m, root='c')
+        self.assertEqual(s1.outputs(), {'r1': 'a', 'r3': 'c'})
+        self.assertTrue(s1.compatible(s2))
+        # r1 in the opposite direction
+        self.assertFalse(s1.compatible(s3))
+        # root c is an input of a
+        self.assertFalse(Substitution(['r1'], model=m,
+                                      root='a').compatible(s2))
+
 
 class SubstitutionListTestCase(unittest.TestCase):
     """Test cases for substitution results."""
@@ -220,4 +240,4 @@ class SubstitutionListTestCase(unittest.TestCase):
 
 
 if __name__ == '__main__':
-        unittest.main()
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+
+from utils.tracklog import TrackLog
+
+
+class TrackLogTestCase(unittest.TestCase):
+    """Tests chunked reading of track logs."""
+
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.__csv = os.path.join(self.__dir.name, "tracks.csv")
+        with open(self.__csv, 'w') as f:
+            f.write("% time,sensor,track,x,y\n")
+            f.write("0.1,6,1,1.0,2.0\n")
+            f.write("0.1,7,2,3.0,4.0\n")
+            f.write("0.2,6,1,1.5,2.1\n")
+            f.write("% comment\n")
+            f.write("0.2,7,2,3.5,4.1\n")
+            f.write("0.2,8,3,10,4.1\n")
+            f.write("0.3,8,3,10.5,4.2\n")
+
+    def tearDown(self):
+        self.__dir.cleanup()
+
+    def test_chunks(self):
+        data = np.genfromtxt(self.__csv, delimiter=',', comments='%',
+                             names=True)
+        for chunksize in [1, 2, 4, 100]:
+            log = TrackLog(self.__csv, chunksize=chunksize)
+            self.assertEqual(log.names, data.dtype.names,
+                             "wrong column names")
+            chunks = list(log.chunks())
+            for c in chunks:
+                self.assertTrue(len(c) <= chunksize, "chunk too large")
+            self.assertTrue(np.array_equal(np.concatenate(chunks), data),
+                            "rows mismatch (chunksize {})".format(chunksize))
+
+    def test_groups(self):
+        for chunksize in [1, 2, 4, 100]:
+            log = TrackLog(self.__csv, chunksize=chunksize)
+            groups = [(t, len(rows)) for t, rows in log.groups('time')]
+            self.assertEqual(groups, [(0.1, 2), (0.2, 3), (0.3, 1)],
+                             "wrong groups (chunksize {})".format(chunksize))
+
+    def test_convert(self):
+        npy = os.path.join(self.__dir.name, "tracks.npy")
+        TrackLog(self.__csv).convert(npy)
+        log = TrackLog(npy, chunksize=2)
+        self.assertEqual(log.names, TrackLog(self.__csv).names,
+                         "wrong column names")
+        groups = [(t, len(rows)) for t, rows in log.groups('time')]
+        self.assertEqual(groups, [(0.1, 2), (0.2, 3), (0.3, 1)],
+                         "wrong groups")
+
+
+if __name__ == '__main__':
+        unittest.main()
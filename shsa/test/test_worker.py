@@ -3,6 +3,7 @@ import unittest
 from engine.worker import Worker
 from model.substitution import Substitution
 from model.shsamodel import SHSAModel
+from benchmark.generators import balanced_tree
 
 
 class WorkerTestCase(unittest.TestCase):
@@ -72,6 +73,23 @@ class WorkerTestCase(unittest.TestCase):
                          "number of workers mismatch")
         self.assertTrue(w.successful(), "successful state mismatch")
 
+    def test_params(self):
+        model = balanced_tree(3, 4, costs=True, seed=1)
+        w = Worker(model=model, root=0, variables=[0])
+        w.next()
+        params = w.next()  # 3 variables with 3 relations each
+        self.assertEqual(len(params), 3**3 - 1)
+        self.assertEqual(params.generated(), 0, "params not lazy")
+        self.assertEqual(len(params[2][2]), 3)
+        self.assertEqual(params.generated(), 3)
+        utilities = [u for u, _, _ in params]
+        self.assertEqual(utilities, sorted(utilities, reverse=True))
+        self.assertTrue(utilities[0] <= w.utility)
+        combinations = set(tuple(rp) for _, _, rp in params)
+        self.assertEqual(len(combinations), len(params))
+        with self.assertRaises(IndexError):
+            params[len(params)]
+
 
 if __name__ == '__main__':
-        unittest.main()
+    unittest.main()
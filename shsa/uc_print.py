@@ -4,6 +4,7 @@
 import argparse
 
 from model.shsamodel import SHSAModel, SHSANodeType
+from utils.profiler import profile
 
 # parse optional config file
 parser = argparse.ArgumentParser(description="""Execute SHSA engines given a
@@ -11,9 +12,13 @@ config file.""")
 parser.add_argument('-m', '--model', type=str,
                     default="../config/shsamodel1.yaml",
                     help="SHSA model in a config file.")
+parser.add_argument('--profile', type=str, metavar="FILE",
+                    help="""Writes the profile (cProfile) of the printing to
+                    the given file.""")
 args = parser.parse_args()
 
 # yaml example
 model = SHSAModel(configfile=args.model)
-model.write_dot("uc_print_model", "pdf")
-print(model)
+with profile(args.profile):  # printing only
+    model.write_dot("uc_print_model", "pdf")
+    print(model)
@@ -6,10 +6,13 @@ import numpy as np
 import csv
 import os
 
-from monitor.shsamonitor import SHSAMonitor
+from monitor.shsamultimonitor import SHSAMultiMonitor
 from monitor.fault import ItomFaultStatusType
+from monitor.association import TrackAssociation
 from model.shsamodel import SHSAModel
 from utils.logger import Logger
+from utils.tracklog import TrackLog
+from utils.profiler import profile
 
 
 # parse optional config file
@@ -21,8 +24,19 @@ parser.add_argument('-m', '--model', type=str,
 parser.add_argument('-s', '--sensor', type=int,
                     default=7,
                     help="Sensor ID to monitor.")
+parser.add_argument('-c', '--chunksize', type=int,
+                    default=10000,
+                    help="""Number of rows of the log read at once (memory
+                    needed for the data is constant).""")
+parser.add_argument('--convert', type=str, metavar="NPY",
+                    help="""Convert the CSV log to a NumPy binary file (.npy)
+                    and exit. The binary file can be passed instead of the CSV
+                    file for faster replays (memory-mapped).""")
+parser.add_argument('--profile', type=str, metavar="FILE",
+                    help="""Writes the profile (cProfile) of the monitoring
+                    to the given file.""")
 parser.add_argument('csv', type=str,
-                    help="CSV log file of itoms.")
+                    help="CSV log file of itoms (or converted .npy file).")
 args = parser.parse_args()
 
 
@@ -42,10 +56,9 @@ pairs_logger = Logger('log/pairs.yaml', mode='w')
 #
 
 model = SHSAModel(configfile=args.model)
-x_monitor = SHSAMonitor(model=model, domain='x',
-                        logfile='log/monitor-log-x.yaml')
-y_monitor = SHSAMonitor(model=model, domain='y',
-                        logfile='log/monitor-log-y.yaml')
+monitor = SHSAMultiMonitor(model=model, domains=['x', 'y'],
+                           logfiles={'x': 'log/monitor-log-x.yaml',
+                                     'y': 'log/monitor-log-y.yaml'})
 
 
 #
@@ -60,12 +73,16 @@ y_monitor = SHSAMonitor(model=model, domain='y',
 # Additionally the monitor saves the last observation of a track observed by a
 # sensor.
 
-# open and parse csv
-print("Load data...")
-data = np.genfromtxt(args.csv, delimiter=',', comments='%', names=True)
-header = data.dtype.names
-print("{} columns with names {}".format(len(data[0]), data.dtype.names))
-print("first row: {}".format(data[0]))
+# open csv (rows are streamed in chunks, see below)
+print("Open data...")
+data = TrackLog(args.csv, chunksize=args.chunksize)
+header = data.names
+print("{} columns with names {}".format(len(header), header))
+
+if args.convert:
+    print("Convert to {}...".format(args.convert))
+    data.convert(args.convert)
+    exit()
 
 
 #
@@ -73,70 +90,10 @@ print("first row: {}".format(data[0]))
 #
 # Pair the tracks corresponding to the same vehicle, when the vehicle changes
 # from one sensor s1 to sensor s2 (i.e., vanishes from the field of view of
-# sensor s1). To that end, the distance between all pairs of the vanished track
-# s1 to all tracks of s2 is calculated. The nearest track of s2 is selected if
+# sensor s1). To that end, the nearest track of s2 is searched for the vanished
+# track of s1 (see monitor.association). The nearest track of s2 is selected if
 # its below a maximum offset (around vehicle size / lane width).
 
-def distance(track_a, track_b):
-    x = header.index('x')
-    y = header.index('y')
-    return (track_a[x] - track_b[x])**2 + (track_a[y] - track_b[y])**2
-
-def find_match(track, possible_tracks, max_off=6):
-    """Find a matching track in the set of possible ones for the given track.
-
-    track -- The track for which to find a matching track from another sensor.
-    possible_tracks -- Tracks from another neighbor sensor.
-
-    Returns the id of the nearest track iff the distance is below the maximum
-    offset.
-
-    """
-    track_match_id = None
-    track_distance = max_off+1.0
-    # find best match (nearest track) in possible_tracks
-    for tid, t in possible_tracks.items():
-        d = distance(track, t)
-        if d < max_off and d < track_distance:
-            track_match_id = int(tid)
-            track_distance = d
-    return track_match_id
-
-def update_id_pairs(s1, s2, track_id_pairs):
-    """Appends unmatched tracks in s1 to track_id_pairs.
-
-    TODO: find additional id pairs with forward estimation
-    """
-    matched_ids = [pair[0] for pair in track_id_pairs]
-    for tid1, t1 in s1.items():
-        # try to find a near track for all unmatched tracks
-        if tid1 not in matched_ids:
-            tid2 = find_match(t1, s2)
-            # add new pair if successful
-            if tid2 is not None:
-                track_id_pairs.append([int(tid1), int(tid2)])
-    return track_id_pairs
-
-def pair(s1, s2, track_id_pairs):
-    """Returns pairs of tracks, i.e., tracks that can be compared.
-
-    s1 -- all tracks of sensor 1.
-    s2 -- all tracks of sensor 2.
-    track_id_pairs -- ID pairs of tracks of s1 and s2.
-
-    """
-    pairs = []
-    # collect available ids of the sensor's tracks
-    for tid1, tid2 in track_id_pairs:
-        try:
-            t1 = s1[tid1]
-            t2 = s2[tid2]
-            pairs.append([t1, t2])
-        except Exception as e:
-            # tracks may vanish from view, ignore
-            # (pair gets unused at some point)
-            pass
-    return pairs
 
 def check_itoms(timestamp, under_test, neighbor, predecessor_last):
     # indices of relevant fields in the track
@@ -161,15 +118,15 @@ def check_itoms(timestamp, under_test, neighbor, predecessor_last):
             'vx_old': predecessor_last[vx],
             'vy_old': predecessor_last[vy],
         })
-    status_x = x_monitor.monitor(itoms)
-    status_y = y_monitor.monitor(itoms)
-    status = {itom: max(status_x[itom], status_y[itom]) for itom in itoms}
-    return status
+    # worst status of an itom in the x and y domain
+    return monitor.monitor(itoms)
+
 
 # assume track ids are unique throughout the run (ids are not re-used when out
 # of range)
-track_id_pairs_spre = []  # pairs sensor to monitor <--> predecessor
-track_id_pairs_ssuc = []  # pairs sensor to monitor <--> successor
+association_spre = TrackAssociation()  # sensor to monitor <--> predecessor
+association_ssuc = TrackAssociation()  # sensor to monitor <--> successor
+
 
 def check(t, sensors, sensors_last):
     """Check itoms in sensor-under-test's domain."""
@@ -180,7 +137,8 @@ def check(t, sensors, sensors_last):
     # make the monitoring concrete here
     try:
         spre_last = sensors_last[args.sensor-1]
-        spre = sensors[args.sensor-1]  # all contained in spre_last, only used to update pairs
+        # all contained in spre_last, only used to update pairs
+        spre = sensors[args.sensor-1]
         stest = sensors[args.sensor]
         ssuc = sensors[args.sensor+1]
     except Exception as e:
@@ -188,17 +146,15 @@ def check(t, sensors, sensors_last):
         print("no data from neighboring sensors at time {}".format(t))
         return
     # associate tracks from one sensor to the other
-    global track_id_pairs_spre
-    global track_id_pairs_ssuc
-    track_id_pairs_spre = update_id_pairs(stest, spre, track_id_pairs_spre)
-    track_id_pairs_ssuc = update_id_pairs(stest, ssuc, track_id_pairs_ssuc)
-    track_pairs_spreold = pair(stest, spre_last, track_id_pairs_spre)
-    #track_pairs_spre = pair(stest, spre, track_id_pairs_spre)
-    track_pairs_ssuc = pair(stest, ssuc, track_id_pairs_ssuc)
+    association_spre.update(stest, spre)
+    association_ssuc.update(stest, ssuc)
+    track_pairs_spreold = association_spre.pair(stest, spre_last)
+    # track_pairs_spre = association_spre.pair(stest, spre)
+    track_pairs_ssuc = association_ssuc.pair(stest, ssuc)
     pairs_logger.log(time=float(t), sensors=[args.sensor, args.sensor-1],
-                     pairs=track_id_pairs_spre)
+                     pairs=association_spre.pairs)
     pairs_logger.log(time=float(t), sensors=[args.sensor, args.sensor+1],
-                     pairs=track_id_pairs_ssuc)
+                     pairs=association_ssuc.pairs)
     # check sensor against the neighbors
     if not track_pairs_spreold and not track_pairs_ssuc:
         print("no track pairs")
@@ -217,27 +173,24 @@ def check(t, sensors, sensors_last):
 #
 
 print("Monitor...")
-t = -1.0
-sensors = None  # stores the current observation of the tracks per sensor
-sensors_last = {}  # keeps the last observation of a track per sensor
-status = None
-for row in data:
-    # gather itoms as long as its the same timestamp
-    if row['time'] != t:
-        # check the itoms gathered during the last period
+with profile(args.profile):  # monitoring only
+    sensors_last = {}  # keeps the last observation of a track per sensor
+    # gather itoms per timestamp (rows are read chunk by chunk)
+    for t, rows in data.groups(key='time'):
+        sensors = {}  # stores the current observation of the tracks per sensor
+        for row in rows:
+            # create a list of tracks for each sensor
+            sid = row['sensor']
+            if sid not in sensors.keys():
+                sensors[sid] = {}  # key: sensor ID
+            if sid not in sensors_last.keys():
+                sensors_last[sid] = {}  # key: sensor ID
+            # prepare itoms
+            tid = row['track']
+            # save track observation
+            sensors[sid][tid] = row
+            # save last observation of a track (redundancy for forward
+            # estimation); copy, to release the chunk of rows afterwards
+            sensors_last[sid][tid] = row.copy()
+        # check the itoms gathered during this period
         check(t, sensors, sensors_last)
-        # reset
-        t = row['time']
-        sensors = {}
-    # create a list of tracks for each sensor
-    sid = row['sensor']
-    if sid not in sensors.keys():
-        sensors[sid] = {}  # key: sensor ID
-    if sid not in sensors_last.keys():
-        sensors_last[sid] = {}  # key: sensor ID
-    # prepare itoms
-    tid = row['track']
-    # save track observation
-    sensors[sid][tid] = row
-    # save last observation of a track (redundancy for forward estimation)
-    sensors_last[sid][tid] = row
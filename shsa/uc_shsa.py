@@ -6,10 +6,12 @@ import argparse
 from model.shsamodel import SHSAModel
 from model.substitution import Substitution
 from model.substitutionlist import SubstitutionList
+from model.export import write_module
 
 from engine.dfs import DepthFirstSearch
 from engine.shpgsa import SHPGSA
 from engine.orr import ORR
+from utils.profiler import profile
 
 
 # parse optional config file
@@ -26,6 +28,12 @@ parser.add_argument('-p', '--shpgsa', action="store_true",
                     help="SH-PGSA search.")
 parser.add_argument('-o', '--orr', action="store_true",
                     help="ORR search.")
+parser.add_argument('--profile', type=str, metavar="FILE",
+                    help="""Writes the profile (cProfile) of the searches to
+                    the given file.""")
+parser.add_argument('--export', type=str, metavar="FILE",
+                    help="""Writes the found substitutions to a Python module
+                    (compiled to bytecode) executing them without shsa.""")
 args = parser.parse_args()
 
 # additional input validation
@@ -44,38 +52,45 @@ print("config: {}".format(args.config))
 
 S = None  # substitution list
 
-if args.dfs:
-    print("DFS")
-    engine = DepthFirstSearch(model)
-    S = engine.substitute(args.root, substitute_provided=False)
-    # when the root is already provided, an empty substitution is also valid
-    if engine.model.provided([args.root]):
-        s = Substitution(root=args.root, model=engine.model)
-        S.append(s)
-    print("- results:\n{}".format(S))
-    print("- best: {}".format(S.best()))
+with profile(args.profile):  # searches only
+    if args.dfs:
+        print("DFS")
+        engine = DepthFirstSearch(model)
+        S = engine.substitute(args.root, substitute_provided=False)
+        # when the root is already provided, an empty substitution is also
+        # valid
+        if engine.model.provided([args.root]):
+            s = Substitution(root=args.root, model=engine.model)
+            S.append(s)
+        print("- results:\n{}".format(S))
+        print("- best: {}".format(S.best()))
 
-if args.shpgsa:
-    print("SH-PGSA")
-    engine = SHPGSA(model)
-    while(engine.substitute(args.root)):
-        pass
-    S = engine.last_results()
-    print("- results:\n{}".format(S))
-    print("- best: {}".format(S.best()))
+    if args.shpgsa:
+        print("SH-PGSA")
+        engine = SHPGSA(model)
+        while engine.substitute(args.root):
+            pass
+        S = engine.last_results()
+        print("- results:\n{}".format(S))
+        print("- best: {}".format(S.best()))
 
-if args.orr:
-    print("ORR")
-    engine = ORR(model)
-    engine.substitute_init()
-    _, tree = engine.substitute(args.root)
-    S = SubstitutionList()
-    S.add_substitution([n for n in tree if model.is_relation(n)])
-    S.update(args.root, model=model)
-    print("- result:\n{}".format(S))
+    if args.orr:
+        print("ORR")
+        engine = ORR(model)
+        engine.substitute_init()
+        _, tree = engine.substitute(args.root)
+        S = SubstitutionList()
+        S.add_substitution([n for n in tree if model.is_relation(n)])
+        S.update(args.root, model=model)
+        print("- result:\n{}".format(S))
 
 # print substitution tree with highest utility
 if S is not None:
     sbest = S.best()
     if sbest is not None:
         sbest.write_dot("uc_shsa_substitution", 'pdf')
+
+# export substitutions (e.g., for deployment)
+if S is not None and args.export:
+    write_module(args.export, S)
+    print("exported to {}".format(args.export))
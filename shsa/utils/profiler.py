@@ -0,0 +1,36 @@
+"""Profiler.
+
+Records cProfile data around a region of a script only (e.g., without
+loading the model and parsing the arguments), see option `--profile` of the
+benchmarks and the `uc_*.py` scripts. Analyze the profiles with
+`scripts/profile_stats.py`.
+
+"""
+
+import cProfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def profile(filename=None, profiler=None):
+    """Profiles the code within the context.
+
+    filename -- Path to the file where the profile is written to. If None,
+        the code is not profiled.
+    profiler -- A `cProfile.Profile` to continue (e.g., to profile several
+        regions into a single file). A new one by default.
+
+    Yields the profiler (None if not profiled).
+
+    """
+    if filename is None:
+        yield None
+        return
+    if profiler is None:
+        profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filename)
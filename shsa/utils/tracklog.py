@@ -0,0 +1,153 @@
+"""Track log reader.
+
+Streams a (possibly huge) log of track observations in fixed-size chunks
+instead of loading the whole recording at once, such that a recording can be
+replayed with constant memory.
+
+A track log is either a CSV file (header in the first line, optionally
+preceded by the comment character) or a NumPy binary file (.npy, e.g., created
+by `TrackLog.convert`) which is memory-mapped.
+
+"""
+
+import itertools
+import numpy as np
+
+
+class TrackLog(object):
+    """Reads a track log chunk by chunk."""
+
+    def __init__(self, filename, chunksize=10000, delimiter=',',
+                 comments='%'):
+        """Initialize the reader.
+
+        filename -- Path to the CSV or .npy file.
+        chunksize -- Number of rows read at once.
+        delimiter -- Delimiter of the CSV columns.
+        comments -- Character starting a comment in the CSV file.
+
+        """
+        if chunksize < 1:
+            raise RuntimeError("Chunk size must be positive.")
+        self.__filename = filename
+        """Path to the log file."""
+        self.__chunksize = chunksize
+        """Number of rows to read at once."""
+        self.__delimiter = delimiter
+        self.__comments = comments
+        self.__dtype = None
+        """Data type of a row (structured, with column names as fields)."""
+        # read the header (first chunk only, to get the data type)
+        for chunk in self.chunks():
+            break
+
+    @property
+    def filename(self):
+        return self.__filename
+
+    @property
+    def names(self):
+        """Returns the column names."""
+        if self.__dtype is None:
+            return None
+        return self.__dtype.names
+
+    def __is_binary(self):
+        return self.__filename.endswith('.npy')
+
+    def chunks(self):
+        """Yields the rows of the log as structured arrays of at most
+        `chunksize` rows."""
+        if self.__is_binary():
+            yield from self.__chunks_npy()
+        else:
+            yield from self.__chunks_csv()
+
+    def __chunks_npy(self):
+        data = np.load(self.__filename, mmap_mode='r')
+        self.__dtype = data.dtype
+        for i in range(0, len(data), self.__chunksize):
+            yield data[i:i + self.__chunksize]
+
+    def __chunks_csv(self):
+        with open(self.__filename, 'r') as f:
+            # the first chunk includes the header (column names)
+            lines = [next(f, "")]
+            while True:
+                read = list(itertools.islice(f, self.__chunksize))
+                lines.extend(read)
+                if not self.__has_data(lines):
+                    if len(read) < self.__chunksize:
+                        break  # end of file
+                    # skip chunks of comments
+                    lines = lines[:1] if self.__dtype is None else []
+                    continue
+                if self.__dtype is None:
+                    chunk = np.genfromtxt(lines, delimiter=self.__delimiter,
+                                          comments=self.__comments,
+                                          names=True)
+                    self.__dtype = chunk.dtype
+                else:
+                    chunk = np.genfromtxt(lines, delimiter=self.__delimiter,
+                                          comments=self.__comments,
+                                          dtype=self.__dtype)
+                yield np.atleast_1d(chunk)
+                lines = []
+
+    def __has_data(self, lines):
+        """Returns true if the given lines contain at least one data row."""
+        skip = 1 if self.__dtype is None else 0  # header
+        for line in lines[skip:]:
+            line = line.strip()
+            if line and not line.startswith(self.__comments):
+                return True
+        return False
+
+    def rows(self):
+        """Yields the rows of the log one by one."""
+        for chunk in self.chunks():
+            for row in chunk:
+                yield row
+
+    def groups(self, key='time'):
+        """Yields (value, rows) of consecutive rows with equal `key`.
+
+        Groups may span several chunks. Only the rows of the current group are
+        held in memory.
+
+        """
+        value = None
+        group = []
+        for chunk in self.chunks():
+            keys = chunk[key]
+            # indices where the key changes within the chunk
+            splits = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+            start = 0
+            for end in itertools.chain(splits, [len(chunk)]):
+                if group and keys[start] != value:
+                    yield value, np.concatenate(group)
+                    group = []
+                value = keys[start]
+                group.append(chunk[start:end])
+                start = end
+        if group:
+            yield value, np.concatenate(group)
+
+    def convert(self, npyfile):
+        """Converts the log into a NumPy binary file (.npy) that can be
+        memory-mapped for later replays.
+
+        The conversion streams the log, i.e., needs constant memory too.
+
+        """
+        # count rows first to allocate the memory-mapped output
+        numrows = sum(len(chunk) for chunk in self.chunks())
+        out = np.lib.format.open_memmap(npyfile, mode='w+',
+                                        dtype=self.__dtype,
+                                        shape=(numrows,))
+        i = 0
+        for chunk in self.chunks():
+            out[i:i + len(chunk)] = chunk
+            i += len(chunk)
+        out.flush()
+        del out